@@ -0,0 +1,122 @@
+"""
+float range micro-benchmark, compares the allow_float_value_range check with the
+previous implementation quantizing three Decimals per cell, on latitude like values,
+and checks both implementations agree on every value
+
+usage: PYTHONPATH=. python benchmarks/bench_float_range.py [--values 200000] [--runs 5]
+"""
+import random
+import sys
+import time
+from argparse import ArgumentParser
+from decimal import Decimal, ROUND_HALF_EVEN
+from typing import Callable, List
+
+from csv_file_validator.validation_functions import (
+    call_validation_function,
+    get_mapped_validation_function,
+)
+
+VALIDATION_VALUE: list = [-90.0, 90.0]
+
+
+def legacy_check_column_allow_float_value_range(**kwargs) -> int:
+    """
+    previous float range validation function, the bounds and the value
+    are quantized as Decimals on every call
+    :param kwargs:
+    :return:
+    """
+    lower_range: Decimal = Decimal(kwargs.get("validation_value")[0]).quantize(
+        Decimal(".01"), rounding=ROUND_HALF_EVEN
+    )
+    upper_range: Decimal = Decimal(kwargs.get("validation_value")[1]).quantize(
+        Decimal(".01"), rounding=ROUND_HALF_EVEN
+    )
+    column_value: Decimal = Decimal(kwargs.get("column_value")).quantize(
+        Decimal(".01"), rounding=ROUND_HALF_EVEN
+    )
+
+    if lower_range.compare(column_value) < 0 < upper_range.compare(column_value):
+        return 0
+    return 1
+
+
+def generate_values(count: int) -> List[str]:
+    """
+    function generating latitude like column values, a part of them
+    close to or outside of the range bounds
+    :param count:
+    :return:
+    """
+    generator = random.Random(42)
+    values: List[str] = []
+    for _ in range(count):
+        if generator.random() < 0.05:
+            values.append(f"{generator.choice((-1, 1)) * generator.uniform(89.99, 90.01):.6f}")
+        else:
+            values.append(f"{generator.uniform(-95.0, 95.0):.6f}")
+    return values
+
+
+def measure(func: Callable, values: List[str], runs: int) -> float:
+    """
+    function returning the best time in seconds of validating all the values
+    :param func:
+    :param values:
+    :param runs:
+    :return:
+    """
+    timings: List[float] = []
+    for _ in range(runs):
+        start: float = time.perf_counter()
+        for value in values:
+            call_validation_function(
+                func, validation_value=VALIDATION_VALUE, column_value=value
+            )
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> int:
+    """
+    main function
+    :return:
+    """
+    parser = ArgumentParser()
+    parser.add_argument("--values", type=int, default=200000)
+    parser.add_argument("--runs", type=int, default=5)
+    parsed = parser.parse_args()
+
+    values: List[str] = generate_values(parsed.values)
+    func: Callable = get_mapped_validation_function("allow_float_value_range")
+
+    mismatches: List[str] = [
+        value
+        for value in values
+        if call_validation_function(
+            func, validation_value=VALIDATION_VALUE, column_value=value
+        )
+        != call_validation_function(
+            legacy_check_column_allow_float_value_range,
+            validation_value=VALIDATION_VALUE,
+            column_value=value,
+        )
+    ]
+
+    legacy_seconds: float = measure(
+        legacy_check_column_allow_float_value_range, values, parsed.runs
+    )
+    seconds: float = measure(func, values, parsed.runs)
+
+    print(f"{parsed.values} values, best of {parsed.runs} runs")
+    print(f"legacy decimal quantization: {parsed.values / legacy_seconds:.0f} values/s")
+    print(f"pre-parsed float range: {parsed.values / seconds:.0f} values/s "
+          f"({legacy_seconds / seconds:.1f}x)")
+    print(f"results differing from the legacy implementation: {len(mismatches)}")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
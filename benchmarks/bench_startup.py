@@ -0,0 +1,92 @@
+"""
+CLI startup benchmark, measures the cumulative `python -X importtime`
+cost of importing csv_file_validator.__main__ and checks it against a budget
+
+usage: python benchmarks/bench_startup.py [--runs 20] [--budget-ms 80]
+"""
+import os
+import statistics
+import subprocess
+import sys
+from argparse import ArgumentParser
+
+MODULE: str = "csv_file_validator.__main__"
+HEAVY_MODULES: tuple = (
+    "dateutil",
+    # the optional features: archives, worker pools, row rules, quarantine and sidecar outputs
+    "ast",
+    "concurrent.futures",
+    "hashlib",
+    "tarfile",
+    "tempfile",
+    "zipfile",
+)
+
+
+def measure_import_time_us(module: str) -> int:
+    """
+    function running a fresh interpreter with -X importtime and returning
+    the cumulative import time of the module in microseconds
+    :param module:
+    :return:
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+        cwd=os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir),
+    )
+    for line in completed.stderr.splitlines():
+        _, cumulative, name = line.split("|")
+        if name.strip() == module:
+            return int(cumulative)
+    raise RuntimeError(f"module {module} not found in the importtime output")
+
+
+def find_heavy_imports(module: str) -> list:
+    """
+    function returning the heavy modules imported as a side effect of importing the module
+    :param module:
+    :return:
+    """
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"import sys, {module}; "
+            f"print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))",
+        ],
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+        cwd=os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir),
+    )
+    return completed.stdout.split()
+
+
+def main() -> int:
+    """
+    main function
+    :return:
+    """
+    parser = ArgumentParser()
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=80.0)
+    parsed = parser.parse_args()
+
+    timings_us = [measure_import_time_us(MODULE) for _ in range(parsed.runs)]
+    median_ms = statistics.median(timings_us) / 1000
+    heavy_imports = find_heavy_imports(MODULE)
+
+    print(f"import {MODULE}: median {median_ms:.2f} ms "
+          f"over {parsed.runs} runs (budget {parsed.budget_ms:.2f} ms)")
+    print(f"heavy modules imported eagerly: {heavy_imports or 'none'}")
+
+    if heavy_imports or median_ms > parsed.budget_ms:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
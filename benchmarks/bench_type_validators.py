@@ -0,0 +1,123 @@
+"""
+data type validators micro-benchmark, compares the column rule plan evaluation of the int
+and float allow_data_type rules by the precompiled type patterns with the previous
+validation function relying on exceptions, on clean and on dirty values, the value
+result cache is off so every value is evaluated
+
+usage: PYTHONPATH=. python benchmarks/bench_type_validators.py [--values 200000] [--runs 5]
+"""
+import random
+import sys
+import time
+from argparse import ArgumentParser
+from typing import Callable, Dict, List
+
+from csv_file_validator.rule_plan import ColumnRulePlan
+
+
+def legacy_check_column_allow_data_type(**kwargs) -> int:
+    """
+    previous int and float data type validation function, a value
+    not being a float is reported by the ValueError of float()
+    :param kwargs:
+    :return:
+    """
+    if kwargs.get("validation_value") == "str":
+        if str(kwargs.get("column_value")):
+            return 0
+    elif kwargs.get("validation_value") == "int":
+        if kwargs.get("column_value").isdigit():
+            return 0
+    elif kwargs.get("validation_value") == "float":
+        if "." in kwargs.get("column_value"):
+            float(kwargs.get("column_value"))
+            return 0
+    return 1
+
+
+def generate_values(count: int, data_type: str, dirty: bool) -> List[str]:
+    """
+    function generating column values of the data type, with dirty
+    values most of them fail the validation
+    :param count:
+    :param data_type:
+    :param dirty:
+    :return:
+    """
+    generator = random.Random(42)
+    if dirty:
+        return [
+            generator.choice(("n/a", "unknown", "12,5", "-", "abc.", "1.2.3")) + str(index % 10)
+            for index in range(count)
+        ]
+    if data_type == "int":
+        return [str(generator.randint(0, 10 ** 6)) for _ in range(count)]
+    return [f"{generator.uniform(-180.0, 180.0):.6f}" for _ in range(count)]
+
+
+def get_column_plan(data_type: str, legacy: bool) -> ColumnRulePlan:
+    """
+    function returning the column rule plan of the data type rule without the value
+    result cache, the legacy plan evaluates the previous validation function
+    :param data_type:
+    :param legacy:
+    :return:
+    """
+    column_plan: ColumnRulePlan = ColumnRulePlan("Value", {"allow_data_type": data_type})
+    column_plan.value_cache = None
+    if legacy:
+        rule = column_plan.rules[0]
+        rule.value_check = None
+        rule.func = legacy_check_column_allow_data_type
+    return column_plan
+
+
+def measure(column_plan: ColumnRulePlan, values: List[str], runs: int) -> float:
+    """
+    function returning the best time in seconds of evaluating the rules on all the values
+    :param column_plan:
+    :param values:
+    :param runs:
+    :return:
+    """
+    get_failures: Callable = column_plan.get_failures
+    timings: List[float] = []
+    for _ in range(runs):
+        start: float = time.perf_counter()
+        for value in values:
+            get_failures(value)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> int:
+    """
+    main function
+    :return:
+    """
+    parser = ArgumentParser()
+    parser.add_argument("--values", type=int, default=200000)
+    parser.add_argument("--runs", type=int, default=5)
+    parsed = parser.parse_args()
+
+    print(f"{parsed.values} values, best of {parsed.runs} runs")
+
+    for data_type in ("int", "float"):
+        for dirty in (False, True):
+            values: List[str] = generate_values(parsed.values, data_type, dirty)
+            timings: Dict[str, float] = {
+                "legacy": measure(get_column_plan(data_type, True), values, parsed.runs),
+                "pattern": measure(get_column_plan(data_type, False), values, parsed.runs),
+            }
+            print(
+                f"{data_type} {'dirty' if dirty else 'clean'}: "
+                f"legacy {parsed.values / timings['legacy']:.0f} values/s, "
+                f"pattern {parsed.values / timings['pattern']:.0f} values/s "
+                f"({timings['legacy'] / timings['pattern']:.1f}x)"
+            )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""
+batch validation micro-benchmark, compares validating message like records one by one
+with RulePlan.validate_line against validating them in batches with RulePlan.validate_batch,
+the failed validations are not logged in either case
+
+usage: PYTHONPATH=. python benchmarks/bench_validate_batch.py [--rows 100000] [--batch 5000] [--runs 5]
+"""
+import logging
+import random
+import sys
+import time
+from argparse import ArgumentParser
+from typing import Callable, List, Tuple
+
+from csv_file_validator.rule_plan import RulePlan
+
+COLUMNS: Tuple[str, ...] = ("Product", "Price", "Payment_Type", "Country", "Latitude")
+COLUMN_VALIDATION_RULES: dict = {
+    "Price": {"allow_data_type": "int", "allow_int_value_range": [0, 5000]},
+    "Payment_Type": {"allow_fixed_value_list": ["Visa", "Mastercard", "Amex", "Diners"]},
+    "Country": {"allow_regex": "[A-Z][a-z]+"},
+    "Latitude": {"allow_float_value_range": [-90.0, 90.0]},
+}
+
+
+def generate_rows(count: int) -> List[Tuple[str, ...]]:
+    """
+    function generating the records, a few percent of them failing a rule
+    :param count:
+    :return:
+    """
+    generator = random.Random(42)
+    return [
+        (
+            f"Product{index % 7}",
+            str(generator.randint(0, 5200)),
+            generator.choice(("Visa", "Mastercard", "Amex", "Diners")),
+            generator.choice(("Norway", "Spain", "Italy", "united states")),
+            f"{generator.uniform(-90.0, 90.0):.6f}",
+        )
+        for index in range(count)
+    ]
+
+
+def measure(func: Callable, runs: int) -> float:
+    """
+    function returning the best time in seconds of the function call
+    :param func:
+    :param runs:
+    :return:
+    """
+    timings: List[float] = []
+    for _ in range(runs):
+        start: float = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> int:
+    """
+    main function
+    :return:
+    """
+    parser = ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--batch", type=int, default=5000)
+    parser.add_argument("--runs", type=int, default=5)
+    parsed = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    rows: List[Tuple[str, ...]] = generate_rows(parsed.rows)
+    lines: List[dict] = [dict(zip(COLUMNS, row)) for row in rows]
+    batches: List[List[Tuple[str, ...]]] = [
+        rows[start:start + parsed.batch] for start in range(0, len(rows), parsed.batch)
+    ]
+
+    def validate_lines() -> int:
+        rule_plan: RulePlan = RulePlan(COLUMN_VALIDATION_RULES)
+        return sum(rule_plan.validate_line(line, idx) for idx, line in enumerate(lines))
+
+    def validate_batches() -> int:
+        # every batch compiles its own rule plan, like a service handling a message batch
+        return sum(
+            RulePlan(COLUMN_VALIDATION_RULES)
+            .validate_batch(batch, columns=COLUMNS)
+            .failed_validations
+            for batch in batches
+        )
+
+    line_failures: int = validate_lines()
+    batch_failures: int = validate_batches()
+    line_seconds: float = measure(validate_lines, parsed.runs)
+    batch_seconds: float = measure(validate_batches, parsed.runs)
+
+    print(f"{parsed.rows} rows, batches of {parsed.batch}, best of {parsed.runs} runs")
+    print(f"validate_line: {parsed.rows / line_seconds:.0f} rows/s")
+    print(f"validate_batch: {parsed.rows / batch_seconds:.0f} rows/s "
+          f"({line_seconds / batch_seconds:.1f}x)")
+    print(f"failed validations: {line_failures} per line, {batch_failures} per batch")
+
+    return 0 if line_failures == batch_failures else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+wide rows benchmark, generates a csv file with a huge header and validates a few
+of its columns, comparing rows read as dicts of all the columns with rows
+addressed by the column index map resolved once per file
+
+usage: PYTHONPATH=. python benchmarks/bench_wide_rows.py [--columns 50000] [--rows 200]
+    [--validated-columns 10]
+"""
+import os
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+
+from csv_file_validator.config import get_validated_config
+from csv_file_validator.file import open_file
+from csv_file_validator.rule_plan import compile_rule_plan
+
+
+def write_wide_file(file_name: str, columns: int, rows: int) -> None:
+    """
+    function writing a csv file with a header and rows of the given width
+    :param file_name:
+    :param columns:
+    :param rows:
+    :return:
+    """
+    with open(file_name, mode="w") as wide_file:
+        wide_file.write(",".join(f"column_{index}" for index in range(columns)) + "\n")
+        row: str = ",".join(str(index % 1000) for index in range(columns)) + "\n"
+        for _ in range(rows):
+            wide_file.write(row)
+
+
+def build_config(columns: int, validated_columns: int) -> dict:
+    """
+    function building a config validating columns spread over the whole row width
+    :param columns:
+    :param validated_columns:
+    :return:
+    """
+    step: int = max(columns // validated_columns, 1)
+    return {
+        "file_metadata": {
+            "file_value_separator": ",",
+            "file_row_terminator": "\n",
+            "file_value_quote_char": '"',
+            "file_has_header": True,
+        },
+        "file_validation_rules": {},
+        "column_validation_rules": {
+            f"column_{index}": {"allow_data_type": "int", "allow_int_value_range": [0, 999]}
+            for index in range(0, columns, step)[:validated_columns]
+        },
+    }
+
+
+def measure_dict_rows(config, file_name: str) -> float:
+    """
+    function validating the file rows read as dicts of all the columns, returning seconds
+    :param config:
+    :param file_name:
+    :return:
+    """
+    file = open_file(config, file_name)
+    rule_plan = compile_rule_plan(config)
+    start: float = time.perf_counter()
+    for idx, line in file.file_read_generator():
+        rule_plan.validate_line(line, idx)
+    elapsed: float = time.perf_counter() - start
+    file.close_file_handler()
+    return elapsed
+
+
+def measure_indexed_rows(config, file_name: str) -> float:
+    """
+    function validating the file rows addressed by the column index map, returning seconds
+    :param config:
+    :param file_name:
+    :return:
+    """
+    file = open_file(config, file_name)
+    rule_plan = compile_rule_plan(config)
+    start: float = time.perf_counter()
+    rule_plan.bind_column_indexes(file.get_column_index_map())
+    for idx, row in file.row_generator():
+        rule_plan.validate_row(row, idx)
+    elapsed: float = time.perf_counter() - start
+    file.close_file_handler()
+    return elapsed
+
+
+def main() -> int:
+    """
+    main function
+    :return:
+    """
+    parser = ArgumentParser()
+    parser.add_argument("--columns", type=int, default=50000)
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--validated-columns", type=int, default=10)
+    parsed = parser.parse_args()
+
+    config = get_validated_config(build_config(parsed.columns, parsed.validated_columns))
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_name: str = os.path.join(temp_dir, "wide_file.csv")
+        write_wide_file(file_name, parsed.columns, parsed.rows)
+
+        dict_seconds: float = measure_dict_rows(config, file_name)
+        indexed_seconds: float = measure_indexed_rows(config, file_name)
+
+    print(f"{parsed.rows} rows x {parsed.columns} columns, "
+          f"{parsed.validated_columns} validated columns")
+    print(f"dict rows: {parsed.rows / dict_seconds:.1f} rows/s")
+    print(f"indexed rows: {parsed.rows / indexed_seconds:.1f} rows/s "
+          f"({dict_seconds / indexed_seconds:.1f}x)")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
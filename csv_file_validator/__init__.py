@@ -0,0 +1,2 @@
+# kept in sync with the setup.py version, the sidecar indexes are keyed by it
+__version__ = "0.0.1"
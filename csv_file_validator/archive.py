@@ -0,0 +1,190 @@
+"""
+archive module
+"""
+import io
+import os
+from typing import IO, Iterator, Optional, Tuple
+
+# archive members are addressed by archive qualified names
+# like /landing/bundle.zip::folder/SalesJan2009.csv
+ARCHIVE_MEMBER_SEPARATOR: str = "::"
+
+ZIP_EXTENSIONS: tuple = (".zip",)
+TAR_EXTENSIONS: tuple = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+
+
+def is_archive(path: str) -> bool:
+    """
+    function checking if the path is a supported archive, based on the file extension
+    :param path:
+    :return:
+    """
+    return path.lower().endswith(ZIP_EXTENSIONS + TAR_EXTENSIONS)
+
+
+def split_archive_member_name(file_name: str) -> Optional[Tuple[str, str]]:
+    """
+    function splitting an archive qualified name to the archive path and the member name,
+    returns None for names not pointing to an archive member
+    :param file_name:
+    :return:
+    """
+    archive_path, separator, member_name = file_name.partition(ARCHIVE_MEMBER_SEPARATOR)
+    if not separator or not is_archive(archive_path):
+        return None
+    return archive_path, member_name
+
+
+def iter_archive_members(archive_path: str) -> Iterator[str]:
+    """
+    generator yielding the archive qualified names of the archive file members
+    :param archive_path:
+    :return:
+    """
+    # the archive modules are imported only once an archive is opened
+    # pylint: disable=import-outside-toplevel
+    import tarfile
+    import zipfile
+
+    if archive_path.lower().endswith(ZIP_EXTENSIONS):
+        with zipfile.ZipFile(archive_path) as zip_archive:
+            member_names = [
+                member.filename
+                for member in zip_archive.infolist()
+                if not member.is_dir()
+            ]
+    else:
+        with tarfile.open(archive_path) as tar_archive:
+            member_names = [
+                member.name for member in tar_archive.getmembers() if member.isfile()
+            ]
+
+    for member_name in member_names:
+        yield f"{archive_path}{ARCHIVE_MEMBER_SEPARATOR}{member_name}"
+
+
+class _ArchiveMemberStream:
+    """
+    binary stream of an archive member, closing the archive together with the member
+    """
+
+    def __init__(self, archive, member_stream: IO):
+        self._archive = archive
+        self._member_stream: IO = member_stream
+
+    def __getattr__(self, name):
+        return getattr(self._member_stream, name)
+
+    def __iter__(self):
+        return iter(self._member_stream)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self) -> None:
+        """
+        method closing the member stream and the archive
+        :return:
+        """
+        self._member_stream.close()
+        self._archive.close()
+
+
+def open_binary(file_name: str) -> IO:
+    """
+    function opening a file or an archive member as a binary stream,
+    archive members are decompressed on the fly without extraction
+    :param file_name:
+    :return:
+    """
+    archive_member: Optional[Tuple[str, str]] = split_archive_member_name(file_name)
+    if archive_member is None:
+        return open(file_name, mode="rb")
+
+    # pylint: disable=import-outside-toplevel
+    import tarfile
+    import zipfile
+
+    archive_path, member_name = archive_member
+    if archive_path.lower().endswith(ZIP_EXTENSIONS):
+        zip_archive = zipfile.ZipFile(archive_path)
+        return _ArchiveMemberStream(zip_archive, zip_archive.open(member_name))
+
+    tar_archive = tarfile.open(archive_path)
+    member_stream: Optional[IO] = tar_archive.extractfile(member_name)
+    if member_stream is None:
+        tar_archive.close()
+        raise FileNotFoundError(f"{member_name} is not a file in {archive_path}")
+    return _ArchiveMemberStream(tar_archive, member_stream)
+
+
+class _ByteRangeStream(io.RawIOBase):
+    """
+    binary stream reading a byte range of an underlying binary stream, the stream
+    is not seekable, so the bytes read so far are counted in bytes_read
+    """
+
+    def __init__(self, binary_handle: IO, length: int):
+        super().__init__()
+        self._binary_handle: IO = binary_handle
+        self._remaining: int = length
+        self.bytes_read: int = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._remaining <= 0:
+            return 0
+        data: bytes = self._binary_handle.read(min(len(buffer), self._remaining))
+        buffer[: len(data)] = data
+        self._remaining -= len(data)
+        self.bytes_read += len(data)
+        return len(data)
+
+    def close(self) -> None:
+        """
+        method closing the underlying binary stream
+        :return:
+        """
+        self._binary_handle.close()
+        super().close()
+
+
+def open_binary_range(file_name: str, start: int, end: int) -> IO:
+    """
+    function opening a byte range of a file or an archive member as a binary stream
+    :param file_name:
+    :param start:
+    :param end:
+    :return:
+    """
+    binary_handle: IO = open_binary(file_name)
+    binary_handle.seek(start)
+    return io.BufferedReader(_ByteRangeStream(binary_handle, end - start))
+
+
+def get_file_size(file_name: str) -> int:
+    """
+    function returning the size in bytes of a file or the uncompressed size of an archive member
+    :param file_name:
+    :return:
+    """
+    archive_member: Optional[Tuple[str, str]] = split_archive_member_name(file_name)
+    if archive_member is None:
+        return os.path.getsize(file_name)
+
+    # pylint: disable=import-outside-toplevel
+    import tarfile
+    import zipfile
+
+    archive_path, member_name = archive_member
+    if archive_path.lower().endswith(ZIP_EXTENSIONS):
+        with zipfile.ZipFile(archive_path) as zip_archive:
+            return zip_archive.getinfo(member_name).file_size
+
+    with tarfile.open(archive_path) as tar_archive:
+        return tar_archive.getmember(member_name).size
@@ -1,14 +1,17 @@
 """
 argument parser
 """
-import json
 import os
 from argparse import ArgumentParser
+from itertools import chain
 
-from csv_file_validator.exceptions import (
-    InvalidFileLocationException,
-    InvalidConfigException,
-)
+from csv_file_validator.archive import is_archive
+from csv_file_validator.config import load_config
+from csv_file_validator.discovery import iter_file_locations
+from csv_file_validator.exceptions import InvalidFileLocationException
+from csv_file_validator.routing import load_routing_manifest
+from csv_file_validator.settings_parser import LOGGING_LEVELS
+from csv_file_validator.summary import SUMMARY_FORMATS
 
 
 def prepare_args() -> dict:
@@ -20,47 +23,78 @@ def prepare_args() -> dict:
 
     parser = ArgumentParser()
     parser.add_argument("-fl", "--filelocation", type=str, required=True)
-    parser.add_argument("-cfg", "--configfile", type=str, required=True)
+    config_group = parser.add_mutually_exclusive_group(required=True)
+    config_group.add_argument("-cfg", "--configfile", type=str)
+    config_group.add_argument("-rm", "--routingmanifest", type=str)
+    parser.add_argument(
+        "-ll",
+        "--loglevel",
+        type=str.upper,
+        choices=LOGGING_LEVELS,
+    )
+    parser.add_argument("-w", "--workers", type=int, default=1)
+    parser.add_argument("-r", "--recursive", action="store_true")
+    parser.add_argument("-inc", "--include", type=str, action="append", default=[])
+    parser.add_argument("-exc", "--exclude", type=str, action="append", default=[])
+    parser.add_argument("-mf", "--maxfiles", type=int)
+    parser.add_argument("-pf", "--prefilter", action="store_true")
+    parser.add_argument("-co", "--coordinator", type=str)
+    parser.add_argument("-sm", "--splitmb", type=float)
+    parser.add_argument("-sum", "--summary", type=str)
+    parser.add_argument(
+        "-sumf", "--summaryformat", type=str.lower, choices=SUMMARY_FORMATS, default="ndjson"
+    )
     parsed = parser.parse_args()
 
+    parsed_config = None
+    config_router = None
+    if parsed.routingmanifest:
+        # every config of the manifest is loaded once, the files are routed to them
+        config_router = load_routing_manifest(parsed.routingmanifest)
+    else:
+        parsed_config = load_config(parsed.configfile)
+    args["config"] = parsed_config
+    args["config_router"] = config_router
+
     parsed_file_loc = parsed.filelocation
-    parsed_file_loc_list = []
 
-    if os.path.isdir(parsed_file_loc):
-        for path in os.listdir(parsed_file_loc):
-            full_path = os.path.join(parsed_file_loc, path)
-            if os.path.isfile(full_path):
-                parsed_file_loc_list.append(full_path)
-        if not parsed_file_loc_list:
-            raise InvalidFileLocationException(f"Folder {parsed_file_loc} is empty")
+    if os.path.isdir(parsed_file_loc) or (
+        os.path.isfile(parsed_file_loc) and is_archive(parsed_file_loc)
+    ):
+        # the files are discovered lazily, only the first one is looked up here
+        parsed_file_locs = iter_file_locations(
+            parsed_file_loc,
+            recursive=parsed.recursive,
+            include=parsed.include,
+            exclude=parsed.exclude,
+            max_files=parsed.maxfiles,
+            file_validation_rules=(
+                parsed_config.file_validation_rules
+                if parsed.prefilter and parsed_config is not None
+                else None
+            ),
+        )
+        first_file_loc = next(parsed_file_locs, None)
+        if first_file_loc is None:
+            raise InvalidFileLocationException(
+                f"Folder {parsed_file_loc} has no files to validate"
+            )
+        args["file_loc"] = chain([first_file_loc], parsed_file_locs)
 
     elif os.path.isfile(parsed_file_loc):
-        parsed_file_loc_list = [parsed_file_loc]
+        args["file_loc"] = iter([parsed_file_loc])
     else:
         raise InvalidFileLocationException(
             f"Could not load file(s) {parsed_file_loc} " f"for validation"
         )
-    args["file_loc"] = parsed_file_loc_list
-
-    parsed_config = parsed.configfile
-    parsed_config_dict = None
-
-    if os.path.isfile(parsed_config):
-        with open(parsed_config, mode="r") as json_file:
-            try:
-                parsed_config_dict = json.load(json_file)
-            except json.JSONDecodeError as json_decode_err:
-                raise InvalidConfigException(
-                    f"Could not load config - valid file, "
-                    f"JSON decode error: {json_decode_err}"
-                )
-            except Exception as exc:
-                raise InvalidConfigException(
-                    f"Could not load config - valid file, " f"general exception: {exc}"
-                )
-    else:
-        raise InvalidConfigException("Could not load config file - not a valid file")
-
-    args["config"] = parsed_config_dict
+    args["logging_level"] = parsed.loglevel
+    # a coordinator can leave the validation to the remote workers only
+    args["workers"] = max(parsed.workers, 0 if parsed.coordinator else 1)
+    args["coordinator"] = parsed.coordinator
+    args["split_bytes"] = (
+        int(parsed.splitmb * 1024 * 1024) if parsed.splitmb and parsed.splitmb > 0 else None
+    )
+    args["summary"] = parsed.summary
+    args["summary_format"] = parsed.summaryformat
 
     return args
@@ -0,0 +1,233 @@
+"""
+columnar_file.py
+"""
+from abc import abstractmethod
+from collections.abc import Generator
+from typing import Dict, IO, Iterator, List, Optional
+
+from csv_file_validator.archive import get_file_size, open_binary, split_archive_member_name
+from csv_file_validator.config import Config
+from csv_file_validator.exceptions import InvalidConfigException
+from csv_file_validator.file import FileReader
+from csv_file_validator.resource_guard import ResourceGuard
+
+try:
+    import pyarrow
+    from pyarrow import ipc, parquet
+except ImportError:  # pragma: no cover
+    pyarrow = None
+
+COLUMN_CHUNK_SIZE: int = 64 * 1024
+
+
+def _column_values(array) -> List[str]:
+    """
+    function converting an arrow array chunk to the list of string values
+    the column validation rules are evaluated on, nulls are empty strings
+    :param array:
+    :return:
+    """
+    if pyarrow.types.is_integer(array.type):
+        array = array.cast(pyarrow.string())
+    elif not (
+        pyarrow.types.is_string(array.type) or pyarrow.types.is_large_string(array.type)
+    ):
+        return ["" if value is None else str(value) for value in array.to_pylist()]
+    return ["" if value is None else value for value in array.to_pylist()]
+
+
+class ColumnarFile(FileReader):
+    """
+    columnar file base class, the row count and the header come from the format
+    metadata and only the validated columns are read, in chunks
+    """
+
+    supports_column_chunks: bool = True
+
+    def __init__(
+        self,
+        config: Config,
+        file_name: str,
+        column_names: List[str],
+        resource_guard: Optional[ResourceGuard] = None,
+    ):
+        self.config: Config = config
+        self.name: str = file_name
+        self.resource_guard: Optional[ResourceGuard] = resource_guard
+        self.size: int = get_file_size(self.name)
+        self.column_names: List[str] = column_names
+        # without a configured header, columns are identified by their index
+        self.header: Optional[List[str]] = (
+            list(column_names) if config.file_metadata.file_has_header else None
+        )
+
+    @abstractmethod
+    def _iter_batches(self, column_names: List[str]) -> Iterator:
+        """
+        method returning the record batches iterator, reading only the listed columns
+        :param column_names:
+        :return:
+        """
+
+    def get_first_row_column_count(self) -> int:
+        """
+        method to get the column count from the file schema
+        :return:
+        """
+        return len(self.column_names)
+
+    def column_chunk_generator(self, column_identifiers: List[str]) -> Generator:
+        """
+        file reading generator method, yielding the first row number of a chunk
+        and column identifiers with the chunk column values as dict
+        :param column_identifiers:
+        :return:
+        """
+        column_names: List[str] = [
+            identifier if self.header else self.column_names[int(identifier)]
+            for identifier in column_identifiers
+        ]
+
+        # row numbers follow the csv file convention, the header is the row number 1
+        row_number: int = 2 if self.header else 1
+        for batch in self._iter_batches(column_names):
+            if self.resource_guard is not None:
+                self.resource_guard.check()
+
+            chunk: Dict[str, List[str]] = {
+                identifier: _column_values(batch.column(column_name))
+                for identifier, column_name in zip(column_identifiers, column_names)
+            }
+            yield row_number, chunk
+            row_number += batch.num_rows
+
+    def file_read_generator(self) -> Generator:
+        """
+        file reading generator method, yielding row number and column identifiers with values as dict
+        :return:
+        """
+        column_identifiers: List[str] = self.header or [
+            str(index) for index in range(len(self.column_names))
+        ]
+        for row_number, chunk in self.column_chunk_generator(column_identifiers):
+            for offset, values in enumerate(zip(*chunk.values())):
+                yield row_number + offset, dict(zip(column_identifiers, values))
+
+
+class ParquetFile(ColumnarFile):
+    """
+    Parquet file reader class
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        file_name: str,
+        resource_guard: Optional[ResourceGuard] = None,
+    ):
+        self._source: Optional[IO] = (
+            None
+            if split_archive_member_name(file_name) is None
+            else open_binary(file_name)
+        )
+        self._parquet_file = parquet.ParquetFile(self._source or file_name)
+        super().__init__(
+            config,
+            file_name,
+            self._parquet_file.schema_arrow.names,
+            resource_guard=resource_guard,
+        )
+
+    @property
+    def data_row_count(self) -> int:
+        """
+        file data row count property, read from the parquet footer
+        :return:
+        """
+        return self._parquet_file.metadata.num_rows
+
+    def _iter_batches(self, column_names: List[str]) -> Iterator:
+        return self._parquet_file.iter_batches(
+            batch_size=COLUMN_CHUNK_SIZE, columns=column_names
+        )
+
+    def close_file_handler(self) -> None:
+        """
+        method for closing the file handler after validations finished
+        :return:
+        """
+        self._parquet_file.close()
+        if self._source is not None:
+            self._source.close()
+
+
+class ArrowFile(ColumnarFile):
+    """
+    Arrow IPC file format reader class, the file is memory mapped
+    so the record batches are read without copying, archive members are streamed
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        file_name: str,
+        resource_guard: Optional[ResourceGuard] = None,
+    ):
+        self._source = (
+            pyarrow.memory_map(file_name, "r")
+            if split_archive_member_name(file_name) is None
+            else open_binary(file_name)
+        )
+        self._reader = ipc.open_file(self._source)
+        super().__init__(
+            config, file_name, self._reader.schema.names, resource_guard=resource_guard
+        )
+
+    @property
+    def data_row_count(self) -> int:
+        """
+        file data row count property, summed up from the record batch metadata
+        :return:
+        """
+        return sum(
+            self._reader.get_batch(index).num_rows
+            for index in range(self._reader.num_record_batches)
+        )
+
+    def _iter_batches(self, column_names: List[str]) -> Iterator:
+        for index in range(self._reader.num_record_batches):
+            yield self._reader.get_batch(index).select(column_names)
+
+    def close_file_handler(self) -> None:
+        """
+        method for closing the file handler after validations finished
+        :return:
+        """
+        self._source.close()
+
+
+_COLUMNAR_FILE_CLASSES: dict = {
+    "parquet": ParquetFile,
+    "arrow": ArrowFile,
+}
+
+
+def open_columnar_file(
+    config: Config, file_name: str, resource_guard: Optional[ResourceGuard] = None
+) -> ColumnarFile:
+    """
+    function opening a columnar file with the reader of the configured file format
+    :param config:
+    :param file_name:
+    :param resource_guard:
+    :return:
+    """
+    if pyarrow is None:
+        raise InvalidConfigException(
+            f"file_format {config.file_metadata.file_format} needs the pyarrow package, "
+            f"install it using pip install csv_file_validator[columnar]"
+        )
+
+    return _COLUMNAR_FILE_CLASSES[config.file_metadata.file_format](
+        config, file_name, resource_guard=resource_guard
+    )
@@ -1,25 +1,51 @@
 """
 config.py
 """
+import codecs
+import json
+import os
+from typing import List, Optional
+
 from csv_file_validator.exceptions import InvalidConfigException
 
+FILE_FORMATS: tuple = ("csv", "parquet", "arrow", "fixed_width")
+# the failed row rules are reported like column:rule name under this key
+ROW_RULES_KEY: str = "row_validation_rules"
+
 
 class FileMetadata:
     """
     file metadata class
     """
 
+    __slots__ = (
+        "file_value_separator",
+        "file_value_quote_char",
+        "file_row_terminator",
+        "file_has_header",
+        "file_format",
+        "file_encoding",
+        "file_fixed_width_columns",
+    )
+
     def __init__(
         self,
         file_value_separator,
         file_value_quote_char,
         file_row_terminator,
         file_has_header,
+        file_format="csv",
+        file_encoding="utf8",
+        file_fixed_width_columns=None,
     ):
         self.file_value_separator: str = file_value_separator
         self.file_value_quote_char: str = file_value_quote_char
         self.file_row_terminator: str = file_row_terminator
         self.file_has_header: bool = file_has_header
+        self.file_format: str = file_format
+        self.file_encoding: str = file_encoding
+        # [offset, width] character positions of the fixed width file columns
+        self.file_fixed_width_columns: Optional[List[List[int]]] = file_fixed_width_columns
 
 
 class Config:
@@ -27,10 +53,27 @@ class Config:
     config class
     """
 
-    def __init__(self, file_metadata, file_validation_rules, column_validation_rules):
+    __slots__ = (
+        "file_metadata",
+        "file_validation_rules",
+        "column_validation_rules",
+        "row_validation_rules",
+    )
+
+    def __init__(
+        self,
+        file_metadata,
+        file_validation_rules,
+        column_validation_rules,
+        row_validation_rules=None,
+    ):
         self.file_metadata: FileMetadata = FileMetadata(**file_metadata)
         self.file_validation_rules: dict = file_validation_rules
         self.column_validation_rules: dict = column_validation_rules
+        # cross column rules, expressions over the column values of a row
+        self.row_validation_rules: dict = (
+            {} if row_validation_rules is None else row_validation_rules
+        )
         self._check_data_types()
 
     def _check_data_types(self):
@@ -47,15 +90,59 @@ class Config:
         if type(self.file_metadata.file_has_header) is not bool:
             raise ValueError
 
+        if self.file_metadata.file_format not in FILE_FORMATS:
+            raise ValueError(
+                f"file_format {self.file_metadata.file_format} not in {FILE_FORMATS}"
+            )
+
+        if self.file_metadata.file_format == "fixed_width":
+            self._check_fixed_width_columns()
+
+        try:
+            codecs.lookup(self.file_metadata.file_encoding)
+        except (LookupError, TypeError):
+            raise ValueError(
+                f"file_encoding {self.file_metadata.file_encoding} is not a known encoding"
+            )
+
         if any(
             x is not dict
             for x in [
                 type(self.column_validation_rules),
                 type(self.file_validation_rules),
+                type(self.row_validation_rules),
             ]
         ):
             raise ValueError
 
+        if self.row_validation_rules:
+            # the expressions module parses the row rules with ast, so it is imported
+            # only by the configs with row rules, compiled once here to report the invalid ones
+            # pylint: disable=import-outside-toplevel
+            from csv_file_validator.expressions import get_row_rule_columns
+
+            get_row_rule_columns(self.row_validation_rules)
+
+    def _check_fixed_width_columns(self):
+        fixed_width_columns = self.file_metadata.file_fixed_width_columns
+        if not isinstance(fixed_width_columns, list) or not fixed_width_columns:
+            raise ValueError(
+                "file_fixed_width_columns list of [offset, width] is needed "
+                "for the fixed_width file_format"
+            )
+
+        for column in fixed_width_columns:
+            if (
+                not isinstance(column, list)
+                or len(column) != 2
+                or any(type(x) is not int for x in column)
+                or column[0] < 0
+                or column[1] <= 0
+            ):
+                raise ValueError(
+                    f"file_fixed_width_columns item {column} is not a valid [offset, width]"
+                )
+
 
 def get_validated_config(config: dict) -> Config:
     """
@@ -66,8 +153,10 @@ def get_validated_config(config: dict) -> Config:
     if not config.get("file_metadata"):
         raise InvalidConfigException("config file missing metadata object")
 
-    if not config.get("file_validation_rules") and not config.get(
-        "column_validation_rules"
+    if (
+        not config.get("file_validation_rules")
+        and not config.get("column_validation_rules")
+        and not config.get("row_validation_rules")
     ):
         raise InvalidConfigException(
             "config file missing file_validation_rules object and "
@@ -76,8 +165,37 @@ def get_validated_config(config: dict) -> Config:
 
     config.setdefault("file_validation_rules", dict())
     config.setdefault("column_validation_rules", dict())
+    config.setdefault("row_validation_rules", dict())
 
     try:
         return Config(**config)
     except (ValueError, TypeError) as config_err:
         raise InvalidConfigException(config_err)
+
+
+def load_config(config_file_loc: str) -> Config:
+    """
+    function loading and validating the config file
+    :param config_file_loc:
+    :return:
+    """
+    if not os.path.isfile(config_file_loc):
+        raise InvalidConfigException("Could not load config file - not a valid file")
+
+    with open(config_file_loc, mode="r") as json_file:
+        try:
+            parsed_config = json.load(json_file)
+        except json.JSONDecodeError as json_decode_err:
+            raise InvalidConfigException(
+                f"Could not load config - valid file, "
+                f"JSON decode error: {json_decode_err}"
+            )
+        except Exception as exc:
+            raise InvalidConfigException(
+                f"Could not load config - valid file, " f"general exception: {exc}"
+            )
+
+    if not isinstance(parsed_config, dict):
+        raise InvalidConfigException("config file is not a JSON object")
+
+    return get_validated_config(parsed_config)
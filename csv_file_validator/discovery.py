@@ -0,0 +1,151 @@
+"""
+file discovery module
+"""
+import fnmatch
+import os
+import re
+from itertools import islice
+from typing import Iterator, List, Optional, Pattern, Sequence
+
+from csv_file_validator.archive import (
+    is_archive,
+    iter_archive_members,
+    split_archive_member_name,
+)
+from csv_file_validator.validation_functions import get_mapped_validation_function
+
+# file validation rules cheap enough to be evaluated on the file name before opening it
+PREFILTER_FILE_VALIDATION_RULES: tuple = ("file_extension", "file_name_file_mask")
+
+
+def _compile_globs(globs: Sequence[str]) -> Optional[Pattern]:
+    """
+    function compiling the glob patterns into a single regex pattern
+    :param globs:
+    :return:
+    """
+    if not globs:
+        return None
+    return re.compile("|".join(fnmatch.translate(glob) for glob in globs))
+
+
+class FileNameFilter:
+    """
+    file name filter class, matching the include and exclude glob patterns
+    and the file name based file validation rules
+    """
+
+    __slots__ = ("_include", "_exclude", "_prefilter_rules")
+
+    def __init__(
+        self,
+        include: Sequence[str] = (),
+        exclude: Sequence[str] = (),
+        file_validation_rules: Optional[dict] = None,
+    ):
+        self._include: Optional[Pattern] = _compile_globs(include)
+        self._exclude: Optional[Pattern] = _compile_globs(exclude)
+        self._prefilter_rules: List[tuple] = [
+            (get_mapped_validation_function(rule), validation_value)
+            for rule, validation_value in (file_validation_rules or {}).items()
+            if rule in PREFILTER_FILE_VALIDATION_RULES
+        ]
+
+    def matches(self, file_name: str, relative_path: str) -> bool:
+        """
+        method checking if the file should be validated, glob patterns
+        are matched against the file name and the path relative to the location
+        :param file_name:
+        :param relative_path:
+        :return:
+        """
+        if self._include is not None and not (
+            self._include.match(file_name) or self._include.match(relative_path)
+        ):
+            return False
+
+        if self._exclude is not None and (
+            self._exclude.match(file_name) or self._exclude.match(relative_path)
+        ):
+            return False
+
+        return all(
+            func(file_name=file_name, validation_value=validation_value) == 0
+            for func, validation_value in self._prefilter_rules
+        )
+
+
+def _scan_folder(folder: str, recursive: bool) -> Iterator[os.DirEntry]:
+    """
+    generator yielding the folder file entries using os.scandir, sub folders
+    are scanned depth first when recursive, entries are not stat-ed
+    :param folder:
+    :param recursive:
+    :return:
+    """
+    folders: List[str] = [folder]
+    while folders:
+        with os.scandir(folders.pop()) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    yield entry
+                elif recursive and entry.is_dir(follow_symlinks=False):
+                    folders.append(entry.path)
+
+
+def _iter_matching_files(
+    location: str, recursive: bool, file_name_filter: FileNameFilter
+) -> Iterator[str]:
+    """
+    generator yielding the matching files in the location, archives are expanded to their members
+    :param location:
+    :param recursive:
+    :param file_name_filter:
+    :return:
+    """
+    if os.path.isdir(location):
+        # scandir entry paths are joined to the location, so the relative path is a suffix
+        prefix_length: int = len(os.path.join(location, ""))
+        entries = (
+            (entry.path, entry.path[prefix_length:])
+            for entry in _scan_folder(location, recursive)
+        )
+    else:
+        entries = iter([(location, os.path.basename(location))])
+
+    for path, relative_path in entries:
+        if is_archive(path):
+            for member in iter_archive_members(path):
+                _, member_path = split_archive_member_name(member)
+                if file_name_filter.matches(os.path.basename(member_path), member_path):
+                    yield member
+        elif file_name_filter.matches(os.path.basename(path), relative_path):
+            yield path
+
+
+def iter_file_locations(
+    location: str,
+    recursive: bool = False,
+    include: Sequence[str] = (),
+    exclude: Sequence[str] = (),
+    max_files: Optional[int] = None,
+    file_validation_rules: Optional[dict] = None,
+) -> Iterator[str]:
+    """
+    generator lazily yielding the files to validate from a folder or an archive location,
+    with file_validation_rules passed, files failing the file name based rules are skipped
+    before they get opened
+    :param location:
+    :param recursive:
+    :param include:
+    :param exclude:
+    :param max_files:
+    :param file_validation_rules:
+    :return:
+    """
+    file_name_filter: FileNameFilter = FileNameFilter(
+        include=include, exclude=exclude, file_validation_rules=file_validation_rules
+    )
+    yield from islice(
+        _iter_matching_files(location, recursive, file_name_filter), max_files
+    )
@@ -0,0 +1,511 @@
+"""
+distributed validation module, a coordinator splits the files to validation tasks
+and distributes them over TCP or a local socket to the worker processes
+"""
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from collections import deque
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener, wait
+from queue import Empty, SimpleQueue
+from typing import Deque, Dict, Iterable, Iterator, List, Optional
+
+from csv_file_validator.config import Config
+from csv_file_validator.file import File, RecordRange
+from csv_file_validator.processing import process_file, validate_file_location
+from csv_file_validator.routing import ConfigRouter
+from csv_file_validator.settings_parser import Settings
+from csv_file_validator.summary import ValidationStats
+from csv_file_validator.validation import (
+    get_most_severe_result,
+    ValidationResultEnum,
+    ValidationResultItem,
+)
+
+logger = logging.getLogger(__name__)
+
+# environment variable holding the authentication key shared by the coordinator and the workers
+AUTHKEY_ENV_VARIABLE: str = "CSV_FILE_VALIDATOR_AUTHKEY"
+MAX_TASK_RETRIES: int = 2
+_WAIT_TIMEOUT_SECONDS: float = 0.1
+
+
+class ValidationTask:
+    """
+    validation task class, a whole file, the file level validations of a split file
+    or the column validations of a byte range of a split file
+    """
+
+    __slots__ = (
+        "task_id",
+        "file_name",
+        "record_range",
+        "validate_columns",
+        "config_index",
+        "attempts",
+    )
+
+    def __init__(
+        self,
+        task_id: int,
+        file_name: str,
+        record_range: Optional[RecordRange] = None,
+        validate_columns: bool = True,
+        config_index: int = 0,
+    ):
+        self.task_id: int = task_id
+        self.file_name: str = file_name
+        # index of the file config in the configs sent to the workers
+        self.config_index: int = config_index
+        self.record_range: Optional[RecordRange] = record_range
+        self.validate_columns: bool = validate_columns
+        self.attempts: int = 0
+
+
+class TaskResult:
+    """
+    validation task result class, holding the statistics and the log records of the task validation
+    """
+
+    __slots__ = ("task_id", "result", "stats", "log_records")
+
+    def __init__(
+        self,
+        task_id: int,
+        result: ValidationResultEnum,
+        stats: ValidationStats,
+        log_records: List[logging.LogRecord],
+    ):
+        self.task_id: int = task_id
+        self.result: ValidationResultEnum = result
+        self.stats: ValidationStats = stats
+        self.log_records: List[logging.LogRecord] = log_records
+
+
+class _LogRecordCollector(logging.Handler):
+    """
+    logging handler collecting the log records of a task, to be replayed by the coordinator
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.records: List[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # the record is sent to the coordinator, so the message gets formatted here
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        self.records.append(record)
+
+
+def execute_task(config: Config, settings: Settings, task: ValidationTask) -> TaskResult:
+    """
+    function executing a validation task, collecting its log records
+    :param config:
+    :param settings:
+    :param task:
+    :return:
+    """
+    collector: _LogRecordCollector = _LogRecordCollector()
+    stats: ValidationStats = ValidationStats()
+    root_logger: logging.Logger = logging.getLogger()
+    root_logger.addHandler(collector)
+    try:
+        result: ValidationResultEnum = process_file(
+            config=config,
+            settings=settings,
+            file_name=task.file_name,
+            record_range=task.record_range,
+            validate_columns=task.validate_columns,
+            stats=stats,
+        )
+    except Exception as exc:
+        logger.error("File %s could not be validated, %s", task.file_name, exc)
+        result = ValidationResultEnum.COULD_NOT_PROCESS
+    finally:
+        root_logger.removeHandler(collector)
+    return TaskResult(task.task_id, result, stats, collector.records)
+
+
+def run_worker(address, authkey: bytes) -> None:
+    """
+    function running a worker, the worker connects to the coordinator, receives
+    the configs and the settings and then executes tasks until it gets None
+    :param address:
+    :param authkey:
+    :return:
+    """
+    with Client(address, authkey=authkey) as connection:
+        configs, settings = connection.recv()
+
+        # log records are only collected and sent to the coordinator
+        root_logger: logging.Logger = logging.getLogger()
+        for handler in list(root_logger.handlers):
+            root_logger.removeHandler(handler)
+        if settings.logging_level == "OFF":
+            logging.disable(logging.CRITICAL)
+        else:
+            root_logger.setLevel(settings.logging_level)
+
+        for task in iter(connection.recv, None):
+            connection.send(execute_task(configs[task.config_index], settings, task))
+
+
+class _FileJob:
+    """
+    file job class, merging the task results of a file
+    """
+
+    __slots__ = ("file_name", "remaining_tasks", "result", "stats", "_started")
+
+    def __init__(self, file_name: str, task_count: int):
+        self.file_name: str = file_name
+        self.remaining_tasks: int = task_count
+        self.result: ValidationResultEnum = ValidationResultEnum.SUCCESS
+        self.stats: ValidationStats = ValidationStats()
+        self._started: float = time.perf_counter()
+
+    def add_result(self, task_result: TaskResult) -> None:
+        """
+        method merging a task result to the file result
+        :param task_result:
+        :return:
+        """
+        self.remaining_tasks -= 1
+        self.result = get_most_severe_result((self.result, task_result.result))
+        self.stats.merge(task_result.stats)
+        if self.remaining_tasks == 0:
+            self.stats.duration_seconds = time.perf_counter() - self._started
+
+
+class Coordinator:
+    """
+    coordinator class, listening for the workers on the address, starting the local workers
+    and distributing the validation tasks, the tasks of a worker which disconnected are retried,
+    with a config router every file is validated against the config of its route
+    """
+
+    def __init__(
+        self,
+        config: Optional[Config],
+        settings: Settings,
+        address=("localhost", 0),
+        authkey: Optional[bytes] = None,
+        local_workers: int = 0,
+        split_bytes: Optional[int] = None,
+        max_task_retries: int = MAX_TASK_RETRIES,
+        config_router: Optional[ConfigRouter] = None,
+    ):
+        self.config_router: Optional[ConfigRouter] = config_router
+        # all the configs are sent to every worker once, the tasks refer to them by index
+        self.configs: List[Config] = config_router.configs if config_router else [config]
+        self.settings: Settings = settings
+        self.authkey: bytes = authkey or os.urandom(32)
+        self.local_workers: int = local_workers
+        self.split_bytes: Optional[int] = split_bytes
+        self.max_task_retries: int = max_task_retries
+        self._listener: Listener = Listener(address, authkey=self.authkey)
+        self._new_connections: SimpleQueue = SimpleQueue()
+        self._worker_processes: List[multiprocessing.Process] = []
+        self._task_ids: Iterator[int] = iter(range(sys.maxsize))
+        self._closing: bool = False
+        self._accept_thread: threading.Thread = threading.Thread(
+            target=self._accept_connections, daemon=True
+        )
+
+    @property
+    def address(self):
+        """
+        coordinator listener address property
+        :return:
+        """
+        return self._listener.address
+
+    def _accept_connections(self) -> None:
+        """
+        method accepting the worker connections until the listener gets closed
+        :return:
+        """
+        while True:
+            try:
+                connection: Connection = self._listener.accept()
+            except (AuthenticationError, EOFError, ConnectionError) as exc:
+                logger.warning("Worker connection refused, %s", exc)
+                continue
+            except OSError:
+                return
+
+            if self._closing:
+                connection.close()
+                return
+            self._new_connections.put(connection)
+
+    def _close_listener(self) -> None:
+        """
+        method closing the listener, the accepting thread is woken up by a last connection
+        :return:
+        """
+        self._closing = True
+        if self._accept_thread.is_alive():
+            try:
+                Client(self.address, authkey=self.authkey).close()
+            except OSError:
+                pass
+        self._listener.close()
+
+    def _start_local_workers(self) -> None:
+        """
+        method starting the local worker processes, replacing the ones which died
+        :return:
+        """
+        self._worker_processes = [
+            process for process in self._worker_processes if process.is_alive()
+        ]
+        while len(self._worker_processes) < self.local_workers:
+            process: multiprocessing.Process = multiprocessing.Process(
+                target=run_worker, args=(self.address, self.authkey), daemon=True
+            )
+            process.start()
+            self._worker_processes.append(process)
+
+    def _plan_tasks(self, file_name: str, config_index: int) -> List[ValidationTask]:
+        """
+        method splitting a file to validation tasks, csv files bigger than split_bytes
+        get their file level validations and the column validations of every
+        byte range of complete records in separate tasks
+        :param file_name:
+        :param config_index:
+        :return:
+        """
+        config: Config = self.configs[config_index]
+        record_ranges: List[RecordRange] = []
+        if (
+            self.split_bytes
+            # the quarantine outputs are written by a single pass over the whole file
+            and not self.settings.quarantine_directory
+            and config.file_metadata.file_format == "csv"
+            and (config.column_validation_rules or config.row_validation_rules)
+        ):
+            try:
+                file: File = File(config, file_name)
+                if file.size > self.split_bytes:
+                    record_ranges = file.get_record_ranges(self.split_bytes)
+                file.close_file_handler()
+            except Exception as exc:
+                # the whole file task reports the issue
+                logger.debug("File %s could not be split, %s", file_name, exc)
+
+        if len(record_ranges) < 2:
+            return [
+                ValidationTask(next(self._task_ids), file_name, config_index=config_index)
+            ]
+
+        return [
+            ValidationTask(
+                next(self._task_ids),
+                file_name,
+                validate_columns=False,
+                config_index=config_index,
+            )
+        ] + [
+            ValidationTask(
+                next(self._task_ids),
+                file_name,
+                record_range=record_range,
+                config_index=config_index,
+            )
+            for record_range in record_ranges
+        ]
+
+    def _get_config_index(self, file_name: str) -> Optional[int]:
+        """
+        method returning the index of the file config, None when no route matches the file
+        :param file_name:
+        :return:
+        """
+        if self.config_router is None:
+            return 0
+        return self.config_router.get_route_index(file_name)
+
+    def iter_validation_results(
+        self, file_locations: Iterable[str]
+    ) -> Iterator[ValidationResultItem]:
+        """
+        generator distributing the validation tasks of the files to the workers, yielding
+        a result item as soon as all the tasks of a file finished, the files are split
+        lazily, only when a worker is idle
+        :param file_locations:
+        :return:
+        """
+        file_locations = iter(file_locations)
+        pending_tasks: Deque[ValidationTask] = deque()
+        file_jobs: Dict[int, _FileJob] = {}
+        idle_connections: List[Connection] = []
+        assigned_tasks: Dict[Connection, ValidationTask] = {}
+        files_exhausted: bool = False
+
+        self._accept_thread.start()
+
+        try:
+            while True:
+                if files_exhausted and not assigned_tasks and not pending_tasks:
+                    return
+
+                if not assigned_tasks and not idle_connections:
+                    # no worker connected yet or all of them disconnected
+                    self._start_local_workers()
+                    try:
+                        self._add_connection(
+                            self._new_connections.get(timeout=_WAIT_TIMEOUT_SECONDS),
+                            idle_connections,
+                        )
+                    except Empty:
+                        continue
+
+                while True:
+                    try:
+                        self._add_connection(self._new_connections.get_nowait(), idle_connections)
+                    except Empty:
+                        break
+
+                while idle_connections:
+                    if not pending_tasks:
+                        file_name: Optional[str] = next(file_locations, None)
+                        if file_name is None:
+                            files_exhausted = True
+                            break
+                        config_index: Optional[int] = self._get_config_index(file_name)
+                        if config_index is None:
+                            # files without a route fail without being sent to a worker
+                            yield validate_file_location(None, self.settings, file_name)
+                            continue
+                        tasks: List[ValidationTask] = self._plan_tasks(file_name, config_index)
+                        file_job: _FileJob = _FileJob(file_name, len(tasks))
+                        for task in tasks:
+                            file_jobs[task.task_id] = file_job
+                        pending_tasks.extend(tasks)
+
+                    connection = idle_connections.pop()
+                    task = pending_tasks.popleft()
+                    try:
+                        connection.send(task)
+                    except OSError:
+                        pending_tasks.appendleft(task)
+                        connection.close()
+                        continue
+                    assigned_tasks[connection] = task
+
+                for connection in wait(list(assigned_tasks), timeout=_WAIT_TIMEOUT_SECONDS):
+                    task = assigned_tasks.pop(connection)
+                    try:
+                        task_result: TaskResult = connection.recv()
+                    except (EOFError, OSError):
+                        connection.close()
+                        task_result = self._retry_task(task, pending_tasks)
+                        if task_result is None:
+                            continue
+                    else:
+                        idle_connections.append(connection)
+
+                    for log_record in task_result.log_records:
+                        logging.getLogger(log_record.name).handle(log_record)
+
+                    file_job = file_jobs.pop(task_result.task_id)
+                    file_job.add_result(task_result)
+                    if file_job.remaining_tasks == 0:
+                        yield ValidationResultItem(
+                            file_name=file_job.file_name,
+                            result=file_job.result,
+                            stats=file_job.stats,
+                        )
+        finally:
+            for connection in idle_connections + list(assigned_tasks):
+                try:
+                    connection.send(None)
+                except OSError:
+                    pass
+                connection.close()
+            self._close_listener()
+            for process in self._worker_processes:
+                process.join(timeout=_WAIT_TIMEOUT_SECONDS * 10)
+
+    def _add_connection(
+        self, connection: Connection, idle_connections: List[Connection]
+    ) -> None:
+        """
+        method sending the configs and the settings to a new worker connection
+        :param connection:
+        :param idle_connections:
+        :return:
+        """
+        try:
+            connection.send((self.configs, self.settings))
+        except OSError:
+            connection.close()
+            return
+        idle_connections.append(connection)
+
+    def _retry_task(
+        self, task: ValidationTask, pending_tasks: Deque[ValidationTask]
+    ) -> Optional[TaskResult]:
+        """
+        method requeuing the task of a disconnected worker, returning the COULD_NOT_PROCESS
+        task result once the task ran out of retries
+        :param task:
+        :param pending_tasks:
+        :return:
+        """
+        task.attempts += 1
+        self._start_local_workers()
+
+        if task.attempts > self.max_task_retries:
+            logger.error(
+                "File %s could not be validated, worker disconnected %s times",
+                task.file_name,
+                task.attempts,
+            )
+            return TaskResult(
+                task.task_id, ValidationResultEnum.COULD_NOT_PROCESS, ValidationStats(), []
+            )
+
+        logger.warning(
+            "Worker disconnected while validating %s, retrying the task", task.file_name
+        )
+        pending_tasks.appendleft(task)
+        return None
+
+
+def parse_address(address: str):
+    """
+    function parsing a HOST:PORT TCP address, other addresses are used as local socket paths
+    :param address:
+    :return:
+    """
+    host, separator, port = address.rpartition(":")
+    if separator and port.isdigit():
+        return host or "localhost", int(port)
+    return address
+
+
+def get_authkey() -> Optional[bytes]:
+    """
+    function returning the authentication key set in the environment
+    :return:
+    """
+    authkey: Optional[str] = os.environ.get(AUTHKEY_ENV_VARIABLE)
+    return authkey.encode("utf8") if authkey else None
+
+
+if __name__ == "__main__":
+    # python -m csv_file_validator.distributed HOST:PORT
+    if len(sys.argv) != 2 or get_authkey() is None:
+        sys.exit(
+            f"usage: {AUTHKEY_ENV_VARIABLE}=<key> "
+            f"python -m csv_file_validator.distributed <coordinator address>"
+        )
+    run_worker(parse_address(sys.argv[1]), get_authkey())
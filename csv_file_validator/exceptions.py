@@ -37,3 +37,9 @@ class FoundValidationErrorsException(Exception):
     """
     Found validation errors Exception custom exception type
     """
+
+
+class ResourceLimitExceededException(Exception):
+    """
+    Resource limit exceeded Exception custom exception type
+    """
@@ -0,0 +1,439 @@
+"""
+expressions module, the row validation rules are expressions over the column values
+of a row, like Last_Login >= Account_Created, optionally checked only for the rows
+matching a condition, like {"if": "Payment_Type == 'Visa'", "then": "matches(Card_Number, '4')"},
+the columns with a typed allow_data_type rule are compared as parsed values
+"""
+import ast
+import re
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from csv_file_validator.exceptions import InvalidConfigException, InvalidLineColumnCountException
+from csv_file_validator.numeric import get_type_check
+from csv_file_validator.validation_functions import log_validation_error, parse_datetime_value
+
+PARSED_VALUES_MAX_SIZE: int = 1024
+
+_ALLOWED_NODES: tuple = (
+    ast.Expression,
+    ast.BoolOp,
+    ast.And,
+    ast.Or,
+    ast.UnaryOp,
+    ast.Not,
+    ast.USub,
+    ast.UAdd,
+    ast.BinOp,
+    ast.Add,
+    ast.Sub,
+    ast.Mult,
+    ast.Div,
+    ast.Compare,
+    ast.Eq,
+    ast.NotEq,
+    ast.Lt,
+    ast.LtE,
+    ast.Gt,
+    ast.GtE,
+    ast.In,
+    ast.NotIn,
+    ast.Call,
+    ast.Name,
+    ast.Load,
+    ast.Constant,
+    ast.List,
+    ast.Tuple,
+)
+# errors of an expression evaluation counted as a failed row rule
+_EVALUATION_ERRORS: tuple = (
+    ValueError,
+    TypeError,
+    KeyError,
+    IndexError,
+    AttributeError,
+    ArithmeticError,
+    re.error,
+)
+
+
+def _to_datetime(value, data_type: str = "datetime") -> datetime:
+    """
+    expression function converting a value to a datetime, values already
+    parsed by the allow_data_type rule of their column are passed through
+    :param value:
+    :param data_type:
+    :return:
+    """
+    if isinstance(value, datetime):
+        return value
+    return parse_datetime_value(
+        data_type if data_type == "datetime" else f"datetime.{data_type}", value
+    )
+
+
+def _matches(value, pattern: str) -> bool:
+    """
+    expression function checking the value against a regex, like the allow_regex rule
+    :param value:
+    :param pattern:
+    :return:
+    """
+    return re.match(pattern, str(value)) is not None
+
+
+def _is_empty(value) -> bool:
+    """
+    expression function checking the value is empty
+    :param value:
+    :return:
+    """
+    return value == ""
+
+
+# functions available to the expressions, besides col("column name")
+# returning the value of a column which is not a valid identifier
+_FUNCTIONS: Dict[str, Callable] = {
+    "matches": _matches,
+    "empty": _is_empty,
+    "datetime": _to_datetime,
+    "int": int,
+    "float": float,
+    "str": str,
+    "len": len,
+    "abs": abs,
+}
+_COLUMN_FUNCTION: str = "col"
+
+
+def _get_parse_function(data_type: str) -> Optional[Callable[[str], object]]:
+    """
+    function returning the function parsing the column values of an allow_data_type
+    data type, values not passing the data type check raise ValueError,
+    None for the data types compared as strings
+    :param data_type:
+    :return:
+    """
+    if not isinstance(data_type, str):
+        return None
+
+    if data_type == "datetime" or data_type.startswith("datetime."):
+        return lambda column_value: parse_datetime_value(data_type, column_value)
+
+    type_check: Optional[Callable[[str], object]] = get_type_check(data_type)
+    if type_check is None or data_type == "bool":
+        return None
+
+    if data_type == "float":
+        convert: Callable = float
+    elif data_type.startswith("decimal"):
+        import decimal  # pylint: disable=import-outside-toplevel
+
+        convert = decimal.Decimal
+    else:
+        convert = int
+
+    def parse(column_value: str):
+        if not type_check(column_value):
+            raise ValueError(f"{column_value} is not a {data_type} value")
+        return convert(column_value)
+
+    return parse
+
+
+class ColumnValueParser:
+    """
+    column value parser class, the parsed values are cached so that a value checked
+    by the allow_data_type rule of its column is not parsed again by the row rules
+    """
+
+    __slots__ = ("data_type", "_parse", "_parsed_values")
+
+    def __init__(self, data_type: str, parse: Callable[[str], object]):
+        self.data_type: str = data_type
+        self._parse: Callable[[str], object] = parse
+        self._parsed_values: dict = {}
+
+    def parse(self, column_value: str):
+        """
+        method returning the parsed column value, raising ValueError for a value not
+        being of the data type, failed values are parsed again every time
+        :param column_value:
+        :return:
+        """
+        parsed_value = self._parsed_values.get(column_value)
+        if parsed_value is None:
+            parsed_value = self._parse(column_value)
+            if len(self._parsed_values) >= PARSED_VALUES_MAX_SIZE:
+                self._parsed_values.clear()
+            self._parsed_values[column_value] = parsed_value
+        return parsed_value
+
+    def get_validation_function(self) -> Callable:
+        """
+        method returning the allow_data_type validation function parsing the values
+        by the parser, so the parsed values are shared with the row rules
+        :return:
+        """
+        parse: Callable = self.parse
+
+        def check_column_allow_data_type(**kwargs) -> int:
+            parse(kwargs.get("column_value"))
+            return 0
+
+        return check_column_allow_data_type
+
+
+def compile_expression(expression: str) -> Tuple[object, List[str]]:
+    """
+    function compiling a row rule expression, returning the code object together with
+    the referenced columns, raising ValueError for an expression using anything else
+    than the comparisons, the boolean and arithmetic operators, the constants, the columns
+    and the expression functions
+    :param expression:
+    :return:
+    """
+    if not isinstance(expression, str):
+        raise ValueError(f"row rule expression {expression} is not a string")
+    try:
+        tree: ast.Expression = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as syntax_err:
+        raise ValueError(f"row rule expression {expression} is not valid, {syntax_err.msg}")
+
+    function_names: set = set()
+    columns: List[str] = []
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(
+                f"row rule expression {expression} cannot use {type(node).__name__}"
+            )
+        if not isinstance(node, ast.Call):
+            continue
+        if (
+            not isinstance(node.func, ast.Name)
+            or node.keywords
+            or node.func.id not in (*_FUNCTIONS, _COLUMN_FUNCTION)
+        ):
+            raise ValueError(
+                f"row rule expression {expression} calls an unknown function, "
+                f"the functions are {_COLUMN_FUNCTION}, {', '.join(_FUNCTIONS)}"
+            )
+        function_names.add(id(node.func))
+        if node.func.id == _COLUMN_FUNCTION:
+            if (
+                len(node.args) != 1
+                or not isinstance(node.args[0], ast.Constant)
+                or not isinstance(node.args[0].value, str)
+            ):
+                raise ValueError(
+                    f"row rule expression {expression} needs a column name string "
+                    f"in {_COLUMN_FUNCTION}()"
+                )
+            columns.append(node.args[0].value)
+        if node.func.id == "matches" and len(node.args) == 2 and isinstance(
+            node.args[1], ast.Constant
+        ):
+            try:
+                re.compile(node.args[1].value)
+            except (re.error, TypeError) as regex_err:
+                raise ValueError(f"row rule expression {expression} regex is not valid, {regex_err}")
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and id(node) not in function_names:
+            columns.append(node.id)
+
+    return compile(tree, "<row rule>", "eval"), list(dict.fromkeys(columns))
+
+
+class RowRule:
+    """
+    row validation rule class, the expression is checked only for the rows
+    matching the condition, if any
+    """
+
+    __slots__ = ("name", "validation_value", "columns", "condition", "expression")
+
+    def __init__(self, name: str, validation_value):
+        self.name: str = name
+        self.validation_value = validation_value
+
+        if isinstance(validation_value, dict):
+            if set(validation_value) != {"if", "then"}:
+                raise ValueError(
+                    f"row rule {name} needs an expression, or an if condition "
+                    f"and a then expression"
+                )
+            condition, condition_columns = compile_expression(validation_value["if"])
+            expression, expression_columns = compile_expression(validation_value["then"])
+            self.condition: Optional[object] = condition
+            self.columns: List[str] = list(dict.fromkeys(condition_columns + expression_columns))
+        else:
+            expression, self.columns = compile_expression(validation_value)
+            self.condition = None
+        self.expression: object = expression
+
+
+def get_row_rule_columns(row_validation_rules: dict) -> List[str]:
+    """
+    function returning the columns referenced by the row validation rules,
+    raising ValueError for a row rule which is not valid
+    :param row_validation_rules:
+    :return:
+    """
+    columns: List[str] = []
+    for name, validation_value in row_validation_rules.items():
+        columns.extend(RowRule(name, validation_value).columns)
+    return list(dict.fromkeys(columns))
+
+
+class _RowNamespace:
+    """
+    row namespace class, the expression names are resolved to the column values
+    of the current row, the names which are not columns raise KeyError
+    so the expression functions are found instead, a row missing a column
+    raises the Error of a missing column instead of failing the rule
+    """
+
+    __slots__ = ("row", "columns")
+
+    def __init__(self, columns: Dict[str, tuple]):
+        self.row = None
+        # the row key and the value parser by the column name
+        self.columns: Dict[str, tuple] = columns
+
+    def __getitem__(self, name: str):
+        row_key, value_parser = self.columns[name]
+        try:
+            column_value = self.row[row_key]
+        except IndexError:
+            raise InvalidLineColumnCountException(
+                f"row does not have the column {name} of the row validations"
+            )
+        except KeyError:
+            raise InvalidConfigException(
+                f"Row validations set in the config, but column {name} not found"
+            )
+        return column_value if value_parser is None else value_parser.parse(column_value)
+
+
+class RowRulePlan:
+    """
+    row rule plan class, holding the compiled row rules and the value parsers
+    of the referenced columns with a typed allow_data_type rule
+    """
+
+    __slots__ = (
+        "rules",
+        "columns",
+        "value_parsers",
+        "failure_counts",
+        "_named_namespace",
+        "_named_globals",
+        "_indexed_namespace",
+        "_indexed_globals",
+    )
+
+    def __init__(self, row_validation_rules: dict, column_validation_rules: dict):
+        self.rules: List[RowRule] = [
+            RowRule(name, validation_value)
+            for name, validation_value in row_validation_rules.items()
+        ]
+        self.columns: List[str] = list(
+            dict.fromkeys(column for rule in self.rules for column in rule.columns)
+        )
+        self.value_parsers: Dict[str, ColumnValueParser] = {}
+        for column in self.columns:
+            data_type = column_validation_rules.get(column, {}).get("allow_data_type")
+            parse: Optional[Callable] = _get_parse_function(data_type)
+            if parse is not None:
+                self.value_parsers[column] = ColumnValueParser(data_type, parse)
+        self.failure_counts: Counter = Counter()
+
+        # rows as dicts are addressed by the column names, rows as lists by the bound indexes
+        self._named_namespace: _RowNamespace = _RowNamespace(
+            {column: (column, self.value_parsers.get(column)) for column in self.columns}
+        )
+        self._named_globals: dict = self._get_globals(self._named_namespace)
+        self._indexed_namespace: _RowNamespace = _RowNamespace({})
+        self._indexed_globals: dict = self._get_globals(self._indexed_namespace)
+
+    @staticmethod
+    def _get_globals(namespace: _RowNamespace) -> dict:
+        """
+        method returning the expression globals, without any python builtins
+        :param namespace:
+        :return:
+        """
+        return {"__builtins__": {}, _COLUMN_FUNCTION: namespace.__getitem__, **_FUNCTIONS}
+
+    def bind_column_indexes(self, column_index_map: Dict[str, int]) -> None:
+        """
+        method resolving the referenced columns once to their row indexes
+        :param column_index_map:
+        :return:
+        """
+        self._indexed_namespace.columns = {
+            column: (column_index_map[column], self.value_parsers.get(column))
+            for column in self.columns
+        }
+
+    def get_failures(
+        self, row: Sequence[str], by_name: bool = False
+    ) -> List[Tuple[RowRule, Optional[Exception]]]:
+        """
+        method evaluating the row rules on a row, returning the failed rules together
+        with the Error raised by the expression, without counting or logging them
+        :param row: row values addressed by the bound indexes, or by the column names
+        :param by_name:
+        :return:
+        """
+        if by_name:
+            namespace, expression_globals = self._named_namespace, self._named_globals
+        else:
+            namespace, expression_globals = self._indexed_namespace, self._indexed_globals
+        namespace.row = row
+
+        failures: List[Tuple[RowRule, Optional[Exception]]] = []
+        for rule in self.rules:
+            try:
+                # pylint: disable=eval-used
+                if rule.condition is not None and not eval(
+                    rule.condition, expression_globals, namespace
+                ):
+                    continue
+                if not eval(rule.expression, expression_globals, namespace):
+                    failures.append((rule, None))
+            except _EVALUATION_ERRORS as err:
+                failures.append((rule, err))
+        return failures
+
+    def validate_failures(
+        self, row: Sequence[str], row_number: int, by_name: bool = False
+    ) -> List[Tuple[RowRule, Optional[Exception]]]:
+        """
+        method validating a row, returning the failed rules together
+        with the Error raised by the expression
+        :param row:
+        :param row_number:
+        :param by_name:
+        :return:
+        """
+        failures: List[Tuple[RowRule, Optional[Exception]]] = self.get_failures(row, by_name)
+        if not failures:
+            return failures
+
+        column_keys: Dict[str, tuple] = (
+            self._named_namespace if by_name else self._indexed_namespace
+        ).columns
+        for rule, err in failures:
+            self.failure_counts[rule.name] += 1
+            log_validation_error(
+                func_name=f"check_row_{rule.name}",
+                validation_value=rule.validation_value,
+                row_number=row_number,
+                column=", ".join(rule.columns),
+                column_value=", ".join(str(row[column_keys[column][0]]) for column in rule.columns),
+                Exception=err,
+            )
+        return failures
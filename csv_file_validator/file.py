@@ -1,13 +1,64 @@
 """
 file.py
 """
+import codecs
 import csv
-import os
+import io
+from abc import ABC, abstractmethod
 from collections.abc import Generator
-from typing import List, Optional, IO, Iterator
+from functools import partial
+from typing import Dict, List, Optional, IO, Iterator, Tuple
 
+from csv_file_validator.archive import get_file_size, open_binary, open_binary_range
 from csv_file_validator.config import Config
-from csv_file_validator.exceptions import InvalidLineColumnCountException
+from csv_file_validator.exceptions import (
+    InvalidLineColumnCountException,
+    ResourceLimitExceededException,
+)
+from csv_file_validator.resource_guard import CHECK_INTERVAL_ROWS, ResourceGuard
+
+ROW_COUNT_BLOCK_SIZE: int = 1024 * 1024
+# the file handle is opened with universal newlines, so the csv reader
+# splits records on a line feed, a carriage return or both
+_LINE_FEED: bytes = b"\n"
+_CARRIAGE_RETURN: bytes = b"\r"
+# utf-8 files are decoded skipping an optional byte order mark,
+# the utf-16 and utf-32 codecs handle the byte order mark on their own
+_UTF8_TEXT_ENCODING: str = "utf-8-sig"
+# csv.Error message raised by the csv reader on a field over csv.field_size_limit
+_FIELD_SIZE_LIMIT_ERROR: str = "field larger than field limit"
+
+
+def get_text_encoding(encoding: str) -> str:
+    """
+    function returning the codec name of the configured file encoding
+    the file text gets decoded with
+    :param encoding:
+    :return:
+    """
+    encoding = codecs.lookup(encoding).name
+    return _UTF8_TEXT_ENCODING if encoding == "utf-8" else encoding
+
+
+def is_ascii_compatible(encoding: str) -> bool:
+    """
+    function checking the record terminators are encoded as single ascii bytes,
+    which never occur inside other characters, so the records can be counted in bytes
+    :param encoding:
+    :return:
+    """
+    return "\r\n".encode(encoding) == _CARRIAGE_RETURN + _LINE_FEED
+
+
+def _raise_for_field_size_limit(csv_err: csv.Error) -> None:
+    """
+    function raising ResourceLimitExceededException in case the csv error
+    was caused by a field over the csv module field size limit
+    :param csv_err:
+    :return:
+    """
+    if _FIELD_SIZE_LIMIT_ERROR in str(csv_err):
+        raise ResourceLimitExceededException(str(csv_err))
 
 
 class CsvProperties:
@@ -15,25 +66,46 @@ class CsvProperties:
     csv file format properties class
     """
 
+    __slots__ = ("file_row_terminator", "file_value_separator", "file_value_quote_char")
+
     def __init__(self, config: Config):
         self.file_row_terminator: str = config.file_metadata.file_row_terminator
         self.file_value_separator: str = config.file_metadata.file_value_separator
         self.file_value_quote_char: str = config.file_metadata.file_value_quote_char
 
 
-class File:
+class RecordRange:
     """
-    File class
+    byte range of complete records in a csv file class
     """
 
-    def __init__(self, config: Config, file_name: str):
-        self.config: Config = config
-        self.name: str = file_name
-        self.csv_properties: CsvProperties = CsvProperties(config=self.config)
-        self.handle: IO = open(file_name, mode="r", encoding="utf8")
-        self.size: int = int(os.path.getsize(self.name) / 1024 / 1024)
-        self.header: Optional[List[str]] = self._get_file_header()
-        self.file_first_row_column_count: int = self.get_first_row_column_count()
+    __slots__ = ("start", "end", "first_row_number", "row_count")
+
+    def __init__(self, start: int, end: int, first_row_number: int, row_count: int):
+        self.start: int = start
+        self.end: int = end
+        self.first_row_number: int = first_row_number
+        self.row_count: int = row_count
+
+    def __repr__(self):
+        return f"bytes {self.start}-{self.end}"
+
+
+class FileReader(ABC):
+    """
+    file reader interface class, implemented by every supported file format
+    """
+
+    # readers supporting column chunks implement column_chunk_generator, yielding the first
+    # row number of a chunk and column identifiers with the chunk column values as dict,
+    # and get the column rules applied on whole column chunks instead of row by row,
+    # the other readers implement row_generator, yielding row number and the row values
+    # as a list addressed by the indexes from get_column_index_map
+    supports_column_chunks: bool = False
+
+    name: str
+    size: int
+    header: Optional[List[str]]
 
     @property
     def with_configured_header_has_empty_header(self) -> bool:
@@ -41,20 +113,15 @@ class File:
         file with configured header has empty header property
         :return:
         """
-        return self.header == [""]
+        return False
 
     @property
+    @abstractmethod
     def data_row_count(self) -> int:
         """
         file data row count property
         :return:
         """
-        file_data_row_count: int = self._get_rowcount_from_generator()
-
-        if self.header and self.header != [""]:
-            # we subtract 1 from the file_row_count because of the header row
-            file_data_row_count -= 1
-        return file_data_row_count
 
     @property
     def has_no_data_rows(self) -> bool:
@@ -64,6 +131,130 @@ class File:
         """
         return self.data_row_count == 0
 
+    @abstractmethod
+    def get_first_row_column_count(self) -> int:
+        """
+        method to get the first data row item length
+        :return:
+        """
+
+    @abstractmethod
+    def file_read_generator(self) -> Generator:
+        """
+        file reading generator method, yielding row number and column identifiers with values as dict
+        :return:
+        """
+
+    def get_column_index_map(self) -> Dict[str, int]:
+        """
+        method resolving the column identifiers to their row indexes, columns are identified
+        by the header names or by their index without a header, in case of duplicate
+        header names the last column wins
+        :return:
+        """
+        column_identifiers: List[str] = self.header or [
+            str(index) for index in range(self.get_first_row_column_count())
+        ]
+        return {identifier: index for index, identifier in enumerate(column_identifiers)}
+
+    def get_read_progress(self) -> Optional[Tuple[int, int]]:
+        """
+        method returning the bytes read so far and the bytes to read, sampled
+        by the progress reporter thread, None for readers without a file handle
+        :return:
+        """
+        try:
+            return self.handle.buffer.tell(), self.size
+        except (AttributeError, OSError, ValueError):
+            return None
+
+    @abstractmethod
+    def close_file_handler(self) -> None:
+        """
+        method for closing the file handler after validations finished
+        :return:
+        """
+
+
+def open_file(
+    config: Config, file_name: str, resource_guard: Optional[ResourceGuard] = None
+) -> FileReader:
+    """
+    function opening the file with the reader matching the configured file format
+    :param config:
+    :param file_name:
+    :param resource_guard:
+    :return:
+    """
+    if config.file_metadata.file_format == "csv":
+        return File(config, file_name, resource_guard=resource_guard)
+
+    if config.file_metadata.file_format == "fixed_width":
+        from csv_file_validator.fixed_width_file import (  # pylint: disable=import-outside-toplevel
+            FixedWidthFile,
+        )
+
+        return FixedWidthFile(config, file_name, resource_guard=resource_guard)
+
+    # columnar readers need pyarrow, so they are imported only when configured
+    from csv_file_validator.columnar_file import (  # pylint: disable=import-outside-toplevel
+        open_columnar_file,
+    )
+
+    return open_columnar_file(config, file_name, resource_guard=resource_guard)
+
+
+class File(FileReader):
+    """
+    File class, the csv file reader
+    """
+
+    # row number of the first record read by the file_read_generator
+    first_row_number: int = 1
+
+    def __init__(
+        self,
+        config: Config,
+        file_name: str,
+        resource_guard: Optional[ResourceGuard] = None,
+    ):
+        self.config: Config = config
+        self.name: str = file_name
+        self.resource_guard: Optional[ResourceGuard] = resource_guard
+        self.csv_properties: CsvProperties = CsvProperties(config=self.config)
+        self.encoding: str = codecs.lookup(config.file_metadata.file_encoding).name
+        self.text_encoding: str = get_text_encoding(self.encoding)
+        self.handle: IO = io.TextIOWrapper(
+            open_binary(file_name), encoding=self.text_encoding
+        )
+        self.size: int = get_file_size(self.name)
+        self._data_row_count: Optional[int] = None
+        self.header: Optional[List[str]] = self._get_file_header()
+        self.file_first_row_column_count: int = self.get_first_row_column_count()
+
+    @property
+    def with_configured_header_has_empty_header(self) -> bool:
+        """
+        file with configured header has empty header property
+        :return:
+        """
+        return self.header == [""]
+
+    @property
+    def data_row_count(self) -> int:
+        """
+        file data row count property, the rows are counted only once per file
+        :return:
+        """
+        if self._data_row_count is None:
+            file_data_row_count: int = self._get_rowcount()
+
+            if self.header and self.header != [""]:
+                # we subtract 1 from the file_row_count because of the header row
+                file_data_row_count -= 1
+            self._data_row_count = file_data_row_count
+        return self._data_row_count
+
     def _reset_file_handler(self) -> None:
         """
         method to reset the file handler using seek back to file beginning
@@ -71,37 +262,263 @@ class File:
         """
         self.handle.seek(0)
 
+    def _length_checked_lines(self) -> Generator:
+        """
+        generator method reading the file lines, a line is read only up to
+        the max line length so that a line without terminators can't exhaust memory
+        :return:
+        """
+        check_line_length = self.resource_guard.check_line_length
+        for line in iter(
+            partial(self.handle.readline, self.resource_guard.max_line_length + 1), ""
+        ):
+            check_line_length(len(line) - line.endswith("\n"))
+            yield line
+
+    def _get_lines(self) -> Iterator:
+        """
+        method to get the file lines iterator
+        :return:
+        """
+        if self.resource_guard is not None and self.resource_guard.max_line_length:
+            return self._length_checked_lines()
+        return self.handle
+
+    def _read_first_line(self) -> str:
+        """
+        method to read the first line of the file
+        :return:
+        """
+        return next(iter(self._get_lines()), "")
+
     def _get_csv_reader(self) -> Iterator:
         """
         method to get csv reader
         :return:
         """
         return csv.reader(
-            self.handle,
+            self._get_lines(),
             delimiter=self.csv_properties.file_value_separator,
             quotechar=self.csv_properties.file_value_quote_char,
         )
 
-    def _get_rowcount_from_generator(self) -> int:
+    def _count_csv_rows(self, data: bytes) -> int:
         """
-        method to get count of rows from _file_rowcount_generator
+        method counting the rows in a chunk of complete records using the csv reader
+        :param data:
         :return:
         """
+        row_count: int = 0
+        try:
+            for _ in csv.reader(
+                io.StringIO(data.decode(self.text_encoding), newline=None),
+                delimiter=self.csv_properties.file_value_separator,
+                quotechar=self.csv_properties.file_value_quote_char,
+            ):
+                row_count += 1
+        except csv.Error as csv_err:
+            _raise_for_field_size_limit(csv_err)
+            raise
+        return row_count
 
-        def _file_rowcount_generator() -> Generator:
-            """
-            file row counting generator method
-            :return:
-            """
-            for _ in self._get_csv_reader():
-                yield
+    @staticmethod
+    def _records_end(block: bytes) -> int:
+        """
+        method returning the position right after the last record terminator in the block,
+        a trailing carriage return is left for the next block as it can be followed by a line feed
+        :param block:
+        :return:
+        """
+        records_end: int = max(block.rfind(_LINE_FEED), block.rfind(_CARRIAGE_RETURN)) + 1
+        if records_end == len(block) and block.endswith(_CARRIAGE_RETURN):
+            records_end = (
+                max(
+                    block.rfind(_LINE_FEED, 0, records_end - 1),
+                    block.rfind(_CARRIAGE_RETURN, 0, records_end - 1),
+                )
+                + 1
+            )
+        return records_end
+
+    @staticmethod
+    def _count_terminators(block: bytes, records_end: int) -> int:
+        """
+        method counting the universal newlines record terminators in the block
+        :param block:
+        :param records_end:
+        :return:
+        """
+        terminator_count: int = block.count(_LINE_FEED, 0, records_end)
+        carriage_return_count: int = block.count(_CARRIAGE_RETURN, 0, records_end)
+        if carriage_return_count:
+            terminator_count += carriage_return_count - block.count(
+                _CARRIAGE_RETURN + _LINE_FEED, 0, records_end
+            )
+        return terminator_count
 
-        row_count: int = len(list(_file_rowcount_generator()))
+    def _count_block_rows(self, block: bytes, records_end: int) -> int:
+        """
+        method counting the rows in the complete records of a block, blocks
+        containing the quote char are counted by the csv reader as quoted values
+        can contain record terminators
+        :param block:
+        :param records_end:
+        :return:
+        """
+        quote_char: bytes = self.csv_properties.file_value_quote_char.encode(self.encoding)
+        if quote_char and block.find(quote_char, 0, records_end) != -1:
+            return self._count_csv_rows(block[:records_end])
+        return self._count_terminators(block, records_end)
 
-        self._reset_file_handler()
+    def _quoted_records_end(self, block: bytes, records_end: int, quote_char: bytes) -> int:
+        """
+        method returning the position right after the last record terminator in the block
+        which is not inside a quoted value, like the csv reader a quote char opens a quoted
+        value only at the start of a value, so the quote chars within unquoted values
+        are literal ones, the block starts at the start of a record
+        :param block:
+        :param records_end:
+        :param quote_char:
+        :return:
+        """
+        separator: bytes = self.csv_properties.file_value_separator.encode(self.encoding)
+        value_starts: tuple = (separator, _LINE_FEED, _CARRIAGE_RETURN)
+        # quoted value spans, from the opening quote char to the closing one
+        quoted_spans: List[Tuple[int, int]] = []
+        opened_at: int = -1
+        position: int = block.find(quote_char)
+
+        while position != -1:
+            if opened_at != -1:
+                quoted_spans.append((opened_at, position))
+                opened_at = -1
+            elif quoted_spans and quoted_spans[-1][1] == position - 1:
+                # a doubled quote char within a quoted value
+                opened_at = quoted_spans.pop()[0]
+            elif position == 0 or block[position - 1:position] in value_starts:
+                opened_at = position
+            position = block.find(quote_char, position + 1)
+
+        if opened_at != -1:
+            quoted_spans.append((opened_at, len(block)))
+
+        for span_start, span_end in reversed(quoted_spans):
+            terminator_at: int = records_end - 1
+            if terminator_at < span_start:
+                continue
+            if terminator_at > span_end:
+                break
+            records_end = (
+                max(
+                    block.rfind(_LINE_FEED, 0, span_start),
+                    block.rfind(_CARRIAGE_RETURN, 0, span_start),
+                )
+                + 1
+            )
+        return records_end
+
+    def _iter_record_offsets(self) -> Generator:
+        """
+        generator method reading the file in large binary blocks and counting the record
+        terminators without parsing the rows, yielding the offset right after the counted
+        records together with the row count up to the offset
+        :return:
+        """
+        quote_char: bytes = self.csv_properties.file_value_quote_char.encode(self.encoding)
+        row_count: int = 0
+        offset: int = 0
+        pending: bytes = b""
+
+        with open_binary(self.name) as binary_handle:
+            for block in iter(partial(binary_handle.read, ROW_COUNT_BLOCK_SIZE), b""):
+                offset += len(block)
+                if pending:
+                    block = pending + block
+
+                # records in the block end at the last terminator,
+                # the remainder is carried over to the next block
+                records_end: int = self._records_end(block)
+
+                if self.resource_guard is not None:
+                    self.resource_guard.check_line_length(len(block) - records_end)
+                    self.resource_guard.check()
+
+                if quote_char and block.find(quote_char, 0, records_end) != -1:
+                    # the last terminator can be inside a quoted value, even with an even
+                    # quote char count, as quote chars within unquoted values are literal
+                    records_end = self._quoted_records_end(block, records_end, quote_char)
+                    if records_end == 0:
+                        # a quoted value spanning the whole block
+                        pending = block
+                        continue
+
+                row_count += self._count_block_rows(block, records_end)
+                pending = block[records_end:]
+                yield offset - len(pending), row_count
+
+        if pending:
+            if quote_char and quote_char in pending:
+                # the csv reader counts the last row even without a record terminator
+                row_count += self._count_csv_rows(pending)
+            else:
+                row_count += self._count_terminators(pending, len(pending))
+                if not pending.endswith((_LINE_FEED, _CARRIAGE_RETURN)):
+                    # last row without a record terminator
+                    row_count += 1
+            yield offset, row_count
+
+    def _get_rowcount(self) -> int:
+        """
+        method to get count of rows, files in encodings not compatible
+        with ascii are counted by the csv reader
+        :return:
+        """
+        row_count: int = 0
+        if not is_ascii_compatible(self.encoding):
+            for _ in self._get_csv_reader():
+                row_count += 1
+            self._reset_file_handler()
+            return row_count
 
+        for _, row_count in self._iter_record_offsets():
+            pass
         return row_count
 
+    def get_record_ranges(self, range_size: int) -> List[RecordRange]:
+        """
+        method splitting the file to byte ranges of complete records, every range
+        but the last one has at least range_size bytes, files in encodings not
+        compatible with ascii are not split
+        :param range_size:
+        :return:
+        """
+        record_ranges: List[RecordRange] = []
+        if not is_ascii_compatible(self.encoding):
+            return record_ranges
+
+        range_start: int = 0
+        rows_before_range: int = 0
+        offset: int = 0
+        row_count: int = 0
+
+        for offset, row_count in self._iter_record_offsets():
+            if offset - range_start >= range_size:
+                record_ranges.append(
+                    RecordRange(
+                        range_start, offset, rows_before_range + 1, row_count - rows_before_range
+                    )
+                )
+                range_start, rows_before_range = offset, row_count
+
+        if offset > range_start:
+            record_ranges.append(
+                RecordRange(
+                    range_start, offset, rows_before_range + 1, row_count - rows_before_range
+                )
+            )
+
+        return record_ranges
+
     def _get_file_header(self) -> list:
         """
         method to get file header row
@@ -110,7 +527,7 @@ class File:
         file_header: Optional[List[str]] = None
         if self.config.file_metadata.file_has_header:
             file_header = (
-                self.handle.readline()
+                self._read_first_line()
                 .rstrip(self.csv_properties.file_row_terminator)
                 .split(self.csv_properties.file_value_separator)
             )
@@ -126,7 +543,7 @@ class File:
         :return:
         """
         first_row: List = (
-            self.handle.readline()
+            self._read_first_line()
             .rstrip(self.csv_properties.file_row_terminator)
             .split(self.csv_properties.file_value_separator)
         )
@@ -142,33 +559,102 @@ class File:
         """
         self.handle.close()
 
+    def row_generator(self) -> Generator:
+        """
+        file reading generator method, yielding row number and the row values as a list,
+        the header row is skipped
+        :return:
+        """
+        guard_check = (
+            self.resource_guard.check
+            if self.resource_guard is not None and self.resource_guard.is_active
+            else None
+        )
+
+        row_count: int = self.first_row_number - 1
+        try:
+            for row in self._get_csv_reader():
+                row_count += 1
+
+                if guard_check is not None and not row_count % CHECK_INTERVAL_ROWS:
+                    guard_check()
+
+                if len(row) != self.file_first_row_column_count:
+                    raise InvalidLineColumnCountException(
+                        f"row #: {row_count}, "
+                        f"expected column count: "
+                        f"{self.file_first_row_column_count}, "
+                        f"actual column count: "
+                        f"{len(row)}"
+                    )
+
+                if self.header and row_count == 1:
+                    # file header row so continue, header should be checked separately in
+                    # file_validation_rules.file_header_column_names
+                    continue
+
+                yield row_count, row
+        except csv.Error as csv_err:
+            _raise_for_field_size_limit(csv_err)
+            raise
+
     def file_read_generator(self) -> Generator:
         """
         file reading generator method
         :return:
         """
-        row_count: int = 0
-        for row in self._get_csv_reader():
-            row_count += 1
-
-            if len(row) != self.file_first_row_column_count:
-                raise InvalidLineColumnCountException(
-                    f"row #: {row_count}, "
-                    f"expected column count: "
-                    f"{self.get_first_row_column_count()}, "
-                    f"actual column count: "
-                    f"{len(row)}"
-                )
-
-            if self.header and row_count > 1:
-                # if file contains header, yield row number and column names with values as dict
-                # row number,{'column name 1': 'value', 'column name 2': 'value',..}
+        if self.header:
+            # if file contains header, yield row number and column names with values as dict
+            # row number,{'column name 1': 'value', 'column name 2': 'value',..}
+            for row_count, row in self.row_generator():
                 yield row_count, dict(zip(self.header, row))
-            elif not self.header:
-                # if file is without header, yield row number and column indexes with values as dict
-                # row number,{'0': 'value', '1': 'value',..}
+        else:
+            # if file is without header, yield row number and column indexes with values as dict
+            # row number,{'0': 'value', '1': 'value',..}
+            for row_count, row in self.row_generator():
                 yield row_count, dict((str(x[0]), x[1]) for x in enumerate(row))
-            else:
-                # file header row so continue, header should be checked separately in
-                # file_validation_rules.file_header_column_names
-                continue
+
+
+class FileByteRange(File):
+    """
+    FileByteRange class, the csv file reader limited to a byte range of complete
+    records, the header and the first row column count are read from the file beginning
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        file_name: str,
+        record_range: RecordRange,
+        resource_guard: Optional[ResourceGuard] = None,
+    ):
+        super().__init__(config, file_name, resource_guard=resource_guard)
+        self.record_range: RecordRange = record_range
+        self.first_row_number: int = record_range.first_row_number
+        self.handle.close()
+        self.handle = io.TextIOWrapper(
+            open_binary_range(file_name, record_range.start, record_range.end),
+            encoding=self.text_encoding,
+        )
+
+    def get_read_progress(self) -> Optional[Tuple[int, int]]:
+        """
+        method returning the bytes of the byte range read so far and the byte range length,
+        the byte range stream cannot tell its position, so it counts the bytes read
+        :return:
+        """
+        try:
+            bytes_read: int = self.handle.buffer.raw.bytes_read
+        except AttributeError:
+            return None
+        return bytes_read, self.record_range.end - self.record_range.start
+
+    @property
+    def data_row_count(self) -> int:
+        """
+        byte range data row count property
+        :return:
+        """
+        if self.record_range.start == 0 and self.header and self.header != [""]:
+            return self.record_range.row_count - 1
+        return self.record_range.row_count
@@ -0,0 +1,217 @@
+"""
+fixed_width_file.py
+"""
+import io
+from collections.abc import Generator
+from functools import partial
+from typing import Dict, IO, Iterator, List, Optional
+
+from csv_file_validator.archive import get_file_size, open_binary
+from csv_file_validator.config import Config
+from csv_file_validator.exceptions import InvalidLineColumnCountException
+from csv_file_validator.file import (
+    FileReader,
+    get_text_encoding,
+    is_ascii_compatible,
+)
+from csv_file_validator.resource_guard import ResourceGuard
+
+FIXED_WIDTH_BLOCK_SIZE: int = 1024 * 1024
+
+
+class FixedWidthFile(FileReader):
+    """
+    fixed width file reader class, the file is read in large text blocks split to records
+    and the column values are sliced by their position, whole column chunks at once
+    """
+
+    supports_column_chunks: bool = True
+
+    def __init__(
+        self,
+        config: Config,
+        file_name: str,
+        resource_guard: Optional[ResourceGuard] = None,
+    ):
+        self.config: Config = config
+        self.name: str = file_name
+        self.resource_guard: Optional[ResourceGuard] = resource_guard
+        self.size: int = get_file_size(self.name)
+        self.encoding: str = config.file_metadata.file_encoding
+        self.row_terminator: str = config.file_metadata.file_row_terminator
+        self.column_slices: List[slice] = [
+            slice(offset, offset + width)
+            for offset, width in config.file_metadata.file_fixed_width_columns
+        ]
+        self.record_length: int = max(column.stop for column in self.column_slices)
+        # record terminators are kept as they are, the file is split on the configured one
+        self.handle: IO = io.TextIOWrapper(
+            open_binary(file_name), encoding=get_text_encoding(self.encoding), newline=""
+        )
+        self._data_row_count: Optional[int] = None
+        self.header: Optional[List[str]] = self._get_file_header()
+        # without a configured header, columns are identified by their index
+        self._identifier_slices: Dict[str, slice] = dict(
+            zip(
+                self.header or [str(index) for index in range(len(self.column_slices))],
+                self.column_slices,
+            )
+        )
+
+    @property
+    def with_configured_header_has_empty_header(self) -> bool:
+        """
+        file with configured header has empty header property
+        :return:
+        """
+        return self.header is not None and not any(self.header)
+
+    def _get_file_header(self) -> Optional[List[str]]:
+        """
+        method to get the file header row values
+        :return:
+        """
+        if not self.config.file_metadata.file_has_header:
+            return None
+
+        first_record: str = next(self._iter_records(), [""])[0]
+        self.handle.seek(0)
+        return [first_record[column].strip() for column in self.column_slices]
+
+    @property
+    def data_row_count(self) -> int:
+        """
+        file data row count property, the rows are counted only once per file
+        :return:
+        """
+        if self._data_row_count is None:
+            file_data_row_count: int = self._get_rowcount()
+            if self.header is not None and file_data_row_count:
+                # we subtract 1 from the file_row_count because of the header row
+                file_data_row_count -= 1
+            self._data_row_count = file_data_row_count
+        return self._data_row_count
+
+    def _get_rowcount(self) -> int:
+        """
+        method to get count of rows, the record terminators are counted in binary
+        blocks for encodings compatible with ascii
+        :return:
+        """
+        if not is_ascii_compatible(self.encoding):
+            row_count: int = sum(len(records) for records in self._iter_records())
+            self.handle.seek(0)
+            return row_count
+
+        terminator: bytes = self.row_terminator.encode(self.encoding)
+        row_count = 0
+        tail: bytes = b""
+        data: bytes = b""
+
+        with open_binary(self.name) as binary_handle:
+            for block in iter(partial(binary_handle.read, FIXED_WIDTH_BLOCK_SIZE), b""):
+                # a terminator split between two blocks is found in the carried tail
+                data = tail + block
+                row_count += data.count(terminator)
+                tail = data[len(data) - len(terminator) + 1 :] if len(terminator) > 1 else b""
+
+        if data and not data.endswith(terminator):
+            # last row without a record terminator
+            row_count += 1
+
+        return row_count
+
+    def _iter_records(self) -> Iterator[List[str]]:
+        """
+        generator method reading the file in large text blocks,
+        yielding the lists of the complete records of every block
+        :return:
+        """
+        pending: str = ""
+        for block in iter(partial(self.handle.read, FIXED_WIDTH_BLOCK_SIZE), ""):
+            records: List[str] = (pending + block).split(self.row_terminator)
+            pending = records.pop()
+
+            if self.resource_guard is not None:
+                self.resource_guard.check_line_length(len(pending))
+                self.resource_guard.check()
+
+            if records:
+                yield records
+
+        if pending:
+            # last record without a record terminator
+            yield [pending]
+
+    def get_first_row_column_count(self) -> int:
+        """
+        method to get the column count from the configured columns
+        :return:
+        """
+        return len(self.column_slices)
+
+    def _check_record_lengths(self, records: List[str], first_row_number: int) -> None:
+        """
+        method checking all the records are long enough for the configured columns
+        :param records:
+        :param first_row_number:
+        :return:
+        """
+        if min(map(len, records)) >= self.record_length:
+            return
+
+        for row_number, record in enumerate(records, first_row_number):
+            if len(record) < self.record_length:
+                raise InvalidLineColumnCountException(
+                    f"row #: {row_number}, "
+                    f"expected record length: "
+                    f"{self.record_length}, "
+                    f"actual record length: "
+                    f"{len(record)}"
+                )
+
+    def column_chunk_generator(self, column_identifiers: List[str]) -> Generator:
+        """
+        file reading generator method, yielding the first row number of a chunk
+        and column identifiers with the chunk column values as dict
+        :param column_identifiers:
+        :return:
+        """
+        identifier_slices: List[tuple] = [
+            (identifier, self._identifier_slices[identifier])
+            for identifier in column_identifiers
+        ]
+
+        # row numbers follow the csv file convention, the header is the row number 1
+        row_number: int = 1
+        for records in self._iter_records():
+            if row_number == 1 and self.header is not None:
+                records = records[1:]
+                row_number = 2
+                if not records:
+                    continue
+
+            self._check_record_lengths(records, row_number)
+
+            yield row_number, {
+                identifier: [record[column].strip() for record in records]
+                for identifier, column in identifier_slices
+            }
+            row_number += len(records)
+
+    def file_read_generator(self) -> Generator:
+        """
+        file reading generator method, yielding row number and column identifiers with values as dict
+        :return:
+        """
+        column_identifiers: List[str] = list(self._identifier_slices)
+        for row_number, chunk in self.column_chunk_generator(column_identifiers):
+            for offset, values in enumerate(zip(*chunk.values())):
+                yield row_number + offset, dict(zip(column_identifiers, values))
+
+    def close_file_handler(self) -> None:
+        """
+        method for closing the file handler after validations finished
+        :return:
+        """
+        self.handle.close()
@@ -0,0 +1,215 @@
+"""
+numeric module, the numeric type checks and the numeric range checks
+with the bounds parsed once per rule, none of them raises on a failed value
+"""
+import decimal
+import functools
+import re
+from typing import Callable, Dict, Optional, Tuple
+
+FLOAT_RANGE_DEFAULT_PRECISION: int = 2
+_FLOAT_RANGES_MAX_SIZE: int = 1024
+
+# the numeric types accept only ascii digits, an optional sign and no whitespace,
+# the checks are the fullmatch of a precompiled pattern, so a failed value never raises
+_UINT_PATTERN = re.compile(r"[0-9]+")
+_INT_PATTERN = re.compile(r"[+-]?[0-9]+")
+# a float needs a decimal point or an exponent, an integer is not a float
+_FLOAT_PATTERN = re.compile(
+    r"[+-]?(?:[0-9]+\.[0-9]*(?:[eE][+-]?[0-9]+)?|\.[0-9]+(?:[eE][+-]?[0-9]+)?|[0-9]+[eE][+-]?[0-9]+)"
+)
+_DECIMAL_TYPE_PATTERN = re.compile(r"decimal\(\s*([0-9]+)\s*,\s*([0-9]+)\s*\)")
+_SIZED_INT_TYPE_PATTERN = re.compile(r"(u?)int(8|16|32|64)")
+BOOL_VALUES: frozenset = frozenset(
+    ("true", "false", "t", "f", "yes", "no", "y", "n", "1", "0")
+)
+
+# float ranges by the id of their validation value, the validation value
+# is kept in the entry so its id cannot be reused while cached
+_FLOAT_RANGES: Dict[int, Tuple[object, "FloatRange"]] = {}
+
+
+class FloatRange:
+    """
+    float value range class, the values are rounded half even to the precision
+    before the comparison with the bounds, which are rounded the same way,
+    values clearly inside or outside the range are decided on the parsed float
+    and only the values close to the bounds are compared as exact decimals
+    """
+
+    __slots__ = (
+        "inclusive",
+        "precision",
+        "_lower",
+        "_upper",
+        "_lower_float",
+        "_upper_float",
+        "_margin",
+        "_quantum",
+    )
+
+    def __init__(
+        self,
+        lower,
+        upper,
+        inclusive: bool = False,
+        precision: Optional[int] = FLOAT_RANGE_DEFAULT_PRECISION,
+    ):
+        self.inclusive: bool = inclusive
+        self.precision: Optional[int] = precision
+        self._quantum = None if precision is None else decimal.Decimal(1).scaleb(-precision)
+        self._lower = self._round(decimal.Decimal(str(lower)))
+        self._upper = self._round(decimal.Decimal(str(upper)))
+        self._lower_float: float = float(self._lower)
+        self._upper_float: float = float(self._upper)
+        # the rounding moves a value by half of the quantum at most, so values
+        # further than a quantum from both bounds cannot change the result,
+        # the relative part covers the float parsing error of big values
+        magnitude: float = max(abs(self._lower_float), abs(self._upper_float), 1.0)
+        self._margin: float = magnitude * 1e-9 + (
+            0.0 if precision is None else 10.0 ** -precision
+        )
+
+    @classmethod
+    def from_validation_value(cls, validation_value) -> "FloatRange":
+        """
+        method creating the float range from a config rule value, either
+        [min value, max value] with exclusive bounds and the default precision,
+        or {"min": value, "max": value, "inclusive": bool, "precision": int or null}
+        :param validation_value:
+        :return:
+        """
+        if isinstance(validation_value, dict):
+            return cls(
+                validation_value["min"],
+                validation_value["max"],
+                inclusive=validation_value.get("inclusive", False),
+                precision=validation_value.get("precision", FLOAT_RANGE_DEFAULT_PRECISION),
+            )
+        lower, upper = validation_value
+        return cls(lower, upper)
+
+    def _round(self, value):
+        """
+        method rounding a decimal value half even to the precision
+        :param value:
+        :return:
+        """
+        if self._quantum is None:
+            return value
+        return value.quantize(self._quantum, rounding=decimal.ROUND_HALF_EVEN)
+
+    def contains(self, column_value: str) -> bool:
+        """
+        method checking the column value is inside the range,
+        raising ValueError for values not being numbers
+        :param column_value:
+        :return:
+        """
+        value: float = float(column_value)
+        margin: float = self._margin
+
+        if self._lower_float + margin < value < self._upper_float - margin:
+            return True
+        if value < self._lower_float - margin or value > self._upper_float + margin:
+            return False
+        if value != value:
+            # nan is never inside a range
+            return False
+
+        # close to a bound, so the exact decimal value decides
+        exact_value = self._round(decimal.Decimal(column_value.strip()))
+        if self.inclusive:
+            return self._lower <= exact_value <= self._upper
+        return self._lower < exact_value < self._upper
+
+
+def get_float_range(validation_value) -> FloatRange:
+    """
+    function returning the float range of a config rule value,
+    parsed only once per rule
+    :param validation_value:
+    :return:
+    """
+    entry: Optional[Tuple[object, FloatRange]] = _FLOAT_RANGES.get(id(validation_value))
+    if entry is not None and entry[0] is validation_value:
+        return entry[1]
+
+    float_range: FloatRange = FloatRange.from_validation_value(validation_value)
+    if len(_FLOAT_RANGES) >= _FLOAT_RANGES_MAX_SIZE:
+        _FLOAT_RANGES.clear()
+    _FLOAT_RANGES[id(validation_value)] = (validation_value, float_range)
+    return float_range
+
+
+def _get_sized_int_check(unsigned: bool, bits: int) -> Callable[[str], bool]:
+    """
+    function returning the check of the integers fitting in the bits,
+    the value is converted only once it passed the integer check
+    :param unsigned:
+    :param bits:
+    :return:
+    """
+    check_integer: Callable = (_UINT_PATTERN if unsigned else _INT_PATTERN).fullmatch
+    lower: int = 0 if unsigned else -(2 ** (bits - 1))
+    upper: int = 2 ** bits - 1 if unsigned else 2 ** (bits - 1) - 1
+
+    def check_sized_int(column_value: str) -> bool:
+        return check_integer(column_value) is not None and lower <= int(column_value) <= upper
+
+    return check_sized_int
+
+
+def _get_decimal_check(precision: int, scale: int) -> Callable[[str], object]:
+    """
+    function returning the check of the decimals with at most precision digits,
+    scale of them after the decimal point, leading zeros are not counted
+    :param precision:
+    :param scale:
+    :return:
+    """
+    if precision < 1 or scale > precision:
+        raise ValueError(f"decimal({precision},{scale}) is not a valid decimal type")
+
+    fraction: str = rf"(?:\.[0-9]{{0,{scale}}})?" if scale else r"\.?"
+    pattern = re.compile(rf"[+-]?(?=\.?[0-9])0*[0-9]{{0,{precision - scale}}}{fraction}")
+    return pattern.fullmatch
+
+
+def _check_bool(column_value: str) -> bool:
+    """
+    function checking the column value is a boolean value, case insensitive
+    :param column_value:
+    :return:
+    """
+    return column_value.lower() in BOOL_VALUES
+
+
+@functools.lru_cache(maxsize=None)
+def get_type_check(data_type: str) -> Optional[Callable[[str], object]]:
+    """
+    function returning the check of a numeric or boolean data type, the types
+    are int, uint, int8 to int64, uint8 to uint64, float, decimal(precision,scale)
+    and bool, None is returned for the other data types, a check returns a truthy
+    value for the values of the data type, like the match of the type pattern
+    :param data_type:
+    :return:
+    """
+    checks: Dict[str, Callable] = {
+        "int": _INT_PATTERN.fullmatch,
+        "uint": _UINT_PATTERN.fullmatch,
+        "float": _FLOAT_PATTERN.fullmatch,
+        "bool": _check_bool,
+    }
+    if data_type in checks:
+        return checks[data_type]
+
+    sized_int_type = _SIZED_INT_TYPE_PATTERN.fullmatch(data_type)
+    if sized_int_type is not None:
+        return _get_sized_int_check(bool(sized_int_type.group(1)), int(sized_int_type.group(2)))
+
+    decimal_type = _DECIMAL_TYPE_PATTERN.fullmatch(data_type)
+    if decimal_type is not None:
+        return _get_decimal_check(int(decimal_type.group(1)), int(decimal_type.group(2)))
+
+    return None
@@ -0,0 +1,170 @@
+"""
+plugins module, the custom column validation rules are rule plugins registered
+by the installed packages under the csv_file_validator.rules entry point group,
+the entry point name is the rule name used in the config
+"""
+import logging
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+from csv_file_validator.exceptions import InvalidConfigException
+
+logger = logging.getLogger(__name__)
+
+RULE_PLUGIN_ENTRY_POINT_GROUP: str = "csv_file_validator.rules"
+# the built-in column rule cost estimates are between 1 and 20
+RULE_PLUGIN_DEFAULT_COST: float = 5.0
+
+_RULE_PLUGINS: Optional[Dict[str, "RulePlugin"]] = None
+
+
+class RulePlugin(ABC):
+    """
+    column validation rule plugin base class, the compile hook runs once per config rule
+    and its result is passed to the checks of every column value, a plugin overriding
+    check_batch gets whole column chunks and batches checked at once, a plugin class
+    without a check cannot be instantiated, so it fails to load
+    """
+
+    # relative cost of a single value check, cheaper rules are evaluated first
+    cost: float = RULE_PLUGIN_DEFAULT_COST
+
+    def compile(self, validation_value):
+        """
+        method compiling the config validation value, like a regex pattern or a value set,
+        raising ValueError or TypeError for a validation value which is not valid
+        :param validation_value:
+        :return:
+        """
+        return validation_value
+
+    @abstractmethod
+    def check(self, compiled, column_value: str) -> bool:
+        """
+        method checking the column value passes the rule
+        :param compiled:
+        :param column_value:
+        :return:
+        """
+
+    def check_batch(self, compiled, column_values: Sequence[str]) -> Sequence[bool]:
+        """
+        method checking the column values pass the rule, returning a result per value,
+        results of another length make the values checked one by one instead
+        :param compiled:
+        :param column_values:
+        :return:
+        """
+        return [self.check(compiled, column_value) for column_value in column_values]
+
+    @property
+    def has_batch_check(self) -> bool:
+        """
+        property checking the plugin implements a vectorized batch check
+        :return:
+        """
+        return type(self).check_batch is not RulePlugin.check_batch
+
+
+def _iter_entry_points() -> Iterable:
+    """
+    function returning the entry points of the rule plugin group, importlib.metadata
+    is imported only when a config uses a rule which is not a built-in one
+    :return:
+    """
+    from importlib.metadata import entry_points  # pylint: disable=import-outside-toplevel
+
+    all_entry_points = entry_points()
+    if hasattr(all_entry_points, "select"):
+        return all_entry_points.select(group=RULE_PLUGIN_ENTRY_POINT_GROUP)
+    return all_entry_points.get(RULE_PLUGIN_ENTRY_POINT_GROUP, ())
+
+
+def _load_rule_plugins() -> Dict[str, "RulePlugin"]:
+    """
+    function loading the rule plugins of the entry points, a plugin failing
+    to load is logged and left out, so the rules of the other plugins still work
+    :return:
+    """
+    rule_plugins: Dict[str, RulePlugin] = {}
+    for entry_point in _iter_entry_points():
+        try:
+            plugin = entry_point.load()
+            if isinstance(plugin, type):
+                plugin = plugin()
+        except Exception as exc:
+            logger.error("Rule plugin %s could not be loaded, %s", entry_point.name, exc)
+            continue
+        if not isinstance(plugin, RulePlugin):
+            logger.error("Rule plugin %s is not a RulePlugin", entry_point.name)
+            continue
+        rule_plugins[entry_point.name] = plugin
+    return rule_plugins
+
+
+def get_rule_plugins() -> Dict[str, RulePlugin]:
+    """
+    function returning the rule plugins by their rule name, the entry points are loaded once
+    :return:
+    """
+    global _RULE_PLUGINS  # pylint: disable=global-statement
+    if _RULE_PLUGINS is None:
+        _RULE_PLUGINS = _load_rule_plugins()
+    return _RULE_PLUGINS
+
+
+def register_rule_plugin(name: str, plugin: RulePlugin) -> None:
+    """
+    function registering a rule plugin without an entry point, like for embedding
+    :param name:
+    :param plugin:
+    :return:
+    """
+    get_rule_plugins()[name] = plugin
+
+
+def get_rule_plugin(name: str) -> Optional[RulePlugin]:
+    """
+    function returning the rule plugin of the rule name, None when there is none
+    :param name:
+    :return:
+    """
+    return get_rule_plugins().get(name)
+
+
+def compile_rule_plugin(
+    name: str, plugin: RulePlugin, validation_value
+) -> Tuple[Callable, Optional[Callable]]:
+    """
+    function compiling a rule plugin for a config validation value, returning the
+    validation function with the built-in validation functions interface and
+    the batch validation function when the plugin has a vectorized batch check
+    :param name:
+    :param plugin:
+    :param validation_value:
+    :return:
+    """
+    try:
+        compiled = plugin.compile(validation_value)
+    except Exception as exc:
+        raise InvalidConfigException(
+            f"rule {name} validation value {validation_value} is not valid, {exc}"
+        )
+
+    check: Callable = plugin.check
+
+    def validation_function(**kwargs) -> int:
+        return 0 if check(compiled, kwargs.get("column_value")) else 1
+
+    # the failed validations are logged by the validation function name
+    validation_function.__name__ = f"check_column_{name}"
+
+    if not plugin.has_batch_check:
+        return validation_function, None
+
+    check_batch: Callable = plugin.check_batch
+
+    def batch_validation_function(column_values: Sequence[str]) -> Sequence[bool]:
+        return check_batch(compiled, column_values)
+
+    return validation_function, batch_validation_function
@@ -0,0 +1,686 @@
+"""
+processing module, validating the files against the config, a file at a time
+or in a pool of worker processes, shared by the CLI and the distributed workers
+"""
+import logging
+import time
+from itertools import islice
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, TYPE_CHECKING
+
+from csv_file_validator.archive import get_file_size
+from csv_file_validator.config import Config
+from csv_file_validator.exceptions import (
+    InvalidConfigException,
+    InvalidLineColumnCountException,
+    FoundValidationErrorException,
+    FoundValidationErrorsException,
+    ResourceLimitExceededException,
+)
+from csv_file_validator.file import FileByteRange, FileReader, open_file, RecordRange
+from csv_file_validator.resource_guard import ResourceGuard
+from csv_file_validator.routing import ConfigRouter
+from csv_file_validator.rule_plan import compile_rule_plan, RulePlan
+from csv_file_validator.settings_parser import Settings
+from csv_file_validator.summary import ValidationStats
+from csv_file_validator.validation import (
+    validate_file,
+    validate_file_metadata,
+    check_column_validation_rules_align_with_file_content,
+    ValidationResultEnum,
+    ValidationResultItem,
+)
+from csv_file_validator.validation_functions import RuleCost
+
+if TYPE_CHECKING:
+    # the optional features are imported only when configured, so they cost nothing
+    # on the CLI startup of the runs not using them
+    from concurrent.futures import Future
+    from csv_file_validator.progress import FileProgress, ProgressReporter
+    from csv_file_validator.quarantine import QuarantineWriter
+    from csv_file_validator.sidecar_index import SidecarIndex, SidecarIndexBuilder
+
+logger = logging.getLogger(__name__)
+
+
+def _raise_on_failed_file_validations(
+    settings: Settings, failed_file_validations_counter: int, cheap_rules: bool
+) -> None:
+    """
+    function raising FoundValidationErrorException when the settings policy
+    says the failed file validations should halt the file validation
+    :param settings:
+    :param failed_file_validations_counter:
+    :param cheap_rules:
+    :return:
+    """
+    if failed_file_validations_counter == 0:
+        return
+
+    if settings.raise_exception_and_halt_on_failed_validation:
+        raise FoundValidationErrorException("Evaluation of a file validation rule failed")
+
+    if cheap_rules and settings.halt_on_failed_cheap_file_validation:
+        raise FoundValidationErrorException(
+            "Evaluation of a cheap file validation rule failed"
+        )
+
+
+def process_file_metadata_validations(
+    config: Config,
+    settings: Settings,
+    file_name: str,
+    file_size: int,
+    stats: Optional[ValidationStats] = None,
+) -> int:
+    """
+    process file level validations needing only the file name or size function,
+    evaluated before the file gets opened
+    :param config:
+    :param settings:
+    :param file_name:
+    :param file_size:
+    :param stats:
+    :return:
+    """
+    file_validations: dict = config.file_validation_rules
+
+    if not file_validations:
+        return 0
+
+    failed_file_validations_counter: int = validate_file_metadata(
+        file_validations,
+        file_name,
+        file_size,
+        failed_rules=stats.file_rule_failures if stats is not None else None,
+    )
+    _raise_on_failed_file_validations(
+        settings, failed_file_validations_counter, cheap_rules=True
+    )
+
+    return failed_file_validations_counter
+
+
+def process_file_validations(
+    config: Config,
+    settings: Settings,
+    file: FileReader,
+    failed_metadata_validations_counter: int = 0,
+    stats: Optional[ValidationStats] = None,
+) -> None:
+    """
+    process file level validations function, the file validations needing only
+    the file name or size are expected to be evaluated already by
+    process_file_metadata_validations, their failed count is passed in
+    :param config:
+    :param settings:
+    :param file:
+    :param failed_metadata_validations_counter:
+    :param stats:
+    :return:
+    """
+    failed_file_validations_counter: int = failed_metadata_validations_counter
+    failed_rules: Optional[Counter] = stats.file_rule_failures if stats is not None else None
+
+    file_validations: dict = config.file_validation_rules
+    file_validations_count: int = (len(file_validations) if file_validations else 0)
+
+    if file.with_configured_header_has_empty_header:
+        raise InvalidConfigException(
+            "File with header set to true in the config has no header row"
+        )
+
+    logger.info("Found %s file validations", file_validations_count)
+
+    if file_validations_count > 0:
+        try:
+            failed_file_validations_counter += validate_file(
+                file_validations,
+                file,
+                rule_costs=(RuleCost.HEADER,),
+                failed_rules=failed_rules,
+            )
+            _raise_on_failed_file_validations(
+                settings, failed_file_validations_counter, cheap_rules=True
+            )
+
+            # the row count needs a full file scan, so it is done
+            # only after all the cheaper file validations passed
+            failed_file_validations_counter += validate_file(
+                file_validations,
+                file,
+                rule_costs=(RuleCost.FULL_SCAN,),
+                failed_rules=failed_rules,
+            )
+            _raise_on_failed_file_validations(
+                settings, failed_file_validations_counter, cheap_rules=False
+            )
+
+        except InvalidConfigException as conf_err:
+            logger.error(
+                "File %s cannot be validated, config file has issues, %s",
+                file.name,
+                conf_err,
+            )
+            raise conf_err
+
+    if failed_file_validations_counter > 0:
+        raise FoundValidationErrorsException(
+            f"Evaluation of "
+            f"{failed_file_validations_counter} "
+            f"file validation rule(s) failed"
+        )
+
+
+def _add_rule_plan_stats(stats: ValidationStats, rule_plan: RulePlan) -> None:
+    """
+    function adding the validated rows and the failed validations of a rule plan to the stats
+    :param stats:
+    :param rule_plan:
+    :return:
+    """
+    stats.add_row_count(rule_plan.validated_rows)
+    for column, column_plan in rule_plan.column_plans.items():
+        if column_plan.failure_counts:
+            stats.column_rule_failures.setdefault(column, Counter()).update(
+                column_plan.failure_counts
+            )
+    if rule_plan.row_rule_plan is not None:
+        stats.row_rule_failures.update(rule_plan.row_rule_plan.failure_counts)
+
+
+def _validate_quarantined_rows(
+    rule_plan: RulePlan, rows: Iterator[Tuple[int, List[str]]], quarantine: "QuarantineWriter"
+) -> Iterator[int]:
+    """
+    generator validating the file rows, streaming every row to the quarantine writer
+    together with its failed rules, yielding the failed validations count of a row
+    :param rule_plan:
+    :param rows:
+    :param quarantine:
+    :return:
+    """
+    for idx, row in rows:
+        failed_rules: List[str] = rule_plan.get_row_failures(row, idx)
+        quarantine.write_row(row, failed_rules)
+        yield len(failed_rules)
+
+
+def _write_sidecar_index(
+    sidecar_index_builder: "SidecarIndexBuilder", sidecar_index_directory: str
+) -> None:
+    """
+    function writing the sidecar index built while validating the file, a sidecar index
+    which could not be written is only logged as the validation result does not depend on it
+    :param sidecar_index_builder:
+    :param sidecar_index_directory:
+    :return:
+    """
+    try:
+        sidecar_index_builder.build().write(sidecar_index_directory)
+    except OSError as os_err:
+        logger.warning("Sidecar index could not be written, %s", os_err)
+
+
+def process_column_validations(
+    config: Config,
+    settings: Settings,
+    file: FileReader,
+    stats: Optional[ValidationStats] = None,
+    quarantine_directory: Optional[str] = None,
+    progress: Optional["FileProgress"] = None,
+    sidecar_index_directory: Optional[str] = None,
+) -> None:
+    """
+    process column level validations function, with a quarantine directory the passing
+    rows are written to a clean output and the failing rows to a quarantine output
+    in the same pass, with a sidecar index directory the csv file blocks proven to pass
+    by the sidecar index of the file are skipped, or the sidecar index is built
+    :param config:
+    :param settings:
+    :param file:
+    :param stats:
+    :param quarantine_directory:
+    :param progress: optional progress of the file, sampled by the progress reporter
+    :param sidecar_index_directory:
+    :return:
+    """
+    column_validations: dict = config.column_validation_rules
+    column_validations_count: int = (
+        len(column_validations) if column_validations else 0
+    )
+    row_validations_count: int = len(config.row_validation_rules)
+
+    if column_validations_count == 0 and row_validations_count == 0:
+        # file level rules only config, no need to touch the file rows
+        logger.info("Found %s column validations", column_validations_count)
+        return
+
+    if file.has_no_data_rows and settings.skip_column_validations_on_empty_file:
+        logger.info("File has no rows to validate, skipping column level validations")
+        return
+
+    failed_column_validations_counter: int = 0
+
+    check_column_validation_rules_align_with_file_content(config, file)
+
+    logger.info("Found %s column validations", column_validations_count)
+    if row_validations_count:
+        logger.info("Found %s row validations", row_validations_count)
+
+    rule_plan: RulePlan = compile_rule_plan(
+        config, first_failure_per_cell=settings.first_failure_per_cell
+    )
+    if progress is not None:
+        progress.rule_plan = rule_plan
+
+    quarantine: Optional["QuarantineWriter"] = None
+    if quarantine_directory and file.supports_column_chunks:
+        logger.warning(
+            "Quarantine output is supported only for csv files, %s is validated without it",
+            file.name,
+        )
+    elif quarantine_directory:
+        # pylint: disable=import-outside-toplevel
+        from csv_file_validator.quarantine import open_quarantine_writer
+
+        quarantine = open_quarantine_writer(
+            file, quarantine_directory, settings.quarantine_compression
+        )
+
+    sidecar_index: Optional["SidecarIndex"] = None
+    sidecar_index_builder: Optional["SidecarIndexBuilder"] = None
+    rows_validated: bool = False
+
+    try:
+        if file.supports_column_chunks:
+            validation_results: Iterator[int] = (
+                rule_plan.validate_column_chunk(column_chunk, first_row_number)
+                for first_row_number, column_chunk in file.column_chunk_generator(
+                    rule_plan.columns
+                )
+            )
+        else:
+            # column identifiers are resolved once, rows are validated by index
+            rule_plan.bind_column_indexes(file.get_column_index_map())
+
+            if sidecar_index_directory:
+                # pylint: disable=import-outside-toplevel
+                from csv_file_validator.sidecar_index import (
+                    create_sidecar_index_builder,
+                    load_sidecar_index,
+                )
+
+                # the quarantine outputs need every row, so no block is skipped for them
+                if quarantine is None:
+                    sidecar_index = load_sidecar_index(sidecar_index_directory, file)
+                if sidecar_index is None:
+                    sidecar_index_builder = create_sidecar_index_builder(config, file)
+
+            rows: Iterator[Tuple[int, List[str]]] = (
+                file.row_generator()
+                if sidecar_index is None
+                else sidecar_index.row_generator(config, file)
+            )
+            if sidecar_index_builder is not None:
+                rows = sidecar_index_builder.collect(rows)
+
+            if quarantine is not None:
+                validation_results = _validate_quarantined_rows(rule_plan, rows, quarantine)
+            else:
+                validation_results = (rule_plan.validate_row(row, idx) for idx, row in rows)
+
+        for validation_result in validation_results:
+            if validation_result:
+                failed_column_validations_counter += validation_result
+                if progress is not None:
+                    progress.failures = failed_column_validations_counter
+                if settings.raise_exception_and_halt_on_failed_validation:
+                    raise FoundValidationErrorException(
+                        "Evaluation of a column validation rule failed"
+                    )
+        rows_validated = True
+
+        if sidecar_index_builder is not None and sidecar_index_builder.is_complete:
+            _write_sidecar_index(sidecar_index_builder, sidecar_index_directory)
+
+    except InvalidConfigException as conf_err:
+        logger.error(
+            "File %s cannot be validated, config file has issues, %s",
+            file.name,
+            conf_err,
+        )
+        raise conf_err
+    except InvalidLineColumnCountException as col_count_err:
+        logger.error(
+            "File %s cannot be validated, column count is not consistent, %s",
+            file.name,
+            col_count_err,
+        )
+        raise col_count_err
+    finally:
+        if stats is not None:
+            _add_rule_plan_stats(stats, rule_plan)
+        if sidecar_index is not None:
+            logger.info(
+                "Sidecar index proved %s rows to pass without validating them",
+                sidecar_index.skipped_row_count,
+            )
+            if stats is not None:
+                stats.add_row_count(sidecar_index.skipped_row_count)
+        if quarantine is not None:
+            quarantine.close(complete=rows_validated)
+            if rows_validated:
+                logger.info(
+                    "Written %s clean rows to %s and %s quarantined rows to %s",
+                    quarantine.clean_row_count,
+                    quarantine.clean_file_name,
+                    quarantine.quarantine_row_count,
+                    quarantine.quarantine_file_name,
+                )
+            else:
+                logger.warning(
+                    "Validation of %s stopped, no clean and quarantine outputs written",
+                    file.name,
+                )
+
+    if failed_column_validations_counter > 0:
+        raise FoundValidationErrorsException(
+            f"Evaluation of "
+            f"{failed_column_validations_counter} "
+            f"column validation rule(s) failed"
+        )
+
+
+def process_file(
+    config: Config,
+    settings: Settings,
+    file_name: str,
+    record_range: Optional[RecordRange] = None,
+    validate_columns: bool = True,
+    stats: Optional[ValidationStats] = None,
+) -> ValidationResultEnum:
+    """
+    process_file function, with a record range only the column validations
+    of the csv file byte range are processed, the file level validations are
+    expected to be processed for the whole file separately
+    :param config:
+    :param settings:
+    :param file_name:
+    :param record_range:
+    :param validate_columns:
+    :param stats: optional statistics of the file validation, filled during the validation
+    :return:
+    """
+    failed_metadata_validations_counter: int = 0
+    log_name: str = file_name
+    if record_range is not None:
+        log_name = f"{file_name} {record_range}"
+    elif not validate_columns:
+        log_name = f"{file_name} file level rules"
+
+    if record_range is None:
+        try:
+            failed_metadata_validations_counter = process_file_metadata_validations(
+                config=config,
+                settings=settings,
+                file_name=file_name,
+                file_size=get_file_size(file_name),
+                stats=stats,
+            )
+        except (FoundValidationErrorException, InvalidConfigException) as halt_flow_exc:
+            # misrouted files are rejected without ever being opened
+            logger.info(
+                "Failed to validate file %s , reason: %s", file_name, str(halt_flow_exc),
+            )
+            return ValidationResultEnum.FAILURE
+        except Exception as exc:
+            logger.error("File %s setup raised issues, %s", file_name, exc)
+            return ValidationResultEnum.COULD_NOT_PROCESS
+
+    try:
+        if record_range is None:
+            file: FileReader = open_file(
+                config, file_name, resource_guard=ResourceGuard(settings)
+            )
+        else:
+            file = FileByteRange(
+                config, file_name, record_range, resource_guard=ResourceGuard(settings)
+            )
+        logger.info("Validation of %s started", log_name)
+    except ResourceLimitExceededException as resource_limit_exc:
+        logger.error(
+            "File %s setup exceeded resource limits, %s", log_name, resource_limit_exc
+        )
+        return ValidationResultEnum.RESOURCE_LIMIT_EXCEEDED
+    except Exception as exc:
+        logger.error("File %s setup raised issues, %s", log_name, exc)
+        return ValidationResultEnum.COULD_NOT_PROCESS
+
+    # the progress reporter samples the progress of the file until it is processed
+    reporter: Optional["ProgressReporter"] = None
+    progress: Optional["FileProgress"] = None
+    if settings.progress_interval_seconds:
+        # pylint: disable=import-outside-toplevel
+        from csv_file_validator.progress import get_progress_reporter
+
+        reporter = get_progress_reporter(settings)
+        progress = reporter.start_file(log_name, file) if reporter is not None else None
+
+    try:
+        accumulated_errors: str = str()
+
+        try:
+            if record_range is None:
+                process_file_validations(
+                    config=config,
+                    settings=settings,
+                    file=file,
+                    failed_metadata_validations_counter=failed_metadata_validations_counter,
+                    stats=stats,
+                )
+        except (FoundValidationErrorException, InvalidConfigException) as halt_flow_exc:
+            logger.info(
+                "Failed to validate file %s , reason: %s", log_name, str(halt_flow_exc),
+            )
+            file.close_file_handler()
+            return ValidationResultEnum.FAILURE
+        except ResourceLimitExceededException as resource_limit_exc:
+            logger.error(
+                "Failed to validate file %s , resource limit exceeded: %s",
+                log_name,
+                resource_limit_exc,
+            )
+            file.close_file_handler()
+            return ValidationResultEnum.RESOURCE_LIMIT_EXCEEDED
+        except FoundValidationErrorsException as found_validation_errors_continue_flow_exc:
+            accumulated_errors += str(found_validation_errors_continue_flow_exc)
+
+        try:
+            if validate_columns:
+                # byte ranges of a split file never write the quarantine outputs
+                # and never use the sidecar index
+                process_column_validations(
+                    config=config,
+                    settings=settings,
+                    file=file,
+                    stats=stats,
+                    quarantine_directory=(
+                        settings.quarantine_directory if record_range is None else None
+                    ),
+                    progress=progress,
+                    sidecar_index_directory=(
+                        settings.sidecar_index_directory if record_range is None else None
+                    ),
+                )
+        except (
+            FoundValidationErrorException,
+            InvalidConfigException,
+            InvalidLineColumnCountException,
+        ) as halt_flow_exc:
+            logger.info(
+                "Failed to validate file %s , reason: %s", log_name, str(halt_flow_exc),
+            )
+            file.close_file_handler()
+            return ValidationResultEnum.FAILURE
+        except ResourceLimitExceededException as resource_limit_exc:
+            logger.error(
+                "Failed to validate file %s , resource limit exceeded: %s",
+                log_name,
+                resource_limit_exc,
+            )
+            file.close_file_handler()
+            return ValidationResultEnum.RESOURCE_LIMIT_EXCEEDED
+        except FoundValidationErrorsException as found_validation_errors_continue_flow_exc:
+            accumulated_errors += str(found_validation_errors_continue_flow_exc)
+        except OSError as os_err:
+            # the quarantine outputs could not be written
+            logger.error("File %s could not be processed, %s", log_name, os_err)
+            file.close_file_handler()
+            return ValidationResultEnum.COULD_NOT_PROCESS
+
+        file.close_file_handler()
+
+        if accumulated_errors:
+            logger.info(
+                "Failed to validate file %s , reason: %s", log_name, accumulated_errors,
+            )
+            return ValidationResultEnum.FAILURE
+
+        logger.info("Validation of %s finished without any errors", log_name)
+        return ValidationResultEnum.SUCCESS
+    finally:
+        if reporter is not None:
+            reporter.finish_file(progress)
+
+
+def validate_file_location(
+    config: Optional[Config], settings: Settings, file_name: str
+) -> ValidationResultItem:
+    """
+    function validating a file, returning the result item with the validation statistics,
+    a file without a config matched no route of the routing manifest and fails
+    :param config:
+    :param settings:
+    :param file_name:
+    :return:
+    """
+    stats: ValidationStats = ValidationStats()
+    if config is None:
+        logger.info(
+            "Failed to validate file %s , reason: no routing manifest route matches it",
+            file_name,
+        )
+        return ValidationResultItem(
+            file_name=file_name, result=ValidationResultEnum.FAILURE, stats=stats
+        )
+    started: float = time.perf_counter()
+    result: ValidationResultEnum = process_file(
+        config=config, settings=settings, file_name=file_name, stats=stats
+    )
+    stats.duration_seconds = time.perf_counter() - started
+    return ValidationResultItem(file_name=file_name, result=result, stats=stats)
+
+
+def _iter_file_configs(
+    config: Optional[Config],
+    config_router: Optional[ConfigRouter],
+    file_locations: Iterable[str],
+) -> Iterator[Tuple[str, Optional[Config]]]:
+    """
+    generator yielding the files together with their config, with a config router
+    the config of every file is the one of its route
+    :param config:
+    :param config_router:
+    :param file_locations:
+    :return:
+    """
+    if config_router is None:
+        for file_name in file_locations:
+            yield file_name, config
+    else:
+        for file_name in file_locations:
+            yield file_name, config_router.get_config(file_name)
+
+
+def _iter_parallel_validation_results(
+    settings: Settings, file_configs: Iterable[Tuple[str, Optional[Config]]], workers: int
+) -> Iterator[ValidationResultItem]:
+    """
+    generator validating the files in a pool of worker processes, at most two files
+    per worker are queued so the file locations are consumed lazily
+    :param settings:
+    :param file_configs:
+    :param workers:
+    :return:
+    """
+    # pylint: disable=import-outside-toplevel
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    file_configs = iter(file_configs)
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=configure_logging,
+        initargs=(settings.logging_level,),
+    ) as executor:
+        pending: Dict["Future", str] = {
+            executor.submit(validate_file_location, config, settings, file_name): file_name
+            for file_name, config in islice(file_configs, workers * 2)
+        }
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.pop(future)
+                for next_file_name, next_config in islice(file_configs, 1):
+                    pending[
+                        executor.submit(
+                            validate_file_location, next_config, settings, next_file_name
+                        )
+                    ] = next_file_name
+                yield future.result()
+
+
+def iter_validation_results(
+    config: Optional[Config],
+    settings: Settings,
+    file_locations: Iterable[str],
+    workers: int = 1,
+    config_router: Optional[ConfigRouter] = None,
+) -> Iterator[ValidationResultItem]:
+    """
+    generator validating the files, yielding a result item as soon as a file
+    validation finishes, with more than one worker the files are validated
+    in parallel and the results come in the order of completion, with a config
+    router every file is validated against the config of its route
+    :param config:
+    :param settings:
+    :param file_locations:
+    :param workers:
+    :param config_router:
+    :return:
+    """
+    file_configs: Iterator[Tuple[str, Optional[Config]]] = _iter_file_configs(
+        config, config_router, file_locations
+    )
+
+    if workers > 1:
+        yield from _iter_parallel_validation_results(settings, file_configs, workers)
+        return
+
+    for file_name, file_config in file_configs:
+        yield validate_file_location(config=file_config, settings=settings, file_name=file_name)
+
+
+def configure_logging(logging_level: str) -> None:
+    """
+    function configuring the root logger, called from main() so that importing
+    the package never touches the logging setup
+    :param logging_level:
+    :return:
+    """
+    if logging_level == "OFF":
+        logging.disable(logging.CRITICAL)
+        return
+    logging.basicConfig(level=logging_level)
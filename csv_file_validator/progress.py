@@ -0,0 +1,385 @@
+"""
+progress module, the progress of the files being validated is sampled by a timer thread
+and reported to stderr or appended to a metrics file as json lines, optionally served
+in the prometheus text format by a local http endpoint, the validation loop itself
+only keeps the counters it already has
+"""
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from csv_file_validator.settings_parser import Settings
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_HTTP_HOST: str = "127.0.0.1"
+PROGRESS_HTTP_PATH: str = "/metrics"
+_METRIC_PREFIX: str = "csv_file_validator_"
+
+# metric name, metric type, help text and the snapshot key of the per file metrics
+_FILE_METRICS: Tuple[Tuple[str, str, str, str], ...] = (
+    ("rows_validated", "counter", "rows validated so far", "rows"),
+    ("bytes_read", "gauge", "bytes read so far", "bytes_read"),
+    ("bytes_total", "gauge", "bytes to read", "bytes_total"),
+    (
+        "rows_per_second",
+        "gauge",
+        "rows validated per second since the last sample",
+        "rows_per_second",
+    ),
+    ("eta_seconds", "gauge", "estimated seconds until the file is read", "eta_seconds"),
+    ("failed_validations", "counter", "failed column validations so far", "failures"),
+    ("elapsed_seconds", "gauge", "seconds since the file validation started", "elapsed_seconds"),
+)
+
+_REPORTER: Optional["ProgressReporter"] = None
+_REPORTER_LOCK: threading.Lock = threading.Lock()
+
+
+class FileProgress:
+    """
+    file progress class, the validation updates the failures and the rule plan counts
+    the validated rows, everything else is computed by the sampling thread
+    """
+
+    __slots__ = (
+        "file_name",
+        "file",
+        "rule_plan",
+        "failures",
+        "started",
+        "sampled",
+        "_last_rows",
+        "_last_sample",
+    )
+
+    def __init__(self, file_name: str, file):
+        self.file_name: str = file_name
+        self.file = file
+        self.rule_plan = None
+        self.failures: int = 0
+        self.started: float = time.monotonic()
+        self.sampled: bool = False
+        self._last_rows: int = 0
+        self._last_sample: float = self.started
+
+    @property
+    def rows(self) -> int:
+        """
+        property returning the rows validated so far
+        :return:
+        """
+        rule_plan = self.rule_plan
+        return rule_plan.validated_rows if rule_plan is not None else 0
+
+    def snapshot(self) -> Dict[str, Optional[float]]:
+        """
+        method returning the current progress of the file, the rate is the one
+        since the previous snapshot, so a stuck validation drops to zero rows per second
+        :return:
+        """
+        now: float = time.monotonic()
+        rows: int = self.rows
+        elapsed: float = now - self.started
+        rows_per_second: float = (rows - self._last_rows) / max(now - self._last_sample, 1e-9)
+        self._last_rows, self._last_sample = rows, now
+        self.sampled = True
+
+        read_progress: Optional[Tuple[int, int]] = self.file.get_read_progress()
+        bytes_read: Optional[int] = None
+        bytes_total: Optional[int] = None
+        eta_seconds: Optional[float] = None
+        if read_progress is not None:
+            bytes_read, bytes_total = read_progress
+            bytes_read = min(bytes_read, bytes_total)
+            if bytes_read > 0:
+                eta_seconds = elapsed * (bytes_total - bytes_read) / bytes_read
+
+        return {
+            "rows": rows,
+            "bytes_read": bytes_read,
+            "bytes_total": bytes_total,
+            "rows_per_second": rows_per_second,
+            "eta_seconds": eta_seconds,
+            "failures": self.failures,
+            "elapsed_seconds": elapsed,
+        }
+
+
+def format_progress_line(file_name: str, snapshot: Dict[str, Optional[float]]) -> str:
+    """
+    function formatting a progress snapshot as a single human readable line
+    :param file_name:
+    :param snapshot:
+    :return:
+    """
+    line: str = f"progress {file_name}: {snapshot['rows']} rows"
+    if snapshot["bytes_total"]:
+        line += (
+            f", {snapshot['bytes_read']}/{snapshot['bytes_total']} bytes"
+            f" ({100.0 * snapshot['bytes_read'] / snapshot['bytes_total']:.1f}%)"
+        )
+    line += f", {snapshot['rows_per_second']:.0f} rows/s"
+    if snapshot["eta_seconds"] is not None:
+        line += f", eta {snapshot['eta_seconds']:.0f}s"
+    return line + f", {snapshot['failures']} failed validations"
+
+
+def _escape_label_value(value: str) -> str:
+    """
+    function escaping a prometheus label value
+    :param value:
+    :return:
+    """
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_prometheus_metrics(
+    snapshots: List[Tuple[str, Dict[str, Optional[float]]]], files_finished: int
+) -> str:
+    """
+    function formatting the progress snapshots of the files in the prometheus text format,
+    metrics without a value, like the eta of a file without a known size, are left out
+    :param snapshots:
+    :param files_finished:
+    :return:
+    """
+    lines: List[str] = [
+        f"# HELP {_METRIC_PREFIX}files_finished files validated by this process",
+        f"# TYPE {_METRIC_PREFIX}files_finished counter",
+        f"{_METRIC_PREFIX}files_finished {files_finished}",
+    ]
+    for name, metric_type, help_text, key in _FILE_METRICS:
+        lines.append(f"# HELP {_METRIC_PREFIX}{name} {help_text}")
+        lines.append(f"# TYPE {_METRIC_PREFIX}{name} {metric_type}")
+        for file_name, snapshot in snapshots:
+            if snapshot[key] is not None:
+                lines.append(
+                    f'{_METRIC_PREFIX}{name}{{file="{_escape_label_value(file_name)}"}} '
+                    f"{snapshot[key]}"
+                )
+    return "\n".join(lines) + "\n"
+
+
+class ProgressReporter:
+    """
+    progress reporter class, one per process, sampling the progress of the files
+    being validated every interval seconds
+    """
+
+    __slots__ = (
+        "interval_seconds",
+        "metrics_file",
+        "http_port",
+        "files_finished",
+        "_files",
+        "_lock",
+        "_stopped",
+        "_thread",
+        "_server",
+        "_pid",
+    )
+
+    def __init__(
+        self,
+        interval_seconds: float,
+        metrics_file: Optional[str] = None,
+        http_port: Optional[int] = None,
+    ):
+        self.interval_seconds: float = interval_seconds
+        self.metrics_file: Optional[str] = metrics_file
+        self.http_port: Optional[int] = http_port
+        self.files_finished: int = 0
+        self._files: List[FileProgress] = []
+        self._lock: threading.Lock = threading.Lock()
+        self._stopped: threading.Event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._server = None
+        self._pid: int = os.getpid()
+
+    @property
+    def is_alive(self) -> bool:
+        """
+        property checking the reporter runs in this process, a forked
+        worker process inherits the reporter without its threads
+        :return:
+        """
+        return self._pid == os.getpid() and not self._stopped.is_set()
+
+    def start(self) -> None:
+        """
+        method starting the sampling thread and the http endpoint, an endpoint
+        port already in use only disables the endpoint
+        :return:
+        """
+        if self.http_port:
+            self._start_http_server()
+        self._thread = threading.Thread(
+            target=self._run, name="csv-file-validator-progress", daemon=True
+        )
+        self._thread.start()
+
+    def _start_http_server(self) -> None:
+        """
+        method serving the prometheus text metrics on the local http endpoint
+        :return:
+        """
+        # pylint: disable=import-outside-toplevel
+        from http.server import BaseHTTPRequestHandler, HTTPServer
+
+        reporter: ProgressReporter = self
+
+        class MetricsRequestHandler(BaseHTTPRequestHandler):
+            def do_GET(self):  # pylint: disable=invalid-name
+                if self.path.split("?")[0] != PROGRESS_HTTP_PATH:
+                    self.send_error(404)
+                    return
+                body: bytes = reporter.render_metrics().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        try:
+            self._server = HTTPServer((PROGRESS_HTTP_HOST, self.http_port), MetricsRequestHandler)
+        except OSError as os_err:
+            logger.warning(
+                "Progress endpoint could not listen on port %s, %s", self.http_port, os_err
+            )
+            return
+        threading.Thread(
+            target=self._server.serve_forever, name="csv-file-validator-metrics", daemon=True
+        ).start()
+
+    def stop(self) -> None:
+        """
+        method stopping the sampling thread and the http endpoint
+        :return:
+        """
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def start_file(self, file_name: str, file) -> FileProgress:
+        """
+        method registering a file being validated
+        :param file_name:
+        :param file:
+        :return:
+        """
+        progress: FileProgress = FileProgress(file_name, file)
+        with self._lock:
+            self._files.append(progress)
+        return progress
+
+    def finish_file(self, progress: FileProgress) -> None:
+        """
+        method unregistering a validated file, a file validated for longer
+        than the interval gets a final report
+        :param progress:
+        :return:
+        """
+        with self._lock:
+            self._files.remove(progress)
+            self.files_finished += 1
+        if progress.sampled:
+            self._emit([(progress.file_name, progress.snapshot())])
+
+    def _snapshots(self) -> List[Tuple[str, Dict[str, Optional[float]]]]:
+        """
+        method returning the progress snapshots of the files being validated
+        :return:
+        """
+        with self._lock:
+            files: List[FileProgress] = list(self._files)
+        return [(progress.file_name, progress.snapshot()) for progress in files]
+
+    def render_metrics(self) -> str:
+        """
+        method returning the progress of the files being validated in the prometheus text format
+        :return:
+        """
+        return format_prometheus_metrics(self._snapshots(), self.files_finished)
+
+    def _emit(self, snapshots: List[Tuple[str, Dict[str, Optional[float]]]]) -> None:
+        """
+        method reporting the progress snapshots to stderr, or appending them
+        to the metrics file as json lines
+        :param snapshots:
+        :return:
+        """
+        if not snapshots:
+            return
+        if self.metrics_file is None:
+            sys.stderr.write(
+                "".join(
+                    format_progress_line(name, snapshot) + "\n" for name, snapshot in snapshots
+                )
+            )
+            sys.stderr.flush()
+            return
+
+        sampled_at: float = time.time()
+        lines: str = "".join(
+            json.dumps({"time": sampled_at, "pid": self._pid, "file": name, **snapshot}) + "\n"
+            for name, snapshot in snapshots
+        )
+        try:
+            # appended in a single write, so parallel workers do not interleave their lines
+            with open(self.metrics_file, mode="a") as metrics_file:
+                metrics_file.write(lines)
+        except OSError as os_err:
+            logger.warning("Progress metrics file %s not written, %s", self.metrics_file, os_err)
+
+    def _run(self) -> None:
+        """
+        method run by the sampling thread
+        :return:
+        """
+        while not self._stopped.wait(self.interval_seconds):
+            self._emit(self._snapshots())
+
+
+def get_progress_reporter(settings: Settings) -> Optional[ProgressReporter]:
+    """
+    function returning the progress reporter of the process, started on the first use,
+    None when the progress reporting is not configured
+    :param settings:
+    :return:
+    """
+    global _REPORTER  # pylint: disable=global-statement
+    if not settings.progress_interval_seconds:
+        return None
+
+    with _REPORTER_LOCK:
+        if _REPORTER is None or not _REPORTER.is_alive:
+            _REPORTER = ProgressReporter(
+                settings.progress_interval_seconds,
+                metrics_file=settings.progress_metrics_file,
+                http_port=settings.progress_http_port,
+            )
+            _REPORTER.start()
+        return _REPORTER
+
+
+def stop_progress_reporter() -> None:
+    """
+    function stopping the progress reporter of the process, if any
+    :return:
+    """
+    global _REPORTER  # pylint: disable=global-statement
+    with _REPORTER_LOCK:
+        if _REPORTER is not None and _REPORTER.is_alive:
+            _REPORTER.stop()
+        _REPORTER = None
@@ -0,0 +1,204 @@
+"""
+quarantine module, the rows of a validated csv file split to a clean output
+of the passing rows and a quarantine output of the failing rows
+"""
+import csv
+import hashlib
+import os
+import tempfile
+from typing import IO, List, Optional, Sequence, Tuple
+
+from csv_file_validator.archive import ARCHIVE_MEMBER_SEPARATOR
+from csv_file_validator.file import File
+
+_COMPRESSION_EXTENSIONS: dict = {"none": "", "gzip": ".gz", "bz2": ".bz2", "xz": ".xz"}
+# rows are buffered and written in batches, the output files get a large write buffer
+QUARANTINE_BATCH_ROWS: int = 1000
+QUARANTINE_BUFFER_SIZE: int = 1024 * 1024
+# last column of the quarantine output, holding the failed rules of the row
+FAILED_VALIDATIONS_COLUMN: str = "failed_validations"
+FAILED_VALIDATIONS_SEPARATOR: str = ";"
+
+
+def get_output_file_names(
+    file_name: str, directory: str, compression: str = "none"
+) -> Tuple[str, str]:
+    """
+    function returning the clean and the quarantine output file names of a file, like
+    SalesJan2009.1a2b3c4d.clean.csv and SalesJan2009.1a2b3c4d.quarantine.csv, the short hash
+    of the file path keeps apart the outputs of the files with the same base name,
+    like the files of other folders or archive members
+    :param file_name:
+    :param directory:
+    :param compression:
+    :return:
+    """
+    base_name: str = os.path.basename(file_name.rpartition(ARCHIVE_MEMBER_SEPARATOR)[2])
+    root, extension = os.path.splitext(base_name)
+    path_hash: str = hashlib.sha256(os.path.abspath(file_name).encode()).hexdigest()[:8]
+    compression_extension: str = _COMPRESSION_EXTENSIONS[compression]
+    return (
+        os.path.join(directory, f"{root}.{path_hash}.clean{extension}{compression_extension}"),
+        os.path.join(
+            directory, f"{root}.{path_hash}.quarantine{extension}{compression_extension}"
+        ),
+    )
+
+
+def _get_temp_file_name(directory: str) -> str:
+    """
+    function creating a temporary output file in the output directory,
+    renamed to the output file name once the file is validated
+    :param directory:
+    :return:
+    """
+    file_descriptor, temp_file_name = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    os.close(file_descriptor)
+    return temp_file_name
+
+
+def _open_output(file_name: str, encoding: str, compression: str) -> IO:
+    """
+    function opening an output file for writing text, compressed on the fly
+    with the compression modules imported only when used
+    :param file_name:
+    :param encoding:
+    :param compression:
+    :return:
+    """
+    if compression == "gzip":
+        import gzip  # pylint: disable=import-outside-toplevel
+
+        return gzip.open(file_name, mode="wt", encoding=encoding, newline="")
+    if compression == "bz2":
+        import bz2  # pylint: disable=import-outside-toplevel
+
+        return bz2.open(file_name, mode="wt", encoding=encoding, newline="")
+    if compression == "xz":
+        import lzma  # pylint: disable=import-outside-toplevel
+
+        return lzma.open(file_name, mode="wt", encoding=encoding, newline="")
+
+    return open(
+        file_name,
+        mode="w",
+        encoding=encoding,
+        newline="",
+        buffering=QUARANTINE_BUFFER_SIZE,
+    )
+
+
+class QuarantineWriter:
+    """
+    quarantine writer class, the passing rows are written to the clean output and the
+    failing rows annotated with their failed rules to the quarantine output,
+    both keep the csv dialect and the encoding of the validated file, the outputs
+    are written to temporary files renamed only once the whole file is validated
+    """
+
+    def __init__(self, file: File, directory: str, compression: str = "none"):
+        self.clean_file_name, self.quarantine_file_name = get_output_file_names(
+            file.name, directory, compression
+        )
+        self.clean_row_count: int = 0
+        self.quarantine_row_count: int = 0
+        self._clean_rows: List[Sequence[str]] = []
+        self._quarantine_rows: List[Sequence[str]] = []
+        self._temp_file_names: Tuple[str, str] = (
+            _get_temp_file_name(directory),
+            _get_temp_file_name(directory),
+        )
+        self._clean_stream: IO = _open_output(
+            self._temp_file_names[0], file.encoding, compression
+        )
+        self._quarantine_stream: IO = _open_output(
+            self._temp_file_names[1], file.encoding, compression
+        )
+        dialect: dict = {
+            "delimiter": file.csv_properties.file_value_separator,
+            "quotechar": file.csv_properties.file_value_quote_char,
+            "lineterminator": file.csv_properties.file_row_terminator,
+        }
+        self._clean_writer = csv.writer(self._clean_stream, **dialect)
+        self._quarantine_writer = csv.writer(self._quarantine_stream, **dialect)
+
+        if file.header:
+            self._clean_writer.writerow(file.header)
+            self._quarantine_writer.writerow(file.header + [FAILED_VALIDATIONS_COLUMN])
+
+    def write_row(self, row: List[str], failed_rules: List[str]) -> None:
+        """
+        method adding a validated row to the output matching its result,
+        the rows are written once a batch is full
+        :param row:
+        :param failed_rules:
+        :return:
+        """
+        if failed_rules:
+            self._quarantine_rows.append(
+                row + [FAILED_VALIDATIONS_SEPARATOR.join(failed_rules)]
+            )
+            if len(self._quarantine_rows) >= QUARANTINE_BATCH_ROWS:
+                self._flush_quarantine_rows()
+        else:
+            self._clean_rows.append(row)
+            if len(self._clean_rows) >= QUARANTINE_BATCH_ROWS:
+                self._flush_clean_rows()
+
+    def _flush_clean_rows(self) -> None:
+        """
+        method writing the batch of the clean rows
+        :return:
+        """
+        self._clean_writer.writerows(self._clean_rows)
+        self.clean_row_count += len(self._clean_rows)
+        self._clean_rows.clear()
+
+    def _flush_quarantine_rows(self) -> None:
+        """
+        method writing the batch of the quarantined rows
+        :return:
+        """
+        self._quarantine_writer.writerows(self._quarantine_rows)
+        self.quarantine_row_count += len(self._quarantine_rows)
+        self._quarantine_rows.clear()
+
+    def close(self, complete: bool = True) -> None:
+        """
+        method writing the pending rows and closing the outputs, the outputs of a file
+        not validated completely, like one halted on a failed validation, are removed
+        so no truncated output is left under the output file names
+        :param complete:
+        :return:
+        """
+        try:
+            try:
+                if complete:
+                    self._flush_clean_rows()
+                    self._flush_quarantine_rows()
+            finally:
+                self._clean_stream.close()
+                self._quarantine_stream.close()
+            if complete:
+                os.replace(self._temp_file_names[0], self.clean_file_name)
+                os.replace(self._temp_file_names[1], self.quarantine_file_name)
+        finally:
+            for temp_file_name in self._temp_file_names:
+                if os.path.exists(temp_file_name):
+                    os.unlink(temp_file_name)
+
+
+def open_quarantine_writer(
+    file: File, directory: Optional[str], compression: str = "none"
+) -> Optional[QuarantineWriter]:
+    """
+    function opening the quarantine writer of a file, the directory is created if missing
+    :param file:
+    :param directory:
+    :param compression:
+    :return:
+    """
+    if not directory:
+        return None
+    os.makedirs(directory, exist_ok=True)
+    return QuarantineWriter(file, directory, compression)
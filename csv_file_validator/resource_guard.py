@@ -0,0 +1,108 @@
+"""
+resource guard module
+"""
+import csv
+import os
+import sys
+import time
+from typing import Optional
+
+from csv_file_validator.exceptions import ResourceLimitExceededException
+from csv_file_validator.settings_parser import Settings
+
+# rows read between two memory and wall clock checks
+CHECK_INTERVAL_ROWS: int = 4096
+
+_PROC_STATM: str = "/proc/self/statm"
+
+
+def _get_rss_bytes() -> Optional[int]:
+    """
+    function returning the current resident set size of the process,
+    falls back to the peak resident set size where /proc is not available
+    :return:
+    """
+    try:
+        with open(_PROC_STATM, mode="rb") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+
+    try:
+        import resource  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+
+    max_rss: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+class ResourceGuard:
+    """
+    resource guard class, enforcing the configured resource limits for a single file
+    """
+
+    __slots__ = (
+        "max_field_size",
+        "max_line_length",
+        "max_rss_bytes",
+        "file_timeout_seconds",
+        "_deadline",
+    )
+
+    def __init__(self, settings: Settings):
+        self.max_field_size: Optional[int] = settings.max_field_size
+        self.max_line_length: Optional[int] = settings.max_line_length
+        self.max_rss_bytes: Optional[int] = (
+            int(settings.max_rss_mb * 1024 * 1024) if settings.max_rss_mb else None
+        )
+        self.file_timeout_seconds: Optional[float] = settings.file_timeout_seconds
+        self._deadline: Optional[float] = (
+            time.monotonic() + self.file_timeout_seconds
+            if self.file_timeout_seconds
+            else None
+        )
+
+        if self.max_field_size:
+            # the csv module field size limit is process wide
+            csv.field_size_limit(self.max_field_size)
+
+    @property
+    def is_active(self) -> bool:
+        """
+        property checking if any of the periodically checked limits is configured
+        :return:
+        """
+        return self._deadline is not None or self.max_rss_bytes is not None
+
+    def check(self) -> None:
+        """
+        method raising ResourceLimitExceededException when the file
+        validation exceeded the wall clock timeout or the memory limit
+        :return:
+        """
+        if self._deadline is not None and time.monotonic() > self._deadline:
+            raise ResourceLimitExceededException(
+                f"file validation exceeded the timeout of "
+                f"{self.file_timeout_seconds} seconds"
+            )
+
+        if self.max_rss_bytes is not None:
+            rss_bytes: Optional[int] = _get_rss_bytes()
+            if rss_bytes is not None and rss_bytes > self.max_rss_bytes:
+                raise ResourceLimitExceededException(
+                    f"process resident memory {rss_bytes} bytes exceeded "
+                    f"the limit of {self.max_rss_bytes} bytes"
+                )
+
+    def check_line_length(self, line_length: int) -> None:
+        """
+        method raising ResourceLimitExceededException when a line exceeds the max line length
+        :param line_length:
+        :return:
+        """
+        if self.max_line_length is not None and line_length > self.max_line_length:
+            raise ResourceLimitExceededException(
+                f"line length exceeded the limit of {self.max_line_length} characters"
+            )
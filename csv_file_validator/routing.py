@@ -0,0 +1,122 @@
+"""
+routing module, the files of a mixed location are validated against the config
+of the first routing manifest route with a file mask matching the file name
+"""
+import json
+import os
+import re
+from typing import Dict, List, Optional, Pattern, Tuple
+
+from csv_file_validator.config import Config, load_config
+from csv_file_validator.exceptions import InvalidConfigException
+from csv_file_validator.validation_functions import get_file_mask_name
+
+# masks with backreferences cannot be combined, the group numbers would shift
+_BACKREFERENCE_PATTERN: Pattern = re.compile(r"\\[1-9]|\(\?P=")
+_ROUTE_GROUP_PREFIX: str = "route_"
+
+
+class ConfigRouter:
+    """
+    config router class, the file masks are matched like the file_name_file_mask rule
+    by a single combined regex, the first matching route wins, masks which cannot
+    be combined are matched one by one
+    """
+
+    __slots__ = ("configs", "file_masks", "_combined_pattern", "_patterns")
+
+    def __init__(self, routes: List[Tuple[str, Config]]):
+        self.file_masks: List[str] = [file_mask for file_mask, _ in routes]
+        self.configs: List[Config] = [config for _, config in routes]
+
+        try:
+            self._patterns: List[Pattern] = [re.compile(mask) for mask in self.file_masks]
+        except re.error as regex_err:
+            raise InvalidConfigException(f"routing manifest file mask is not valid, {regex_err}")
+
+        self._combined_pattern: Optional[Pattern] = None
+        if not any(_BACKREFERENCE_PATTERN.search(mask) for mask in self.file_masks):
+            try:
+                self._combined_pattern = re.compile(
+                    "|".join(
+                        f"(?P<{_ROUTE_GROUP_PREFIX}{index}>{mask})"
+                        for index, mask in enumerate(self.file_masks)
+                    )
+                )
+            except re.error:
+                # like inline global flags or named groups repeated over the masks
+                self._combined_pattern = None
+
+    def get_route_index(self, file_name: str) -> Optional[int]:
+        """
+        method returning the index of the first route matching the file name
+        :param file_name:
+        :return:
+        """
+        name: str = get_file_mask_name(file_name)
+
+        if self._combined_pattern is not None:
+            route_match = self._combined_pattern.match(name)
+            if route_match is None:
+                return None
+            # the route group encloses the mask groups, so it is the last one closed
+            return int(route_match.lastgroup[len(_ROUTE_GROUP_PREFIX):])
+
+        for index, pattern in enumerate(self._patterns):
+            if pattern.match(name):
+                return index
+        return None
+
+    def get_config(self, file_name: str) -> Optional[Config]:
+        """
+        method returning the config of the first route matching the file name
+        :param file_name:
+        :return:
+        """
+        route_index: Optional[int] = self.get_route_index(file_name)
+        return None if route_index is None else self.configs[route_index]
+
+
+def load_routing_manifest(manifest_file_loc: str) -> ConfigRouter:
+    """
+    function loading the routing manifest, like
+    {"routes": [{"file_mask": "SalesJan\\d+", "config": "configs/sales.json"}]},
+    the config locations are relative to the manifest and every config is loaded once
+    :param manifest_file_loc:
+    :return:
+    """
+    if not os.path.isfile(manifest_file_loc):
+        raise InvalidConfigException("Could not load routing manifest - not a valid file")
+
+    with open(manifest_file_loc, mode="r") as manifest_file:
+        try:
+            manifest = json.load(manifest_file)
+        except json.JSONDecodeError as json_decode_err:
+            raise InvalidConfigException(
+                f"Could not load routing manifest - JSON decode error: {json_decode_err}"
+            )
+
+    routes = manifest.get("routes") if isinstance(manifest, dict) else None
+    if not isinstance(routes, list) or not routes:
+        raise InvalidConfigException("routing manifest missing routes list")
+
+    manifest_dir: str = os.path.dirname(os.path.abspath(manifest_file_loc))
+    configs: Dict[str, Config] = {}
+    router_routes: List[Tuple[str, Config]] = []
+
+    for route in routes:
+        if (
+            not isinstance(route, dict)
+            or not isinstance(route.get("file_mask"), str)
+            or not isinstance(route.get("config"), str)
+        ):
+            raise InvalidConfigException(
+                f"routing manifest route {route} needs a file_mask and a config"
+            )
+
+        config_file_loc: str = os.path.join(manifest_dir, route["config"])
+        if config_file_loc not in configs:
+            configs[config_file_loc] = load_config(config_file_loc)
+        router_routes.append((route["file_mask"], configs[config_file_loc]))
+
+    return ConfigRouter(router_routes)
@@ -0,0 +1,748 @@
+"""
+rule plan module
+"""
+from collections import Counter, OrderedDict
+from typing import (
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    TYPE_CHECKING,
+    Union,
+)
+
+from csv_file_validator.config import Config, ROW_RULES_KEY
+from csv_file_validator.exceptions import InvalidConfigException, InvalidLineColumnCountException
+from csv_file_validator.numeric import get_type_check
+from csv_file_validator.plugins import compile_rule_plugin, get_rule_plugin, RulePlugin
+from csv_file_validator.validation_functions import (
+    call_validation_function,
+    get_mapped_validation_function,
+    has_mapped_validation_function,
+    log_validation_error,
+)
+
+if TYPE_CHECKING:
+    # the expressions module is imported only by the configs with row rules
+    from csv_file_validator.expressions import RowRulePlan
+
+VALUE_CACHE_MAX_SIZE: int = 1024
+VALUE_CACHE_MAX_CARDINALITY: int = 4096
+# in the first failure per cell mode, the column rules are reordered
+# by the observed failure rates after every interval of evaluated values
+RULE_ORDER_ADAPT_INTERVAL: int = 1024
+
+# relative cost estimates of a single column rule evaluation
+_RULE_COST_ESTIMATES: Dict[str, float] = {
+    "allow_fixed_value": 1.0,
+    "allow_fixed_value_list": 2.0,
+    "allow_substring": 2.0,
+    "allow_int_value_range": 3.0,
+    "allow_data_type": 3.0,
+    "allow_regex": 5.0,
+    "allow_float_value_range": 3.0,
+}
+_DATETIME_DATA_TYPE_COST_ESTIMATE: float = 20.0
+# errors of a batch check making the column values evaluated one by one instead
+_BATCH_FALLBACK_ERRORS: tuple = (
+    ValueError,
+    TypeError,
+    KeyError,
+    IndexError,
+    AttributeError,
+    ArithmeticError,
+)
+
+
+def estimate_rule_cost(name: str, validation_value) -> float:
+    """
+    function estimating the relative cost of a single column rule evaluation
+    :param name:
+    :param validation_value:
+    :return:
+    """
+    if name == "allow_data_type" and str(validation_value).startswith("datetime"):
+        return _DATETIME_DATA_TYPE_COST_ESTIMATE
+    return _RULE_COST_ESTIMATES.get(name, max(_RULE_COST_ESTIMATES.values()))
+
+
+class ValueResultCache:
+    """
+    LRU cache of the validation results per distinct column value, the cache
+    switches itself off once the observed column cardinality exceeds the threshold
+    """
+
+    __slots__ = ("_results", "_max_size", "_max_cardinality", "_misses", "enabled")
+
+    def __init__(
+        self,
+        max_size: int = VALUE_CACHE_MAX_SIZE,
+        max_cardinality: int = VALUE_CACHE_MAX_CARDINALITY,
+    ):
+        self._results: OrderedDict = OrderedDict()
+        self._max_size: int = max_size
+        self._max_cardinality: int = max_cardinality
+        self._misses: int = 0
+        self.enabled: bool = max_size > 0
+
+    def get(self, column_value: str) -> Optional[tuple]:
+        """
+        method returning the cached validation result of a column value
+        :param column_value:
+        :return:
+        """
+        result: Optional[tuple] = self._results.get(column_value)
+        if result is not None:
+            self._results.move_to_end(column_value)
+        return result
+
+    def put(self, column_value: str, result: tuple) -> None:
+        """
+        method caching the validation result of a column value
+        :param column_value:
+        :param result:
+        :return:
+        """
+        # every miss is a value not seen recently, so misses
+        # approximate the column cardinality from above
+        self._misses += 1
+        if self._misses > self._max_cardinality:
+            self.enabled = False
+            self._results.clear()
+            return
+
+        self._results[column_value] = result
+        if len(self._results) > self._max_size:
+            self._results.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        method dropping the cached validation results
+        :return:
+        """
+        self._results.clear()
+
+
+class CompiledRule:
+    """
+    compiled column validation rule class, rules not mapped to a built-in
+    validation function are compiled by their rule plugin, the numeric and boolean
+    allow_data_type rules get the type check of their data type as a value check,
+    called on the column value without the validation function interface
+    """
+
+    __slots__ = (
+        "name",
+        "func",
+        "batch_func",
+        "value_check",
+        "validation_value",
+        "cost",
+        "evaluations",
+        "failures",
+    )
+
+    def __init__(self, name: str, validation_value):
+        self.name: str = name
+        self.validation_value = validation_value
+        self.batch_func: Optional[Callable] = None
+        self.value_check: Optional[Callable[[str], object]] = None
+        self.evaluations: int = 0
+        self.failures: int = 0
+
+        plugin: Optional[RulePlugin] = (
+            None if has_mapped_validation_function(name) else get_rule_plugin(name)
+        )
+        if plugin is None:
+            self.func: Callable = get_mapped_validation_function(name)
+            self.cost: float = estimate_rule_cost(name, validation_value)
+            if name == "allow_data_type" and isinstance(validation_value, str):
+                self.value_check = get_type_check(validation_value)
+        else:
+            self.func, self.batch_func = compile_rule_plugin(name, plugin, validation_value)
+            self.cost = float(plugin.cost)
+
+    @property
+    def rank(self) -> float:
+        """
+        rule rank property, the expected cost of the rule evaluation per found failure,
+        rules with a lower rank go first when only the first failure of a cell matters
+        :return:
+        """
+        # the failure rate is smoothed so that rules never evaluated get a prior of 1/2
+        return self.cost * (self.evaluations + 2) / (self.failures + 1)
+
+
+class ColumnRulePlan:
+    """
+    column rule plan class, holding the compiled rules of a column
+    and the value result cache shared by all rows of a file, with first_failure_only
+    the cell evaluation stops at the first failed rule and the rules are ordered
+    by their rank, adapting to the observed failure rates
+    """
+
+    __slots__ = (
+        "column",
+        "rules",
+        "value_cache",
+        "first_failure_only",
+        "failure_counts",
+        "supports_batch",
+        "_evaluated_values",
+    )
+
+    def __init__(
+        self, column: str, column_validations: dict, first_failure_only: bool = False
+    ):
+        self.column: str = column
+        self.rules: List[CompiledRule] = [
+            CompiledRule(name, validation_value)
+            for name, validation_value in column_validations.items()
+        ]
+        self.value_cache: Optional[ValueResultCache] = ValueResultCache()
+        self.first_failure_only: bool = first_failure_only
+        # failed validations per rule name, cached results included
+        self.failure_counts: Counter = Counter()
+        # the rules are evaluated on whole batches only when all of them can and
+        # the cell evaluation does not stop at the first failed rule
+        self.supports_batch: bool = not first_failure_only and all(
+            rule.batch_func is not None for rule in self.rules
+        )
+        self._evaluated_values: int = 0
+
+        if first_failure_only:
+            self.rules.sort(key=lambda rule: rule.rank)
+
+    def _reorder_rules(self) -> None:
+        """
+        method reordering the rules by their rank, the cached results are dropped
+        on a change as they hold the first failure found in the previous order
+        :return:
+        """
+        rules: List[CompiledRule] = sorted(self.rules, key=lambda rule: rule.rank)
+        if rules != self.rules:
+            self.rules = rules
+            if self.value_cache is not None:
+                self.value_cache.clear()
+
+    def _evaluate(self, column_value: str) -> Tuple[tuple, ...]:
+        """
+        method evaluating the column rules, returning the failed rules
+        together with the Error raised by the validation function
+        :param column_value:
+        :return:
+        """
+        failures: List[tuple] = []
+        for rule in self.rules:
+            if rule.value_check is not None:
+                try:
+                    # the type checks never raise on a failed string value
+                    validation_result, err = (0 if rule.value_check(column_value) else 1), None
+                except TypeError as type_err:
+                    validation_result, err = 1, type_err
+            else:
+                validation_result, err = call_validation_function(
+                    rule.func,
+                    column=self.column,
+                    validation_value=rule.validation_value,
+                    column_value=column_value,
+                )
+            rule.evaluations += 1
+            if validation_result != 0:
+                rule.failures += 1
+                failures.append((rule, err))
+                if self.first_failure_only:
+                    break
+
+        if self.first_failure_only:
+            self._evaluated_values += 1
+            if not self._evaluated_values % RULE_ORDER_ADAPT_INTERVAL:
+                self._reorder_rules()
+
+        return tuple(failures)
+
+    def get_batch_failures(
+        self, column_values: Sequence[str]
+    ) -> Optional[List[Tuple[CompiledRule, List[int]]]]:
+        """
+        method evaluating the batch checks of the column rules, returning the rules together
+        with the indexes of the values failing them, None when the rules have to be evaluated
+        value by value, like when a rule has no batch check, or a batch check raised
+        or returned another count of results than the count of values
+        :param column_values:
+        :return:
+        """
+        if not self.supports_batch:
+            return None
+
+        rule_failures: List[Tuple[CompiledRule, List[int]]] = []
+        try:
+            for rule in self.rules:
+                results: Sequence[bool] = rule.batch_func(column_values)
+                if len(results) != len(column_values):
+                    # a missing result would count its value as passing
+                    return None
+                rule_failures.append(
+                    (rule, [index for index, passed in enumerate(results) if not passed])
+                )
+        except _BATCH_FALLBACK_ERRORS:
+            return None
+
+        for rule, failed_indexes in rule_failures:
+            rule.evaluations += len(column_values)
+            rule.failures += len(failed_indexes)
+        return rule_failures
+
+    def validate(self, column_value: str, row_number: int) -> int:
+        """
+        method validating a column value, returning the failed validations count
+        :param column_value:
+        :param row_number:
+        :return:
+        """
+        return len(self.validate_failures(column_value, row_number))
+
+    def get_failures(self, column_value: str) -> Tuple[tuple, ...]:
+        """
+        method returning the failed rules of a column value together with the Error
+        raised by the validation function, without counting or logging them
+        :param column_value:
+        :return:
+        """
+        value_cache: Optional[ValueResultCache] = self.value_cache
+
+        if value_cache is None:
+            return self._evaluate(column_value)
+
+        failures: Optional[Tuple[tuple, ...]] = value_cache.get(column_value)
+        if failures is None:
+            failures = self._evaluate(column_value)
+            value_cache.put(column_value, failures)
+            if not value_cache.enabled:
+                self.value_cache = None
+        return failures
+
+    def validate_failures(self, column_value: str, row_number: int) -> Tuple[tuple, ...]:
+        """
+        method validating a column value, returning the failed rules
+        together with the Error raised by the validation function
+        :param column_value:
+        :param row_number:
+        :return:
+        """
+        failures: Tuple[tuple, ...] = self.get_failures(column_value)
+
+        for rule, err in failures:
+            self.failure_counts[rule.name] += 1
+            log_validation_error(
+                func_name=rule.func.__name__,
+                validation_value=rule.validation_value,
+                row_number=row_number,
+                column=self.column,
+                column_value=column_value,
+                Exception=err,
+            )
+
+        return failures
+
+
+class BatchResult:
+    """
+    batch validation result class, a bitmap of the failing rows per failed rule,
+    keyed like column:rule name, bit i of a bitmap stands for the row i of the batch
+    """
+
+    __slots__ = ("row_count", "failure_bitmaps", "failure_counts")
+
+    def __init__(self, row_count: int):
+        self.row_count: int = row_count
+        self.failure_bitmaps: Dict[str, bytearray] = {}
+        self.failure_counts: Counter = Counter()
+
+    def add_failure(self, rule_key: str, row_index: int) -> None:
+        """
+        method marking the row of the batch as failing the rule
+        :param rule_key:
+        :param row_index:
+        :return:
+        """
+        bitmap: Optional[bytearray] = self.failure_bitmaps.get(rule_key)
+        if bitmap is None:
+            bitmap = self.failure_bitmaps[rule_key] = bytearray((self.row_count + 7) >> 3)
+        bitmap[row_index >> 3] |= 1 << (row_index & 7)
+        self.failure_counts[rule_key] += 1
+
+    @property
+    def failed_validations(self) -> int:
+        """
+        property returning the failed validations count of the batch
+        :return:
+        """
+        return sum(self.failure_counts.values())
+
+    @property
+    def failed_rows_bitmap(self) -> int:
+        """
+        property returning the bitmap of the rows failing any rule, as an int
+        :return:
+        """
+        failed_rows: int = 0
+        for bitmap in self.failure_bitmaps.values():
+            failed_rows |= int.from_bytes(bitmap, "little")
+        return failed_rows
+
+    @property
+    def failed_row_count(self) -> int:
+        """
+        property returning the count of the rows failing any rule
+        :return:
+        """
+        return bin(self.failed_rows_bitmap).count("1")
+
+    def iter_failed_rows(self, rule_key: Optional[str] = None) -> Iterator[int]:
+        """
+        method yielding the indexes of the rows failing the rule,
+        or failing any rule without a rule key
+        :param rule_key:
+        :return:
+        """
+        if rule_key is None:
+            bitmap: bytes = self.failed_rows_bitmap.to_bytes((self.row_count + 7) >> 3, "little")
+        else:
+            bitmap = self.failure_bitmaps.get(rule_key, b"")
+
+        for byte_index, byte in enumerate(bitmap):
+            while byte:
+                lowest_bit: int = byte & -byte
+                yield (byte_index << 3) + lowest_bit.bit_length() - 1
+                byte ^= lowest_bit
+
+
+class RulePlan:
+    """
+    rule plan class, the config column validation rules compiled once per file
+    """
+
+    __slots__ = (
+        "column_plans",
+        "row_rule_plan",
+        "indexed_column_plans",
+        "columns_bound",
+        "validated_rows",
+    )
+
+    def __init__(
+        self,
+        column_validation_rules: dict,
+        first_failure_per_cell: bool = False,
+        row_validation_rules: Optional[dict] = None,
+    ):
+        self.column_plans: Dict[str, ColumnRulePlan] = {
+            column: ColumnRulePlan(
+                column, column_validations, first_failure_only=first_failure_per_cell
+            )
+            for column, column_validations in column_validation_rules.items()
+        }
+        self.row_rule_plan: Optional["RowRulePlan"] = None
+        if row_validation_rules:
+            # pylint: disable=import-outside-toplevel
+            from csv_file_validator.expressions import RowRulePlan
+
+            try:
+                self.row_rule_plan = RowRulePlan(row_validation_rules, column_validation_rules)
+            except ValueError as value_err:
+                raise InvalidConfigException(value_err)
+            self._share_value_parsers()
+        self.indexed_column_plans: List[tuple] = []
+        # rows addressed by index are validated only once the column indexes are bound
+        self.columns_bound: bool = False
+        self.validated_rows: int = 0
+
+    def _share_value_parsers(self) -> None:
+        """
+        method making the datetime allow_data_type rules of the columns used by the row rules
+        parse the values by the row rule value parsers, so every value is parsed only once
+        :return:
+        """
+        for column, value_parser in self.row_rule_plan.value_parsers.items():
+            if not value_parser.data_type.startswith("datetime"):
+                continue
+            for rule in self.column_plans[column].rules:
+                if rule.name == "allow_data_type":
+                    rule.func = value_parser.get_validation_function()
+
+    @property
+    def columns(self) -> List[str]:
+        """
+        property returning the columns used by the column rules and the row rules
+        :return:
+        """
+        if self.row_rule_plan is None:
+            return list(self.column_plans)
+        return list(dict.fromkeys([*self.column_plans, *self.row_rule_plan.columns]))
+
+    def bind_column_indexes(self, column_index_map: Dict[str, int]) -> None:
+        """
+        method resolving the validated columns once to their row indexes,
+        so a row is validated only on the validated columns whatever the row width
+        :param column_index_map:
+        :return:
+        """
+        self.indexed_column_plans = [
+            (column_index_map[column_name], column_plan)
+            for column_name, column_plan in self.column_plans.items()
+        ]
+        if self.row_rule_plan is not None:
+            self.row_rule_plan.bind_column_indexes(column_index_map)
+        self.columns_bound = True
+
+    def validate_row(self, row: Sequence[str], idx: int) -> int:
+        """
+        method validating a row of values addressed by the bound column indexes,
+        returning the failed validations count
+        :param row:
+        :param idx:
+        :return:
+        """
+        column_validations_fail_count: int = 0
+        self.validated_rows += 1
+
+        for column_index, column_plan in self.indexed_column_plans:
+            column_validations_fail_count += column_plan.validate(row[column_index], idx)
+
+        if self.row_rule_plan is not None:
+            column_validations_fail_count += len(self.row_rule_plan.validate_failures(row, idx))
+
+        return column_validations_fail_count
+
+    def get_row_failures(self, row: Sequence[str], idx: int) -> List[str]:
+        """
+        method validating a row of values addressed by the bound column indexes,
+        returning the failed rules like column:rule name
+        :param row:
+        :param idx:
+        :return:
+        """
+        failed_rules: List[str] = []
+        self.validated_rows += 1
+
+        for column_index, column_plan in self.indexed_column_plans:
+            for rule, _ in column_plan.validate_failures(row[column_index], idx):
+                failed_rules.append(f"{column_plan.column}:{rule.name}")
+
+        if self.row_rule_plan is not None:
+            for rule, _ in self.row_rule_plan.validate_failures(row, idx):
+                failed_rules.append(f"{ROW_RULES_KEY}:{rule.name}")
+
+        return failed_rules
+
+    def validate_line(self, line: dict, idx: int) -> int:
+        """
+        method validating a line in a file, returning the failed validations count
+        :param line:
+        :param idx:
+        :return:
+        """
+        column_validations_fail_count: int = 0
+        self.validated_rows += 1
+
+        for column_name, column_plan in self.column_plans.items():
+            column_validations_fail_count += column_plan.validate(line[column_name], idx)
+
+        if self.row_rule_plan is not None:
+            column_validations_fail_count += len(
+                self.row_rule_plan.validate_failures(line, idx, by_name=True)
+            )
+
+        return column_validations_fail_count
+
+    def validate_column_chunk(
+        self, column_chunk: Dict[str, List[str]], first_row_number: int
+    ) -> int:
+        """
+        method validating a chunk of rows column by column, returning the failed validations count
+        :param column_chunk:
+        :param first_row_number:
+        :return:
+        """
+        column_validations_fail_count: int = 0
+        self.validated_rows += len(next(iter(column_chunk.values()), ()))
+
+        for column_name, column_plan in self.column_plans.items():
+            column_values: List[str] = column_chunk[column_name]
+            batch_failures = column_plan.get_batch_failures(column_values)
+            if batch_failures is not None:
+                for rule, failed_indexes in batch_failures:
+                    column_plan.failure_counts[rule.name] += len(failed_indexes)
+                    column_validations_fail_count += len(failed_indexes)
+                    for index in failed_indexes:
+                        log_validation_error(
+                            func_name=rule.func.__name__,
+                            validation_value=rule.validation_value,
+                            row_number=first_row_number + index,
+                            column=column_name,
+                            column_value=column_values[index],
+                        )
+                continue
+
+            validate = column_plan.validate
+            for row_number, column_value in enumerate(column_values, first_row_number):
+                column_validations_fail_count += validate(column_value, row_number)
+
+        if self.row_rule_plan is not None:
+            validate_failures = self.row_rule_plan.validate_failures
+            for row_number, line in enumerate(
+                self._iter_lines(column_chunk, self.row_rule_plan.columns), first_row_number
+            ):
+                column_validations_fail_count += len(
+                    validate_failures(line, row_number, by_name=True)
+                )
+
+        return column_validations_fail_count
+
+    @staticmethod
+    def _iter_lines(
+        column_chunk: Mapping[str, Sequence[str]], columns: List[str]
+    ) -> Iterator[Dict[str, str]]:
+        """
+        method returning an iterator of the rows of a columnar chunk as lines of the columns,
+        raising KeyError for a column not in the chunk
+        :param column_chunk:
+        :param columns:
+        :return:
+        """
+        column_values: List[Sequence[str]] = [column_chunk[column] for column in columns]
+        return (dict(zip(columns, values)) for values in zip(*column_values))
+
+    def validate_batch(
+        self,
+        rows: Union[Sequence[Sequence[str]], Mapping[str, Sequence[str]]],
+        columns: Optional[Sequence[str]] = None,
+    ) -> BatchResult:
+        """
+        method validating a batch of rows column by column, the rows are either a sequence
+        of row tuples, with the values ordered like the columns or by the bound column indexes
+        when no columns are given, or a columnar mapping of the column names to their values,
+        the failed validations are collected in the result instead of being logged, row tuples
+        without columns nor bound column indexes raise InvalidConfigException
+        :param rows:
+        :param columns:
+        :return:
+        """
+        if isinstance(rows, Mapping):
+            try:
+                column_values: List[Tuple[ColumnRulePlan, Sequence[str]]] = [
+                    (column_plan, rows[column_name])
+                    for column_name, column_plan in self.column_plans.items()
+                ]
+            except KeyError as key_err:
+                raise InvalidConfigException(
+                    f"Column validations set in the config, but column {key_err} "
+                    f"not found in the batch"
+                )
+            row_count: int = len(next(iter(rows.values()), ()))
+        else:
+            if columns is not None:
+                try:
+                    self.bind_column_indexes(
+                        {column_name: index for index, column_name in enumerate(columns)}
+                    )
+                except KeyError as key_err:
+                    raise InvalidConfigException(
+                        f"Column validations set in the config, but column {key_err} "
+                        f"not found in the batch columns"
+                    )
+            elif not self.columns_bound:
+                raise InvalidConfigException(
+                    "Batch rows without columns need the column indexes bound first"
+                )
+            try:
+                column_values = [
+                    (column_plan, [row[column_index] for row in rows])
+                    for column_index, column_plan in self.indexed_column_plans
+                ]
+            except IndexError:
+                raise InvalidLineColumnCountException(
+                    "batch rows do not have all the validated columns"
+                )
+            row_count = len(rows)
+
+        result: BatchResult = BatchResult(row_count)
+        self.validated_rows += row_count
+
+        for column_plan, values in column_values:
+            if len(values) != row_count:
+                raise InvalidLineColumnCountException(
+                    f"column {column_plan.column} has {len(values)} values, "
+                    f"expected {row_count}"
+                )
+            rule_keys: Dict[str, str] = {
+                rule.name: f"{column_plan.column}:{rule.name}" for rule in column_plan.rules
+            }
+
+            batch_failures = column_plan.get_batch_failures(values)
+            if batch_failures is not None:
+                for rule, failed_indexes in batch_failures:
+                    for row_index in failed_indexes:
+                        result.add_failure(rule_keys[rule.name], row_index)
+                continue
+
+            get_failures = column_plan.get_failures
+            for row_index, column_value in enumerate(values):
+                for rule, _ in get_failures(column_value):
+                    result.add_failure(rule_keys[rule.name], row_index)
+
+        if self.row_rule_plan is not None:
+            self._validate_batch_row_rules(rows, result)
+
+        return result
+
+    def _validate_batch_row_rules(
+        self,
+        rows: Union[Sequence[Sequence[str]], Mapping[str, Sequence[str]]],
+        result: BatchResult,
+    ) -> None:
+        """
+        method validating the row rules of a batch, the rows of a columnar mapping
+        are addressed by the column names, the row tuples by the bound column indexes
+        :param rows:
+        :param result:
+        :return:
+        """
+        get_failures = self.row_rule_plan.get_failures
+        if isinstance(rows, Mapping):
+            try:
+                lines: Iterator[Dict[str, str]] = self._iter_lines(
+                    rows, self.row_rule_plan.columns
+                )
+            except KeyError as key_err:
+                raise InvalidConfigException(
+                    f"Row validations set in the config, but column {key_err} "
+                    f"not found in the batch"
+                )
+            for row_index, line in enumerate(lines):
+                for rule, _ in get_failures(line, by_name=True):
+                    result.add_failure(f"{ROW_RULES_KEY}:{rule.name}", row_index)
+            return
+
+        for row_index, row in enumerate(rows):
+            for rule, _ in get_failures(row):
+                result.add_failure(f"{ROW_RULES_KEY}:{rule.name}", row_index)
+
+
+def compile_rule_plan(config: Config, first_failure_per_cell: bool = False) -> RulePlan:
+    """
+    function compiling the config column and row validation rules into a rule plan
+    :param config:
+    :param first_failure_per_cell:
+    :return:
+    """
+    return RulePlan(
+        config.column_validation_rules,
+        first_failure_per_cell=first_failure_per_cell,
+        row_validation_rules=config.row_validation_rules,
+    )
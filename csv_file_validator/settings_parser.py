@@ -2,22 +2,85 @@
 settings parser
 """
 from configparser import ConfigParser
+from typing import Optional, Union
 
 from csv_file_validator.exceptions import InvalidSettingsException
 
+LOGGING_LEVELS: tuple = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL", "OFF")
+QUARANTINE_COMPRESSIONS: tuple = ("none", "gzip", "bz2", "xz")
+
+
+def _parse_limit(value, limit_type: type) -> Optional[Union[int, float]]:
+    """
+    function parsing a resource limit setting, a missing or
+    non positive limit value means no limit
+    :param value:
+    :param limit_type:
+    :return:
+    """
+    try:
+        limit: Union[int, float] = limit_type(value)
+    except (TypeError, ValueError):
+        return None
+    return limit if limit > 0 else None
+
 
 class Settings:
     """
     settings class
     """
 
+    __slots__ = (
+        "skip_column_validations_on_empty_file",
+        "raise_exception_and_halt_on_failed_validation",
+        "logging_level",
+        "max_field_size",
+        "max_line_length",
+        "max_rss_mb",
+        "file_timeout_seconds",
+        "halt_on_failed_cheap_file_validation",
+        "first_failure_per_cell",
+        "quarantine_directory",
+        "quarantine_compression",
+        "progress_interval_seconds",
+        "progress_metrics_file",
+        "progress_http_port",
+        "sidecar_index_directory",
+    )
+
     def __init__(
         self,
         skip_column_validations_on_empty_file,
         raise_exception_and_halt_on_failed_validation,
+        logging_level="DEBUG",
+        max_field_size=None,
+        max_line_length=None,
+        max_rss_mb=None,
+        file_timeout_seconds=None,
+        halt_on_failed_cheap_file_validation=False,
+        first_failure_per_cell=False,
+        quarantine_directory=None,
+        quarantine_compression="none",
+        progress_interval_seconds=None,
+        progress_metrics_file=None,
+        progress_http_port=None,
+        sidecar_index_directory=None,
     ):
         self.skip_column_validations_on_empty_file: bool = skip_column_validations_on_empty_file
         self.raise_exception_and_halt_on_failed_validation: bool = raise_exception_and_halt_on_failed_validation
+        self.logging_level: str = logging_level
+        self.max_field_size: Optional[int] = max_field_size
+        self.max_line_length: Optional[int] = max_line_length
+        self.max_rss_mb: Optional[float] = max_rss_mb
+        self.file_timeout_seconds: Optional[float] = file_timeout_seconds
+        self.halt_on_failed_cheap_file_validation: bool = halt_on_failed_cheap_file_validation
+        self.first_failure_per_cell: bool = first_failure_per_cell
+        self.quarantine_directory: Optional[str] = quarantine_directory
+        self.quarantine_compression: str = quarantine_compression
+        self.progress_interval_seconds: Optional[float] = progress_interval_seconds
+        self.progress_metrics_file: Optional[str] = progress_metrics_file
+        self.progress_http_port: Optional[int] = progress_http_port
+        self.sidecar_index_directory: Optional[str] = sidecar_index_directory
 
 
 def prepare_settings(settings_file_loc="settings.conf") -> Settings:
@@ -66,4 +129,41 @@ def prepare_settings(settings_file_loc="settings.conf") -> Settings:
     if settings["raise_exception_and_halt_on_failed_validation"] not in (True, False):
         settings["raise_exception_and_halt_on_failed_validation"] = False
 
+    if settings.get("halt_on_failed_cheap_file_validation") not in (True, False):
+        settings["halt_on_failed_cheap_file_validation"] = False
+
+    if settings.get("first_failure_per_cell") not in (True, False):
+        settings["first_failure_per_cell"] = False
+
+    # an empty quarantine directory means no quarantine output
+    settings["quarantine_directory"] = settings.get("quarantine_directory") or None
+
+    if str(settings.get("quarantine_compression", "")).lower() in QUARANTINE_COMPRESSIONS:
+        settings["quarantine_compression"] = settings["quarantine_compression"].lower()
+    else:
+        settings["quarantine_compression"] = "none"
+
+    # without an interval the progress is not reported, an empty
+    # metrics file means the progress is reported to stderr
+    settings["progress_interval_seconds"] = _parse_limit(
+        settings.get("progress_interval_seconds"), float
+    )
+    settings["progress_metrics_file"] = settings.get("progress_metrics_file") or None
+    settings["progress_http_port"] = _parse_limit(settings.get("progress_http_port"), int)
+
+    # an empty sidecar index directory means no sidecar index
+    settings["sidecar_index_directory"] = settings.get("sidecar_index_directory") or None
+
+    if str(settings.get("logging_level", "")).upper() in LOGGING_LEVELS:
+        settings["logging_level"] = settings["logging_level"].upper()
+    else:
+        settings["logging_level"] = "DEBUG"
+
+    settings["max_field_size"] = _parse_limit(settings.get("max_field_size"), int)
+    settings["max_line_length"] = _parse_limit(settings.get("max_line_length"), int)
+    settings["max_rss_mb"] = _parse_limit(settings.get("max_rss_mb"), float)
+    settings["file_timeout_seconds"] = _parse_limit(
+        settings.get("file_timeout_seconds"), float
+    )
+
     return Settings(**settings)
@@ -0,0 +1,418 @@
+"""
+sidecar index module, the column statistics of the csv file blocks are collected
+while the file is validated and stored in a sidecar index, later validations
+with other configs skip the blocks the statistics prove to pass the column rules
+"""
+import hashlib
+import json
+import os
+import tempfile
+from typing import Dict, Generator, Iterable, List, Optional, Set, Tuple
+
+from csv_file_validator import __version__
+from csv_file_validator.archive import split_archive_member_name
+from csv_file_validator.config import Config
+from csv_file_validator.file import File, FileByteRange, RecordRange
+
+SIDECAR_INDEX_EXTENSION: str = ".sidecar.json"
+# blocks are byte ranges of complete records of at least the block size
+SIDECAR_INDEX_BLOCK_SIZE: int = 4 * 1024 * 1024
+# columns with more distinct values in a block keep no distinct set for it
+SIDECAR_INDEX_MAX_DISTINCT: int = 64
+# the column rules the statistics can prove, only the columns with
+# one of them in the config building the index get statistics
+PROVABLE_RULES: frozenset = frozenset(
+    ("allow_int_value_range", "allow_fixed_value_list", "allow_fixed_value")
+)
+
+
+class ColumnStats:
+    """
+    column statistics of a block class, the distinct values up to the max distinct count
+    and the min and max value of the column values all being integers
+    """
+
+    __slots__ = ("distinct", "all_int", "int_min", "int_max")
+
+    def __init__(
+        self,
+        distinct: Optional[Set[str]] = None,
+        all_int: bool = True,
+        int_min: Optional[int] = None,
+        int_max: Optional[int] = None,
+    ):
+        self.distinct: Optional[Set[str]] = set() if distinct is None else distinct
+        self.all_int: bool = all_int
+        self.int_min: Optional[int] = int_min
+        self.int_max: Optional[int] = int_max
+
+    def add(self, column_value: str) -> None:
+        """
+        method adding a column value to the statistics, the integers
+        are parsed like the allow_int_value_range rule does
+        :param column_value:
+        :return:
+        """
+        distinct: Optional[Set[str]] = self.distinct
+        if distinct is not None:
+            distinct.add(column_value)
+            if len(distinct) > SIDECAR_INDEX_MAX_DISTINCT:
+                self.distinct = None
+
+        if self.all_int:
+            try:
+                number: int = int(column_value)
+            except ValueError:
+                self.all_int = False
+                self.int_min = self.int_max = None
+                return
+            if self.int_min is None or number < self.int_min:
+                self.int_min = number
+            if self.int_max is None or number > self.int_max:
+                self.int_max = number
+
+    def passes(self, rule_name: str, validation_value) -> bool:
+        """
+        method checking the statistics prove every column value passes the rule,
+        False means the column values have to be validated
+        :param rule_name:
+        :param validation_value:
+        :return:
+        """
+        if rule_name == "allow_int_value_range":
+            if not self.all_int:
+                return False
+            # a block without values has no min and max
+            return self.int_min is None or (
+                validation_value[0] <= self.int_min and self.int_max <= validation_value[1]
+            )
+        if rule_name == "allow_fixed_value_list":
+            return self.distinct is not None and self.distinct.issubset(
+                str(value) for value in validation_value
+            )
+        if rule_name == "allow_fixed_value":
+            return self.distinct is not None and self.distinct.issubset((str(validation_value),))
+        return False
+
+    def to_list(self) -> list:
+        """
+        method returning the statistics as a json serializable list
+        :return:
+        """
+        return [
+            None if self.distinct is None else sorted(self.distinct),
+            self.all_int,
+            self.int_min,
+            self.int_max,
+        ]
+
+    @classmethod
+    def from_list(cls, stats: list) -> "ColumnStats":
+        """
+        method creating the statistics from the list written by to_list
+        :param stats:
+        :return:
+        """
+        distinct, all_int, int_min, int_max = stats
+        return cls(
+            distinct=None if distinct is None else set(distinct),
+            all_int=all_int,
+            int_min=int_min,
+            int_max=int_max,
+        )
+
+
+class IndexBlock:
+    """
+    sidecar index block class, a byte range of complete records with the statistics
+    of its column values, the header row is not part of the statistics,
+    the columns without statistics have None
+    """
+
+    __slots__ = ("record_range", "column_stats")
+
+    def __init__(self, record_range: RecordRange, column_stats: List[Optional[ColumnStats]]):
+        self.record_range: RecordRange = record_range
+        self.column_stats: List[Optional[ColumnStats]] = column_stats
+
+    def passes(self, column_rules: Dict[int, dict]) -> bool:
+        """
+        method checking the block statistics prove every row of the block passes the rules
+        :param column_rules: column validation rules by the column index
+        :return:
+        """
+        for column_index, rules in column_rules.items():
+            if column_index >= len(self.column_stats):
+                return False
+            stats: Optional[ColumnStats] = self.column_stats[column_index]
+            if stats is None:
+                return False
+            for rule_name, validation_value in rules.items():
+                try:
+                    if not stats.passes(rule_name, validation_value):
+                        return False
+                except (TypeError, ValueError, IndexError, KeyError):
+                    # a malformed rule value is left to the validation to report
+                    return False
+        return True
+
+
+def get_file_fingerprint(file: File) -> Optional[dict]:
+    """
+    function returning the fingerprint of a csv file, a sidecar index with another
+    fingerprint was built for other file content or another csv format,
+    archive members are not indexed
+    :param file:
+    :return:
+    """
+    if split_archive_member_name(file.name) is not None:
+        return None
+    file_stat = os.stat(file.name)
+    return {
+        "version": __version__,
+        "file": os.path.abspath(file.name),
+        "size": file_stat.st_size,
+        "mtime_ns": file_stat.st_mtime_ns,
+        "encoding": file.encoding,
+        "file_value_separator": file.csv_properties.file_value_separator,
+        "file_value_quote_char": file.csv_properties.file_value_quote_char,
+        "file_row_terminator": file.csv_properties.file_row_terminator,
+        "file_has_header": bool(file.header),
+    }
+
+
+def get_sidecar_index_path(directory: str, file_name: str) -> str:
+    """
+    function returning the sidecar index path of a file, named by the file path hash
+    :param directory:
+    :param file_name:
+    :return:
+    """
+    path_hash: str = hashlib.sha256(os.path.abspath(file_name).encode()).hexdigest()
+    return os.path.join(directory, path_hash + SIDECAR_INDEX_EXTENSION)
+
+
+class SidecarIndex:
+    """
+    sidecar index class, the blocks of a csv file with their column statistics
+    """
+
+    __slots__ = ("fingerprint", "blocks", "skipped_row_count")
+
+    def __init__(self, fingerprint: dict, blocks: List[IndexBlock]):
+        self.fingerprint: dict = fingerprint
+        self.blocks: List[IndexBlock] = blocks
+        self.skipped_row_count: int = 0
+
+    def get_undecided_ranges(
+        self, config: Config, column_index_map: Dict[str, int], has_header: bool
+    ) -> List[RecordRange]:
+        """
+        method returning the byte ranges of the blocks to validate, the blocks proven
+        to pass the column rules are left out and consecutive blocks are merged,
+        the statistics prove nothing about the row rules, so no block is left out for them
+        :param config:
+        :param column_index_map:
+        :param has_header:
+        :return:
+        """
+        column_rules: Dict[int, dict] = {
+            column_index_map[column]: rules
+            for column, rules in config.column_validation_rules.items()
+        }
+        self.skipped_row_count = 0
+        record_ranges: List[RecordRange] = []
+
+        for block in self.blocks:
+            block_range: RecordRange = block.record_range
+            if not config.row_validation_rules and block.passes(column_rules):
+                self.skipped_row_count += block_range.row_count - (
+                    1 if has_header and block_range.first_row_number == 1 else 0
+                )
+            elif record_ranges and record_ranges[-1].end == block_range.start:
+                record_ranges[-1].end = block_range.end
+                record_ranges[-1].row_count += block_range.row_count
+            else:
+                record_ranges.append(
+                    RecordRange(
+                        block_range.start,
+                        block_range.end,
+                        block_range.first_row_number,
+                        block_range.row_count,
+                    )
+                )
+        return record_ranges
+
+    def row_generator(self, config: Config, file: File) -> Generator:
+        """
+        file reading generator method, yielding row number and the row values as a list
+        of the blocks not proven to pass the column rules by the sidecar index
+        :param config:
+        :param file:
+        :return:
+        """
+        for record_range in self.get_undecided_ranges(
+            config, file.get_column_index_map(), bool(file.header)
+        ):
+            range_file: FileByteRange = FileByteRange(
+                config, file.name, record_range, resource_guard=file.resource_guard
+            )
+            try:
+                yield from range_file.row_generator()
+            finally:
+                range_file.close_file_handler()
+
+    def write(self, directory: str) -> None:
+        """
+        method writing the sidecar index, to a temporary file first
+        so concurrent runs never read a partial index
+        :param directory:
+        :return:
+        """
+        os.makedirs(directory, exist_ok=True)
+        content: dict = {
+            "fingerprint": self.fingerprint,
+            "blocks": [
+                [
+                    block.record_range.start,
+                    block.record_range.end,
+                    block.record_range.first_row_number,
+                    block.record_range.row_count,
+                    [None if stats is None else stats.to_list() for stats in block.column_stats],
+                ]
+                for block in self.blocks
+            ],
+        }
+        file_descriptor, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, mode="w") as temp_file:
+                json.dump(content, temp_file, separators=(",", ":"))
+            os.replace(temp_path, get_sidecar_index_path(directory, self.fingerprint["file"]))
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+
+def load_sidecar_index(directory: str, file: File) -> Optional[SidecarIndex]:
+    """
+    function loading the sidecar index of a file, None when there is no index
+    matching the file fingerprint, an unreadable index counts as no index
+    :param directory:
+    :param file:
+    :return:
+    """
+    fingerprint: Optional[dict] = get_file_fingerprint(file)
+    if fingerprint is None:
+        return None
+    try:
+        with open(get_sidecar_index_path(directory, file.name), mode="r") as index_file:
+            content: dict = json.load(index_file)
+        if content["fingerprint"] != fingerprint:
+            return None
+        blocks: List[IndexBlock] = [
+            IndexBlock(
+                RecordRange(start, end, first_row_number, row_count),
+                [
+                    None if stats is None else ColumnStats.from_list(stats)
+                    for stats in column_stats
+                ],
+            )
+            for start, end, first_row_number, row_count, column_stats in content["blocks"]
+        ]
+    except Exception:
+        return None
+    return SidecarIndex(fingerprint, blocks)
+
+
+class SidecarIndexBuilder:
+    """
+    sidecar index builder class, collecting the column statistics of the blocks
+    from the rows read by the validation, only for the columns by the stats indexes
+    """
+
+    __slots__ = ("fingerprint", "blocks", "column_count", "stats_indexes", "is_complete")
+
+    def __init__(
+        self,
+        fingerprint: dict,
+        record_ranges: List[RecordRange],
+        column_count: int,
+        stats_indexes: Iterable[int],
+    ):
+        self.fingerprint: dict = fingerprint
+        self.column_count: int = column_count
+        self.stats_indexes: List[int] = sorted(set(stats_indexes))
+        self.blocks: List[IndexBlock] = []
+        for record_range in record_ranges:
+            column_stats: List[Optional[ColumnStats]] = [None] * column_count
+            for column_index in self.stats_indexes:
+                column_stats[column_index] = ColumnStats()
+            self.blocks.append(IndexBlock(record_range, column_stats))
+        self.is_complete: bool = False
+
+    def collect(self, rows: Iterable[Tuple[int, List[str]]]) -> Generator:
+        """
+        generator method passing the rows through while collecting the statistics,
+        the index is complete only once all the rows were read
+        :param rows:
+        :return:
+        """
+        block_index: int = -1
+        next_block_row: float = 0
+        indexed_stats: List[Tuple[int, ColumnStats]] = []
+
+        for row_number, row in rows:
+            while row_number >= next_block_row:
+                block_index += 1
+                column_stats: List[Optional[ColumnStats]] = self.blocks[block_index].column_stats
+                indexed_stats = [
+                    (column_index, column_stats[column_index])
+                    for column_index in self.stats_indexes
+                ]
+                next_block_row = (
+                    self.blocks[block_index + 1].record_range.first_row_number
+                    if block_index + 1 < len(self.blocks)
+                    else float("inf")
+                )
+            for column_index, stats in indexed_stats:
+                stats.add(row[column_index])
+            yield row_number, row
+
+        self.is_complete = True
+
+    def build(self) -> SidecarIndex:
+        """
+        method returning the sidecar index of the collected statistics
+        :return:
+        """
+        return SidecarIndex(self.fingerprint, self.blocks)
+
+
+def create_sidecar_index_builder(config: Config, file: File) -> Optional[SidecarIndexBuilder]:
+    """
+    function creating the sidecar index builder of a file, the file is split to the blocks
+    by a binary scan, an extra read of the file before its validation, the statistics are
+    collected for the columns with a provable rule in the config, None for the files
+    which cannot be indexed, like archive members or files in encodings not compatible
+    with ascii, or when the config has no provable rule
+    :param config:
+    :param file:
+    :return:
+    """
+    fingerprint: Optional[dict] = get_file_fingerprint(file)
+    if fingerprint is None:
+        return None
+    column_index_map: Dict[str, int] = file.get_column_index_map()
+    stats_indexes: List[int] = [
+        column_index_map[column]
+        for column, rules in config.column_validation_rules.items()
+        if not PROVABLE_RULES.isdisjoint(rules)
+    ]
+    if not stats_indexes:
+        return None
+    record_ranges: List[RecordRange] = file.get_record_ranges(SIDECAR_INDEX_BLOCK_SIZE)
+    if not record_ranges:
+        return None
+    return SidecarIndexBuilder(
+        fingerprint, record_ranges, file.file_first_row_column_count, stats_indexes
+    )
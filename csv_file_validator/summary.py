@@ -0,0 +1,137 @@
+"""
+summary module, the machine readable validation results
+"""
+import json
+import sys
+from collections import Counter
+from typing import Dict, IO, List, Optional
+
+SUMMARY_FORMATS: tuple = ("ndjson", "json")
+
+
+class ValidationStats:
+    """
+    validation statistics class of a file, the failed validations
+    are counted per rule like they are laid out in the config
+    """
+
+    __slots__ = (
+        "duration_seconds",
+        "row_count",
+        "file_rule_failures",
+        "column_rule_failures",
+        "row_rule_failures",
+    )
+
+    def __init__(self):
+        self.duration_seconds: float = 0.0
+        self.row_count: Optional[int] = None
+        self.file_rule_failures: Counter = Counter()
+        self.column_rule_failures: Dict[str, Counter] = {}
+        self.row_rule_failures: Counter = Counter()
+
+    @property
+    def rows_per_second(self) -> Optional[float]:
+        """
+        validated rows per second property
+        :return:
+        """
+        if self.row_count is None or self.duration_seconds <= 0:
+            return None
+        return self.row_count / self.duration_seconds
+
+    def add_row_count(self, row_count: int) -> None:
+        """
+        method adding the count of validated rows
+        :param row_count:
+        :return:
+        """
+        self.row_count = (self.row_count or 0) + row_count
+
+    def merge(self, other: "ValidationStats") -> None:
+        """
+        method merging the statistics of another part of the same file, the duration is not merged
+        :param other:
+        :return:
+        """
+        if other.row_count is not None:
+            self.add_row_count(other.row_count)
+        self.file_rule_failures.update(other.file_rule_failures)
+        for column, rule_failures in other.column_rule_failures.items():
+            self.column_rule_failures.setdefault(column, Counter()).update(rule_failures)
+        self.row_rule_failures.update(other.row_rule_failures)
+
+    def to_dict(self) -> dict:
+        """
+        method returning the statistics as a json serializable dict
+        :return:
+        """
+        rows_per_second: Optional[float] = self.rows_per_second
+        return {
+            "duration_seconds": round(self.duration_seconds, 6),
+            "rows": self.row_count,
+            "rows_per_second": None if rows_per_second is None else round(rows_per_second, 1),
+            "failed_validations": {
+                "file_validation_rules": dict(self.file_rule_failures),
+                "column_validation_rules": {
+                    column: dict(rule_failures)
+                    for column, rule_failures in self.column_rule_failures.items()
+                    if rule_failures
+                },
+                "row_validation_rules": dict(self.row_rule_failures),
+            },
+        }
+
+
+class SummaryWriter:
+    """
+    summary writer class, with the ndjson format every file result is written
+    as soon as it is added, with the json format a single document is written on close
+    """
+
+    def __init__(self, location: str, summary_format: str = "ndjson"):
+        self.summary_format: str = summary_format
+        self._stream: IO = sys.stdout if location == "-" else open(location, mode="w")
+        self._file_results: List[dict] = []
+        self._result_counts: Counter = Counter()
+        self._duration_seconds: float = 0.0
+
+    def add(self, item) -> None:
+        """
+        method adding a ValidationResultItem to the summary
+        :param item:
+        :return:
+        """
+        file_result: dict = {"file_name": item.file_name, "result": item.result.name}
+        if item.stats is not None:
+            file_result.update(item.stats.to_dict())
+            self._duration_seconds += item.stats.duration_seconds
+        self._result_counts[item.result.name] += 1
+
+        if self.summary_format == "ndjson":
+            self._stream.write(json.dumps({"type": "file", **file_result}) + "\n")
+            self._stream.flush()
+        else:
+            self._file_results.append(file_result)
+
+    def close(self) -> None:
+        """
+        method writing the totals and closing the summary stream
+        :return:
+        """
+        totals: dict = {
+            "files": sum(self._result_counts.values()),
+            "results": dict(self._result_counts),
+            "duration_seconds": round(self._duration_seconds, 6),
+        }
+
+        if self.summary_format == "ndjson":
+            self._stream.write(json.dumps({"type": "summary", **totals}) + "\n")
+        else:
+            json.dump({"files": self._file_results, "summary": totals}, self._stream)
+            self._stream.write("\n")
+
+        if self._stream is sys.stdout:
+            self._stream.flush()
+        else:
+            self._stream.close()
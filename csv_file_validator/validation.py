@@ -2,39 +2,144 @@
 validation module
 """
 
-from typing import List
+from collections import Counter
+from enum import Enum
+from typing import Container, Dict, Iterable, List, Optional, Tuple
 
 from csv_file_validator.config import Config
 from csv_file_validator.exceptions import InvalidConfigException
-from csv_file_validator.file import File
-from csv_file_validator.validation_functions import execute_mapped_validation_function
+from csv_file_validator.file import FileReader
+from csv_file_validator.summary import ValidationStats
+from csv_file_validator.validation_functions import (
+    execute_mapped_validation_function,
+    get_rule_cost,
+    RuleCost,
+)
 
 
-def validate_file(file_validations: dict, file: File) -> int:
+class ValidationResultEnum(Enum):
+    SUCCESS = 0
+    FAILURE = 1
+    COULD_NOT_PROCESS = 2
+    RESOURCE_LIMIT_EXCEEDED = 3
+
+
+# the validation results from the least to the most severe, a run exits with
+# the value of its most severe result and a split file gets the most severe result of its parts
+RESULT_SEVERITY: Tuple[ValidationResultEnum, ...] = (
+    ValidationResultEnum.SUCCESS,
+    ValidationResultEnum.FAILURE,
+    ValidationResultEnum.COULD_NOT_PROCESS,
+    ValidationResultEnum.RESOURCE_LIMIT_EXCEEDED,
+)
+
+
+def get_most_severe_result(results: Iterable[ValidationResultEnum]) -> ValidationResultEnum:
     """
-    function for validating a file, for every file validation, call
-    the mapped validation function and process it
+    function returning the most severe of the validation results, SUCCESS for no results
+    :param results:
+    :return:
+    """
+    return max(results, key=RESULT_SEVERITY.index, default=ValidationResultEnum.SUCCESS)
+
+
+class ValidationResultItem:
+    __slots__ = ("file_name", "result", "stats")
+
+    def __init__(
+        self,
+        file_name: str,
+        result: ValidationResultEnum,
+        stats: Optional[ValidationStats] = None,
+    ):
+        self.file_name: str = file_name
+        self.result: ValidationResultEnum = result
+        self.stats: Optional[ValidationStats] = stats
+
+    def __repr__(self):
+        return f"{self.file_name} -> {self.result.name}"
+
+
+def validate_file_metadata(
+    file_validations: dict,
+    file_name: str,
+    file_size: int,
+    failed_rules: Optional[Counter] = None,
+) -> int:
+    """
+    function for validating a file before it gets opened, for every file validation
+    needing only the file name or size, call the mapped validation function and process it
+    :param file_validations:
+    :param file_name:
+    :param file_size:
+    :param failed_rules: optional counter of the failed validations per rule
     :return:
     """
     file_validations_fail_count: int = 0
 
     for validation, validation_value in file_validations.items():
-        file_validations_fail_count += execute_mapped_validation_function(
-            validation,
-            **{
-                "file_name": file.name,
-                "file_header": file.header,
-                "file_row_count": file.data_row_count,
-                "file_size": file.size,
-                "validation_value": validation_value,
-            },
+        if get_rule_cost(validation) is RuleCost.METADATA:
+            validation_result: int = execute_mapped_validation_function(
+                validation,
+                **{
+                    "file_name": file_name,
+                    "file_size": file_size,
+                    "validation_value": validation_value,
+                },
+            )
+            file_validations_fail_count += validation_result
+            if validation_result and failed_rules is not None:
+                failed_rules[validation] += validation_result
+
+    return file_validations_fail_count
+
+
+def validate_file(
+    file_validations: dict,
+    file: FileReader,
+    rule_costs: Container[RuleCost] = tuple(RuleCost),
+    failed_rules: Optional[Counter] = None,
+) -> int:
+    """
+    function for validating a file, for every file validation of the rule cost classes,
+    call the mapped validation function and process it, the validations are evaluated
+    from the cheapest cost class and the file row count is computed only when needed
+    :param file_validations:
+    :param file:
+    :param rule_costs:
+    :param failed_rules: optional counter of the failed validations per rule
+    :return:
+    """
+    file_validations_fail_count: int = 0
+
+    for validation, validation_value in sorted(
+        file_validations.items(), key=lambda item: get_rule_cost(item[0])
+    ):
+        rule_cost: RuleCost = get_rule_cost(validation)
+        if rule_cost not in rule_costs:
+            continue
+
+        validation_kwargs: dict = {
+            "file_name": file.name,
+            "file_header": file.header,
+            "file_size": file.size,
+            "validation_value": validation_value,
+        }
+        if rule_cost is RuleCost.FULL_SCAN:
+            validation_kwargs["file_row_count"] = file.data_row_count
+
+        validation_result: int = execute_mapped_validation_function(
+            validation, **validation_kwargs
         )
+        file_validations_fail_count += validation_result
+        if validation_result and failed_rules is not None:
+            failed_rules[validation] += validation_result
 
     return file_validations_fail_count
 
 
 def check_column_validation_rules_align_with_file_content(
-    config: Config, file: File
+    config: Config, file: FileReader
 ) -> None:
     """
     function checking column validation rules align with the file content
@@ -42,29 +147,22 @@ def check_column_validation_rules_align_with_file_content(
     :param file:
     :return:
     """
-    column_identifiers_in_file: List[str] = []
-
-    if file.header:
-        column_identifiers_in_file.extend(file.header)
-    else:
-        column_identifiers_in_file.extend([
-            str(index) for index in range(0, file.get_first_row_column_count())
-        ])
-
-    column_validation_rules_names_in_config: List[str] = list(
-        config.column_validation_rules.keys()
-    )
+    column_index_map: Dict[str, int] = file.get_column_index_map()
 
-    if not column_identifiers_in_file:
+    if not column_index_map:
         raise InvalidConfigException(
             "Column validations set in the config, "
             "but none of the expected columns found in the file"
         )
 
-    if not all(
-        item in column_identifiers_in_file
-        for item in column_validation_rules_names_in_config
-    ):
+    expected_columns: List[str] = list(config.column_validation_rules)
+    if config.row_validation_rules:
+        # pylint: disable=import-outside-toplevel
+        from csv_file_validator.expressions import get_row_rule_columns
+
+        expected_columns.extend(get_row_rule_columns(config.row_validation_rules))
+
+    if not all(column_name in column_index_map for column_name in expected_columns):
         raise InvalidConfigException(
             "Column validations set in the config, "
             "but not all expected columns found in the file"
@@ -74,7 +172,8 @@ def check_column_validation_rules_align_with_file_content(
 def validate_line_values(column_validations: dict, line: dict, idx: int) -> int:
     """
     function for validating a line in a file, for every column validation, call
-    the mapped validation function and process it
+    the mapped validation function and process it, the file rows are validated
+    by a rule plan compiled once per file instead
     :param column_validations:
     :param line:
     :param idx:
@@ -6,17 +6,60 @@ import logging
 import os
 import re
 from datetime import datetime
-from decimal import Decimal, ROUND_HALF_EVEN
-from typing import Optional, Union
-
-from dateutil import parser
+from enum import IntEnum
+from typing import Callable, Optional, Tuple, Union
 
+from csv_file_validator.archive import ARCHIVE_MEMBER_SEPARATOR
 from csv_file_validator.exceptions import InvalidConfigException
+from csv_file_validator.numeric import get_float_range, get_type_check
+from csv_file_validator.plugins import compile_rule_plugin, get_rule_plugin, RulePlugin
 
 logger = logging.getLogger(__name__)
 
+_DATEUTIL_PARSER = None
+
+
+class RuleCost(IntEnum):
+    """
+    validation rule cost class enum, cheaper rules are evaluated first
+    """
 
-def _log_validation_error(func_name: str, **kwargs) -> None:
+    # needs only the file name or the file size
+    METADATA = 0
+    # needs the file header row
+    HEADER = 1
+    # needs a full scan of the file
+    FULL_SCAN = 2
+
+
+def _get_dateutil_parser():
+    """
+    function lazily importing the dateutil parser, it is needed only
+    by the datetime data type rule and costs a lot on the CLI startup
+    :return:
+    """
+    global _DATEUTIL_PARSER  # pylint: disable=global-statement
+    if _DATEUTIL_PARSER is None:
+        from dateutil import parser  # pylint: disable=import-outside-toplevel
+
+        _DATEUTIL_PARSER = parser
+    return _DATEUTIL_PARSER
+
+
+def parse_datetime_value(data_type: str, column_value: str) -> datetime:
+    """
+    function parsing a column value of the datetime data type, either any datetime
+    format recognized by dateutil, or the strptime format of a datetime.<format> data type
+    :param data_type:
+    :param column_value:
+    :return:
+    """
+    if data_type == "datetime":
+        return _get_dateutil_parser().parse(column_value)
+    return datetime.strptime(column_value, data_type[data_type.find(".") + 1:])
+
+
+def log_validation_error(func_name: str, **kwargs) -> None:
     """
     function responsible for handling the logging of the failed validations
     :param func_name:
@@ -41,6 +84,34 @@ def _log_validation_error(func_name: str, **kwargs) -> None:
     logger.error(logged_string)
 
 
+def call_validation_function(
+    func: Callable, **kwargs
+) -> Tuple[int, Optional[Exception]]:
+    """
+    function calling an undecorated validation function, returning the validation
+    result together with the Error the validation function raised, if any
+    :param func:
+    :param kwargs:
+    :return:
+    """
+    try:
+        return func(**kwargs), None
+    except (
+        ValueError,
+        TypeError,
+        KeyError,
+        IndexError,
+        AttributeError,
+        ArithmeticError,
+    ) as err:
+        # in case validation function raised Error,
+        # still need to add one more failed validation
+        # for the __main__ error counter
+        return 1, err
+    except Exception as exc:
+        raise RuntimeError(f"Unexpected Exception {exc} in {func.__name__}")
+
+
 def logging_decorator(func):
     """
     logging decorator for validation functions
@@ -50,26 +121,12 @@ def logging_decorator(func):
 
     @functools.wraps(func)
     def wrapper_decorator(**kwargs):
-        try:
-            validation_result: int = func(**kwargs)
-        except (
-            ValueError,
-            TypeError,
-            KeyError,
-            IndexError,
-            AttributeError,
-            ArithmeticError,
-        ) as err:
-            # in case validation function raised Error,
-            # still need to add one more failed validation
-            # for the __main__ error counter
-            validation_result = 1
+        validation_result, err = call_validation_function(func, **kwargs)
+        if err is not None:
             kwargs["Exception"] = err
-        except Exception as exc:
-            raise RuntimeError(f"Unexpected Exception {exc} in {func.__name__}")
 
         if validation_result != 0:
-            _log_validation_error(func_name=func.__name__, **kwargs)
+            log_validation_error(func_name=func.__name__, **kwargs)
 
         return validation_result
 
@@ -90,6 +147,19 @@ def check_file_extension(**kwargs) -> int:
     return 1
 
 
+def get_file_mask_name(file_name: str) -> str:
+    """
+    function returning the file name without the path and the extension,
+    the file masks are matched against it, archive members by their member base name
+    :param file_name:
+    :return:
+    """
+    member_name: str = file_name.rpartition(ARCHIVE_MEMBER_SEPARATOR)[2]
+    full_path_file_name: str = os.path.split(member_name)[-1]
+    dot_index: int = full_path_file_name.rfind(".")
+    return full_path_file_name[:dot_index]
+
+
 @logging_decorator
 def check_file_mask(**kwargs) -> int:
     """
@@ -97,9 +167,7 @@ def check_file_mask(**kwargs) -> int:
     :param kwargs:
     :return:
     """
-    full_path_file_name: str = os.path.split(kwargs.get("file_name"))[-1]
-    dot_index: int = full_path_file_name.rfind(".")
-    filename: str = full_path_file_name[:dot_index]
+    filename: str = get_file_mask_name(kwargs.get("file_name"))
 
     if re.match(kwargs.get("validation_value"), filename):
         return 0
@@ -109,15 +177,15 @@ def check_file_mask(**kwargs) -> int:
 @logging_decorator
 def check_file_size_range(**kwargs) -> int:
     """
-    validation function checking file size in MB is inside a numeric range
+    validation function checking file size in bytes is inside a MB numeric range
     provided by the list of int values [min value, max value]
     :param kwargs:
     :return:
     """
     if (
-        kwargs.get("validation_value")[1]
+        kwargs.get("validation_value")[1] * 1024 * 1024
         >= kwargs.get("file_size")
-        >= kwargs.get("validation_value")[0]
+        >= kwargs.get("validation_value")[0] * 1024 * 1024
     ):
         return 0
     return 1
@@ -155,29 +223,24 @@ def check_file_header_column_names(**kwargs) -> int:
 @logging_decorator
 def check_column_allow_data_type(**kwargs) -> int:
     """
-    validation function checking column value data type is equal to the expected data type
+    validation function checking column value data type is equal to the expected data type,
+    the numeric and boolean data types are checked by patterns, never raising on a failed value
     :param kwargs:
     :return:
     """
+    type_check: Optional[Callable[[str], object]] = get_type_check(
+        kwargs.get("validation_value")
+    )
+    if type_check is not None:
+        return 0 if type_check(kwargs.get("column_value")) else 1
     if kwargs.get("validation_value") == "str":
         if str(kwargs.get("column_value")):
             return 0
-    elif kwargs.get("validation_value") == "int":
-        if kwargs.get("column_value").isdigit():
-            return 0
-    elif kwargs.get("validation_value") == "float":
-        if "." in kwargs.get("column_value"):
-            float(kwargs.get("column_value"))
-            return 0
-    elif kwargs.get("validation_value") == "datetime":
-        if parser.parse(kwargs.get("column_value")):
+    elif kwargs.get("validation_value") == "datetime" or kwargs.get(
+        "validation_value"
+    ).startswith("datetime."):
+        if parse_datetime_value(kwargs.get("validation_value"), kwargs.get("column_value")):
             return 0
-    elif kwargs.get("validation_value").startswith("datetime."):
-        datetime_w_format = kwargs.get("validation_value")
-        dot_index = datetime_w_format.find(".") + 1
-        fmt = datetime_w_format[dot_index:]
-        datetime.strptime(kwargs.get("column_value"), fmt)
-        return 0
     return 1
 
 
@@ -202,21 +265,13 @@ def check_column_allow_int_value_range(**kwargs) -> int:
 def check_column_allow_float_value_range(**kwargs) -> int:
     """
     validation function checking column value is inside a float value range
-    provided by the list of float values [min value, max value]
+    provided by the list of float values [min value, max value], or by the dict
+    {"min": value, "max": value, "inclusive": bool, "precision": int or null},
+    the values and the bounds are rounded to the precision, 2 decimal places by default
     :param kwargs:
     :return:
     """
-    lower_range: Decimal = Decimal(kwargs.get("validation_value")[0]).quantize(
-        Decimal(".01"), rounding=ROUND_HALF_EVEN
-    )
-    upper_range: Decimal = Decimal(kwargs.get("validation_value")[1]).quantize(
-        Decimal(".01"), rounding=ROUND_HALF_EVEN
-    )
-    column_value: Decimal = Decimal(kwargs.get("column_value")).quantize(
-        Decimal(".01"), rounding=ROUND_HALF_EVEN
-    )
-
-    if lower_range.compare(column_value) < 0 < upper_range.compare(column_value):
+    if get_float_range(kwargs.get("validation_value")).contains(kwargs.get("column_value")):
         return 0
     return 1
 
@@ -269,6 +324,29 @@ def check_column_allow_regex(**kwargs) -> int:
     return 1
 
 
+def has_mapped_validation_function(attribute: str) -> bool:
+    """
+    function checking a config rule is mapped to a built-in validation function
+    :param attribute:
+    :return:
+    """
+    return attribute in _ATTRIBUTE_FUNC_MAP
+
+
+def get_mapped_validation_function(attribute: str) -> Callable:
+    """
+    function returning the undecorated validation function mapped to a config rule
+    :param attribute:
+    :return:
+    """
+    try:
+        return _ATTRIBUTE_FUNC_MAP[attribute].__wrapped__
+    except KeyError:
+        raise InvalidConfigException(
+            f"function {attribute} not found in " f"function_caller attribute_func_map"
+        )
+
+
 def execute_mapped_validation_function(attribute, **kwargs):
     """
     mapping method between config rules and validation functions
@@ -281,9 +359,15 @@ def execute_mapped_validation_function(attribute, **kwargs):
             return_value: Optional[Union[str, bool]] = func(**kwargs)
             break
     else:
-        raise InvalidConfigException(
-            f"function {attribute} not found in " f"function_caller attribute_func_map"
+        plugin: Optional[RulePlugin] = get_rule_plugin(attribute)
+        if plugin is None:
+            raise InvalidConfigException(
+                f"function {attribute} not found in " f"function_caller attribute_func_map"
+            )
+        plugin_func, _ = compile_rule_plugin(
+            attribute, plugin, kwargs.get("validation_value")
         )
+        return_value = logging_decorator(plugin_func)(**kwargs)
     return return_value
 
 
@@ -301,3 +385,21 @@ _ATTRIBUTE_FUNC_MAP: dict = {
     "allow_substring": check_column_allow_substring,
     "allow_fixed_value": check_column_allow_fixed_value,
 }
+
+_ATTRIBUTE_COST_MAP: dict = {
+    "file_name_file_mask": RuleCost.METADATA,
+    "file_extension": RuleCost.METADATA,
+    "file_size_range": RuleCost.METADATA,
+    "file_header_column_names": RuleCost.HEADER,
+    "file_row_count_range": RuleCost.FULL_SCAN,
+}
+
+
+def get_rule_cost(attribute: str) -> RuleCost:
+    """
+    function returning the cost class of a config rule, rules
+    without a registered cost class might need a full file scan
+    :param attribute:
+    :return:
+    """
+    return _ATTRIBUTE_COST_MAP.get(attribute, RuleCost.FULL_SCAN)
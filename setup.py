@@ -14,6 +14,8 @@ setuptools.setup(
     url="https://github.com/datahappy1/csv_file_validator",
     packages=setuptools.find_packages(),
     include_package_data=True,
+    install_requires=["python-dateutil"],
+    extras_require={"columnar": ["pyarrow"]},
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
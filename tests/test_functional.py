@@ -1,14 +1,31 @@
+import csv
+import gzip
 import json
 import logging
 import os
+import sys
+import tarfile
+import zipfile
 
 import pytest
 
-from csv_file_validator.__main__ import process_file, ValidationResultEnum
-from csv_file_validator.config import Config, \
+from csv_file_validator.__main__ import get_exit_code, EXIT_CODE_INVALID_RUN
+from csv_file_validator.archive import iter_archive_members
+from csv_file_validator.argument_parser import prepare_args
+from csv_file_validator.config import Config, load_config, \
     get_validated_config
-from csv_file_validator.exceptions import InvalidConfigException
+from csv_file_validator import distributed, file as file_module, sidecar_index
+from csv_file_validator.discovery import iter_file_locations
+from csv_file_validator.exceptions import FoundValidationErrorsException, InvalidConfigException
+from csv_file_validator.file import File, FileByteRange
+from csv_file_validator.processing import process_file, iter_validation_results, \
+    process_column_validations, validate_file_location
+from csv_file_validator.progress import ProgressReporter
+from csv_file_validator.quarantine import get_output_file_names
+from csv_file_validator.routing import ConfigRouter, load_routing_manifest
 from csv_file_validator.settings_parser import Settings
+from csv_file_validator.summary import SummaryWriter, ValidationStats
+from csv_file_validator.validation import ValidationResultEnum, ValidationResultItem
 
 
 class TestsFunctionalConfig:
@@ -38,6 +55,26 @@ class TestsFunctionalConfig:
 
         assert get_validated_config(correct_config)
 
+    def test_load_config(self, tmp_path):
+        config_file = tmp_path / 'config.json'
+        config_file.write_text(json.dumps({
+            "file_metadata": {"file_value_separator": ",",
+                              "file_row_terminator": "\n",
+                              "file_value_quote_char": "\"",
+                              "file_has_header": True},
+            "file_validation_rules": {"file_name_file_mask": ".+\\d+"},
+        }))
+
+        config = load_config(str(config_file))
+        assert isinstance(config, Config)
+        assert config.file_validation_rules == {"file_name_file_mask": ".+\\d+"}
+        assert config.column_validation_rules == {}
+        assert config.row_validation_rules == {}
+
+        config_file.write_text('[]')
+        with pytest.raises(InvalidConfigException, match='not a JSON object'):
+            load_config(str(config_file))
+
     def test_incorrect_config_model1(self):
         incorrect_config = {
             "file_metadata": {"some_invalid_key": True,
@@ -95,6 +132,185 @@ class TestsFunctionalConfig:
             get_validated_config(empty_config)
 
 
+class TestsFunctionalFile:
+    CONFIG = {
+        "file_metadata": {"file_value_separator": ",",
+                          "file_row_terminator": "\n",
+                          "file_value_quote_char": "\"",
+                          "file_has_header": True},
+        "file_validation_rules": {"file_row_count_range": [0, 10]},
+        "column_validation_rules": {}
+    }
+
+    def test_data_row_count_with_quoted_terminators(self, tmp_path):
+        file_loc = tmp_path / 'quoted.csv'
+        file_loc.write_text('Name,Comment\nA,"multi\nline"\nB,plain\nC,"with ""quotes"", and\r\nbreaks"')
+
+        file = File(Config(**TestsFunctionalFile.CONFIG), str(file_loc))
+
+        assert file.data_row_count == 3
+        assert file.size == os.path.getsize(file_loc)
+        file.close_file_handler()
+
+    def test_data_row_count_without_quotes(self, tmp_path):
+        file_loc = tmp_path / 'plain.csv'
+        file_loc.write_text('Name,Comment\n' + 'A,b\n' * 5000)
+
+        file = File(Config(**TestsFunctionalFile.CONFIG), str(file_loc))
+
+        assert file.data_row_count == 5000
+        file.close_file_handler()
+
+
+    def test_record_ranges(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(file_module, 'ROW_COUNT_BLOCK_SIZE', 8)
+        file_loc = tmp_path / 'quoted.csv'
+        file_loc.write_text('Name,Comment\nA,"multi\nline"\nB,plain\nC,"with ""quotes"", and\r\nbreaks"\nD,last')
+
+        config = Config(**TestsFunctionalFile.CONFIG)
+        file = File(config, str(file_loc))
+        record_ranges = file.get_record_ranges(16)
+        all_rows = list(file.file_read_generator())
+        file.close_file_handler()
+
+        assert len(record_ranges) > 1
+        assert record_ranges[0].start == 0 and record_ranges[-1].end == os.path.getsize(file_loc)
+        assert all(previous.end == following.start for previous, following in zip(record_ranges, record_ranges[1:]))
+
+        range_rows = []
+        for record_range in record_ranges:
+            file_range = FileByteRange(config, str(file_loc), record_range)
+            range_length = record_range.end - record_range.start
+            assert file_range.get_read_progress() == (0, range_length)
+            range_rows.extend(file_range.file_read_generator())
+            assert file_range.get_read_progress() == (range_length, range_length)
+            file_range.close_file_handler()
+
+        assert range_rows == all_rows
+
+    def test_record_ranges_with_literal_quote_chars(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(file_module, 'ROW_COUNT_BLOCK_SIZE', 16)
+        file_loc = tmp_path / 'literal_quotes.csv'
+        # the quote chars within unquoted values are literal ones for the csv reader
+        rows = ['Name,Comment', 'TV,5" screen'] + [f'P{index},"quoted, {index}"' for index in range(30)] + \
+               ['Q,"multi\nline ""quoted"" value"', 'R,"a"b"c', 'S,end']
+        file_loc.write_text('\n'.join(rows) + '\n')
+
+        config = Config(**TestsFunctionalFile.CONFIG)
+        file = File(config, str(file_loc))
+        record_ranges = file.get_record_ranges(64)
+        assert file.data_row_count == 34
+        all_rows = list(file.file_read_generator())
+        file.close_file_handler()
+
+        assert len(record_ranges) > 4
+        range_rows = []
+        for record_range in record_ranges:
+            file_range = FileByteRange(config, str(file_loc), record_range)
+            range_rows.extend(file_range.file_read_generator())
+            file_range.close_file_handler()
+
+        assert range_rows == all_rows
+
+    def test_record_ranges_with_even_quote_char_count(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(file_module, 'ROW_COUNT_BLOCK_SIZE', 7)
+        file_loc = tmp_path / 'even_quotes.csv'
+        # the first block holds a literal quote char and the opening one of a quoted value
+        file_loc.write_text('a"b\n"c\nd"\n')
+
+        config = Config(**{**TestsFunctionalFile.CONFIG,
+                           "file_metadata": {**TestsFunctionalFile.CONFIG["file_metadata"],
+                                             "file_has_header": False}})
+        file = File(config, str(file_loc))
+        record_ranges = file.get_record_ranges(1)
+        all_rows = list(file.row_generator())
+        file.close_file_handler()
+
+        assert all_rows == [(1, ['a"b']), (2, ['c\nd'])]
+        assert [(record_range.start, record_range.end) for record_range in record_ranges] == [(0, 4), (4, 10)]
+        assert sum(record_range.row_count for record_range in record_ranges) == 2
+
+
+    @pytest.mark.parametrize('file_encoding,file_content', [
+        ('utf8', '\ufeffName,City\nA,Z\u00fcrich\r\nB,"Gen\u00e8ve\n"\n'.encode('utf-8')),
+        ('latin-1', 'Name,City\nA,Z\u00fcrich\r\nB,"Gen\u00e8ve\n"\n'.encode('latin-1')),
+        ('utf-16', 'Name,City\nA,Z\u00fcrich\r\nB,"Gen\u00e8ve\n"\n'.encode('utf-16')),
+    ])
+    def test_file_encodings(self, tmp_path, file_encoding, file_content):
+        file_loc = tmp_path / 'encoded.csv'
+        file_loc.write_bytes(file_content)
+
+        config = dict(TestsFunctionalFile.CONFIG)
+        config['file_metadata'] = dict(config['file_metadata'], file_encoding=file_encoding)
+        file = File(Config(**config), str(file_loc))
+
+        assert file.header == ['Name', 'City']
+        assert file.data_row_count == 2
+        assert [line for _, line in file.file_read_generator()] == \
+               [{'Name': 'A', 'City': 'Z\u00fcrich'}, {'Name': 'B', 'City': 'Gen\u00e8ve\n'}]
+        file.close_file_handler()
+
+    def test_unknown_file_encoding(self):
+        config = dict(TestsFunctionalFile.CONFIG)
+        config['file_metadata'] = dict(config['file_metadata'], file_encoding='no-such-encoding')
+
+        with pytest.raises(InvalidConfigException):
+            get_validated_config(config)
+
+
+class TestsFunctionalDiscovery:
+    @staticmethod
+    def create_landing_folder(tmp_path):
+        for file_name in ('SalesJan2009.csv', 'SalesFeb2009.csv', 'readme.txt', 'nested/SalesMar2009.csv',
+                          'nested/deeper/SalesApr2009.csv', 'nested/deeper/SalesApr2009.csv.tmp'):
+            (tmp_path / file_name).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / file_name).write_text('a,b\n')
+        return str(tmp_path)
+
+    def test_non_recursive(self, tmp_path):
+        location = TestsFunctionalDiscovery.create_landing_folder(tmp_path)
+
+        assert sorted(os.path.basename(file_loc) for file_loc in iter_file_locations(location)) == [
+            'SalesFeb2009.csv', 'SalesJan2009.csv', 'readme.txt']
+
+    def test_recursive_with_globs(self, tmp_path):
+        location = TestsFunctionalDiscovery.create_landing_folder(tmp_path)
+
+        file_locs = iter_file_locations(location, recursive=True, include=['*.csv'], exclude=['nested/deeper/*'])
+
+        assert sorted(os.path.relpath(file_loc, location) for file_loc in file_locs) == [
+            'SalesFeb2009.csv', 'SalesJan2009.csv', os.path.join('nested', 'SalesMar2009.csv')]
+
+    def test_prefilter_and_max_files(self, tmp_path):
+        location = TestsFunctionalDiscovery.create_landing_folder(tmp_path)
+        file_validation_rules = {'file_extension': 'csv', 'file_name_file_mask': 'Sales(Jan|Apr)'}
+
+        file_locs = iter_file_locations(location, recursive=True, file_validation_rules=file_validation_rules)
+
+        assert sorted(os.path.basename(file_loc) for file_loc in file_locs) == [
+            'SalesApr2009.csv', 'SalesJan2009.csv']
+
+        assert len(list(iter_file_locations(location, recursive=True, max_files=2))) == 2
+
+    def test_prefilter_cli_argument(self, tmp_path, monkeypatch):
+        location = TestsFunctionalDiscovery.create_landing_folder(tmp_path / 'landing')
+        config_file = tmp_path / 'config.json'
+        config_file.write_text(json.dumps({
+            "file_metadata": {"file_value_separator": ",",
+                              "file_row_terminator": "\n",
+                              "file_value_quote_char": "\"",
+                              "file_has_header": True},
+            "file_validation_rules": {"file_extension": "csv", "file_name_file_mask": "Sales(Jan|Apr)"},
+        }))
+
+        monkeypatch.setattr(sys, 'argv', ['csv_file_validator', '-fl', location, '-cfg', str(config_file),
+                                          '-r', '-pf'])
+        args = prepare_args()
+
+        assert sorted(os.path.basename(file_loc) for file_loc in args['file_loc']) == [
+            'SalesApr2009.csv', 'SalesJan2009.csv']
+
+
 class TestsFunctionalValidation:
     @staticmethod
     def open_config_file(config):
@@ -298,3 +514,547 @@ class TestsFunctionalValidation:
         assert ValidationResultEnum.FAILURE == process_file(parsed_config, settings, args['file_loc'])
 
         assert 'SalesJan2009_without_header_inconsistent_columns_file.csv cannot be validated, column count is not consistent, row' in caplog.text
+
+    def test_iter_validation_results(self):
+        args = {'file_loc': [os.getcwd() + '/files/csv/with_header/SalesJan2009_with_header_correct_file.csv',
+                             os.getcwd() + '/files/csv/with_header/SalesJan2009_with_header_incorrect_file.csv'],
+                'config': os.getcwd() + '/files/configs/config_with_header.json'}
+
+        parsed_config = TestsFunctionalValidation.open_config_file(args['config'])
+
+        settings = Settings(**{'skip_column_validations_on_empty_file': True,
+                               'raise_exception_and_halt_on_failed_validation': False})
+
+        results = iter_validation_results(parsed_config, settings, iter(args['file_loc']))
+
+        first_result = next(results)
+        assert first_result.file_name == args['file_loc'][0]
+        assert first_result.result == ValidationResultEnum.SUCCESS
+        assert not hasattr(first_result, '__dict__')
+
+        assert [item.result for item in results] == [ValidationResultEnum.FAILURE]
+
+    def test_validation_summary_and_exit_code(self, tmp_path):
+        args = {'file_loc': [os.getcwd() + '/files/csv/with_header/SalesJan2009_with_header_correct_file.csv',
+                             os.getcwd() + '/files/csv/with_header/SalesJan2009_with_header_incorrect_file.csv'],
+                'config': os.getcwd() + '/files/configs/config_with_header.json'}
+
+        parsed_config = TestsFunctionalValidation.open_config_file(args['config'])
+
+        settings = Settings(**{'skip_column_validations_on_empty_file': True,
+                               'raise_exception_and_halt_on_failed_validation': False})
+
+        summary_loc = tmp_path / 'summary.ndjson'
+        summary_writer = SummaryWriter(str(summary_loc))
+        result_items = list(iter_validation_results(parsed_config, settings, args['file_loc']))
+        for result_item in result_items:
+            summary_writer.add(result_item)
+        summary_writer.close()
+
+        correct_file, incorrect_file, totals = [json.loads(line) for line in summary_loc.read_text().splitlines()]
+        assert correct_file['result'] == 'SUCCESS' and correct_file['rows'] == 998
+        assert incorrect_file['failed_validations']['column_validation_rules'] == \
+               {'Price': {'allow_int_value_range': 1, 'allow_data_type': 1}}
+        assert totals == {'type': 'summary', 'files': 2, 'results': {'SUCCESS': 1, 'FAILURE': 1},
+                          'duration_seconds': totals['duration_seconds']}
+
+        assert get_exit_code(result_items) == ValidationResultEnum.FAILURE.value
+        assert get_exit_code(result_items[:1]) == 0
+        assert get_exit_code(None) == EXIT_CODE_INVALID_RUN
+
+    def test_most_severe_result_of_runs_and_split_files(self):
+        results = [ValidationResultEnum.RESOURCE_LIMIT_EXCEEDED, ValidationResultEnum.COULD_NOT_PROCESS,
+                   ValidationResultEnum.FAILURE]
+        assert get_exit_code([ValidationResultItem('file.csv', result) for result in results]) == \
+               ValidationResultEnum.RESOURCE_LIMIT_EXCEEDED.value
+
+        # the tasks of a split file are merged to the same result as the files of a run
+        file_job = distributed._FileJob('file.csv', len(results))
+        for task_id, result in enumerate(results):
+            file_job.add_result(distributed.TaskResult(task_id, result, ValidationStats(), []))
+        assert file_job.result is ValidationResultEnum.RESOURCE_LIMIT_EXCEEDED
+
+    def test_cheap_file_validation_failure_halts(self, tmp_path, caplog):
+        file_loc = tmp_path / 'SalesJan2009_misrouted.txt'
+        file_loc.write_text('a,b\n1\n')
+
+        parsed_config = TestsFunctionalValidation.open_config_file(os.getcwd() + '/files/configs/config_with_header.json')
+
+        settings = Settings(**{'skip_column_validations_on_empty_file': True,
+                               'raise_exception_and_halt_on_failed_validation': False,
+                               'halt_on_failed_cheap_file_validation': True})
+
+        caplog.set_level(logging.INFO)
+
+        assert ValidationResultEnum.FAILURE == process_file(parsed_config, settings, str(file_loc))
+
+        assert 'check_file_extension - failed to meet this value : csv' in caplog.text
+        assert 'Evaluation of a cheap file validation rule failed' in caplog.text
+        assert f'Validation of {file_loc} started' not in caplog.text
+        assert 'check_file_header_column_names' not in caplog.text
+
+    @staticmethod
+    def write_routing_manifest(tmp_path):
+        manifest_loc = tmp_path / 'manifest.json'
+        manifest_loc.write_text(json.dumps({"routes": [
+            {"file_mask": ".+_with_header_", "config": os.getcwd() + '/files/configs/config_with_header.json'},
+            {"file_mask": ".+_without_header_", "config": os.getcwd() + '/files/configs/config_without_header.json'},
+        ]}))
+        return str(manifest_loc)
+
+    def test_routing_manifest(self, tmp_path):
+        config_router = load_routing_manifest(TestsFunctionalValidation.write_routing_manifest(tmp_path))
+        unrouted_file_loc = tmp_path / 'SalesJan2009.csv'
+        unrouted_file_loc.write_text('a,b\n1,2\n')
+        file_locs = [os.getcwd() + '/files/csv/with_header/SalesJan2009_with_header_correct_file.csv',
+                     os.getcwd() + '/files/csv/without_header/SalesJan2009_without_header_correct_file.csv',
+                     os.getcwd() + '/files/csv/without_header/SalesJan2009_without_header_incorrect_file.csv',
+                     str(unrouted_file_loc)]
+
+        settings = Settings(**{'skip_column_validations_on_empty_file': True,
+                               'raise_exception_and_halt_on_failed_validation': False})
+
+        results = [item.result for item in iter_validation_results(None, settings, file_locs,
+                                                                   config_router=config_router)]
+
+        assert results == [ValidationResultEnum.SUCCESS, ValidationResultEnum.SUCCESS,
+                           ValidationResultEnum.FAILURE, ValidationResultEnum.FAILURE]
+
+    @pytest.mark.parametrize('file_masks', [['Sales', 'SalesJan'], ['Sales', '(?i)salesjan'], ['(S)ales\\1?', 'SalesJan']])
+    def test_config_router_first_route_wins(self, file_masks):
+        configs = [Config(**TestsFunctionalFile.CONFIG), Config(**TestsFunctionalFile.CONFIG)]
+        config_router = ConfigRouter(list(zip(file_masks, configs)))
+
+        assert config_router.get_route_index('/landing/SalesJan2009.csv') == 0
+        assert config_router.get_route_index('/landing/bundle.zip::folder/salesJan2009.csv') == \
+               (1 if file_masks[1].startswith('(?i)') else None)
+        assert config_router.get_config('/landing/SalesJan2009.csv') is configs[0]
+        assert config_router.get_route_index('/landing/bundle.zip::SalesJan2009.csv') == 0
+
+    FIXED_WIDTH_CONFIG = {
+        "file_metadata": {"file_value_separator": ",",
+                          "file_row_terminator": "\n",
+                          "file_value_quote_char": "\"",
+                          "file_has_header": True,
+                          "file_format": "fixed_width",
+                          "file_fixed_width_columns": [[0, 8], [8, 6], [14, 10]]},
+        "file_validation_rules": {"file_row_count_range": [3, 3],
+                                  "file_header_column_names": ["Product", "Price", "Country"]},
+        "column_validation_rules": {"Price": {"allow_int_value_range": [0, 2000]},
+                                    "Country": {"allow_fixed_value_list": ["Norway", "Spain"]}}
+    }
+
+    @pytest.mark.parametrize('file_content,expected_result', [
+        ('Product Price Country   \nProduct1  1200Norway    \nProduct2   800Spain     \nProduct3  1500Norway    \n',
+         ValidationResultEnum.SUCCESS),
+        ('Product Price Country   \nProduct1  1200Norway    \nProduct2  9999Spain     \nProduct3  1500Italy     ',
+         ValidationResultEnum.FAILURE),
+    ])
+    def test_fixed_width_file(self, tmp_path, caplog, file_content, expected_result):
+        file_loc = tmp_path / 'SalesJan2009.txt'
+        file_loc.write_text(file_content)
+
+        settings = Settings(**{'skip_column_validations_on_empty_file': True,
+                               'raise_exception_and_halt_on_failed_validation': False})
+
+        caplog.set_level(logging.ERROR)
+
+        assert expected_result == process_file(Config(**TestsFunctionalValidation.FIXED_WIDTH_CONFIG),
+                                               settings, str(file_loc))
+
+        if expected_result == ValidationResultEnum.FAILURE:
+            assert 'check_column_allow_int_value_range - failed to meet this value : [0, 2000] - Row#: 3' \
+                   in caplog.text
+            assert 'check_column_allow_fixed_value_list - failed to meet this value : [\'Norway\', \'Spain\'] ' \
+                   '- Row#: 4 - Column name: Country - Column value: Italy' in caplog.text
+
+    def test_fixed_width_file_short_record(self, tmp_path, caplog):
+        file_loc = tmp_path / 'SalesJan2009.txt'
+        file_loc.write_text('Product Price Country   \nProduct1  1200Norway    \nProduct2   800\n')
+
+        settings = Settings(**{'skip_column_validations_on_empty_file': True,
+                               'raise_exception_and_halt_on_failed_validation': False})
+
+        caplog.set_level(logging.ERROR)
+
+        assert ValidationResultEnum.FAILURE == process_file(Config(**TestsFunctionalValidation.FIXED_WIDTH_CONFIG),
+                                                            settings, str(file_loc))
+
+        assert 'row #: 3, expected record length: 24, actual record length: 14' in caplog.text
+
+    @pytest.mark.parametrize('compression,opener', [('none', open), ('gzip', gzip.open)])
+    def test_quarantine_output(self, tmp_path, compression, opener):
+        file_loc = tmp_path / 'SalesJan2009.csv'
+        file_loc.write_text('Product;Price;Country\n"Product;1";1200;Norway\nProduct2;9999;Italy\nProduct3;800;Spain\n')
+
+        parsed_config = Config(**{
+            "file_metadata": {"file_value_separator": ";",
+                              "file_row_terminator": "\n",
+                              "file_value_quote_char": "\"",
+                              "file_has_header": True},
+            "file_validation_rules": {},
+            "column_validation_rules": {"Price": {"allow_int_value_range": [0, 2000]},
+                                        "Country": {"allow_fixed_value_list": ["Norway", "Spain"]}}
+        })
+
+        settings = Settings(**{'skip_column_validations_on_empty_file': True,
+                               'raise_exception_and_halt_on_failed_validation': False,
+                               'quarantine_directory': str(tmp_path / 'quarantine'),
+                               'quarantine_compression': compression})
+
+        assert ValidationResultEnum.FAILURE == process_file(parsed_config, settings, str(file_loc))
+
+        clean_file_name, quarantine_file_name = get_output_file_names(str(file_loc), str(tmp_path / 'quarantine'),
+                                                                      compression)
+        extension = '.gz' if compression == 'gzip' else ''
+        assert clean_file_name.startswith(str(tmp_path / 'quarantine' / 'SalesJan2009.'))
+        assert clean_file_name.endswith(f'.clean.csv{extension}')
+        assert sorted(os.listdir(tmp_path / 'quarantine')) == sorted([os.path.basename(clean_file_name),
+                                                                      os.path.basename(quarantine_file_name)])
+        with opener(clean_file_name, 'rt', newline='') as clean_file:
+            assert clean_file.read() == 'Product;Price;Country\n"Product;1";1200;Norway\nProduct3;800;Spain\n'
+        with opener(quarantine_file_name, 'rt', newline='') as quarantine_file:
+            assert quarantine_file.read() == 'Product;Price;Country;failed_validations\n' \
+                                             'Product2;9999;Italy;"Price:allow_int_value_range;' \
+                                             'Country:allow_fixed_value_list"\n'
+
+    def test_quarantine_output_names_and_halted_files(self, tmp_path):
+        # files of the same base name in other folders or archives get their own outputs
+        assert len({get_output_file_names(file_name, str(tmp_path))
+                    for file_name in ('/a/SalesJan2009.csv', '/b/SalesJan2009.csv',
+                                      '/a/bundle.zip::SalesJan2009.csv')}) == 3
+
+        file_loc = tmp_path / 'SalesJan2009.csv'
+        file_loc.write_text('Product;Price\nProduct1;1200\nProduct2;9999\nProduct3;800\n')
+        parsed_config = Config(**{
+            "file_metadata": {"file_value_separator": ";",
+                              "file_row_terminator": "\n",
+                              "file_value_quote_char": "\"",
+                              "file_has_header": True},
+            "file_validation_rules": {},
+            "column_validation_rules": {"Price": {"allow_int_value_range": [0, 2000]}}
+        })
+        settings = Settings(**{'skip_column_validations_on_empty_file': True,
+                               'raise_exception_and_halt_on_failed_validation': True,
+                               'quarantine_directory': str(tmp_path / 'quarantine')})
+
+        assert ValidationResultEnum.FAILURE == process_file(parsed_config, settings, str(file_loc))
+        # a halted file leaves no truncated outputs
+        assert os.listdir(tmp_path / 'quarantine') == []
+
+    def test_progress_reporting(self, tmp_path):
+        file_loc = tmp_path / 'SalesJan2009.csv'
+        file_loc.write_text('Product;Price;Country\nProduct1;1200;Norway\nProduct2;9999;Italy\nProduct3;800;Spain\n')
+
+        parsed_config = Config(**{
+            "file_metadata": {"file_value_separator": ";",
+                              "file_row_terminator": "\n",
+                              "file_value_quote_char": "\"",
+                              "file_has_header": True},
+            "file_validation_rules": {},
+            "column_validation_rules": {"Price": {"allow_int_value_range": [0, 2000]}}
+        })
+
+        settings = Settings(**{'skip_column_validations_on_empty_file': True,
+                               'raise_exception_and_halt_on_failed_validation': False})
+
+        metrics_file_loc = tmp_path / 'progress.jsonl'
+        # the reporter is not started, so the progress is sampled only by the test
+        reporter = ProgressReporter(3600, metrics_file=str(metrics_file_loc))
+        file = File(parsed_config, str(file_loc))
+        progress = reporter.start_file(str(file_loc), file)
+
+        with pytest.raises(FoundValidationErrorsException):
+            process_column_validations(parsed_config, settings, file, progress=progress)
+
+        metrics = reporter.render_metrics()
+        assert f'csv_file_validator_rows_validated{{file="{file_loc}"}} 3' in metrics
+        assert f'csv_file_validator_failed_validations{{file="{file_loc}"}} 1' in metrics
+        assert f'csv_file_validator_bytes_total{{file="{file_loc}"}} {os.path.getsize(file_loc)}' in metrics
+
+        file.close_file_handler()
+        reporter.finish_file(progress)
+
+        assert 'csv_file_validator_files_finished 1' in reporter.render_metrics()
+        with open(metrics_file_loc) as metrics_file:
+            final_report = json.loads(metrics_file.read())
+        assert final_report['file'] == str(file_loc)
+        assert final_report['rows'] == 3
+        assert final_report['failures'] == 1
+
+    def test_sidecar_index(self, tmp_path, caplog, monkeypatch):
+        monkeypatch.setattr(file_module, 'ROW_COUNT_BLOCK_SIZE', 16)
+        monkeypatch.setattr(sidecar_index, 'SIDECAR_INDEX_BLOCK_SIZE', 64)
+
+        file_loc = tmp_path / 'SalesJan2009.csv'
+        rows = ['Product;Price;Country'] + [f'Product{index};{1000 + index};Norway' for index in range(20)]
+        rows[15] = 'Product14;9999;Italy'
+        file_loc.write_text('\n'.join(rows) + '\n')
+
+        file_metadata = {"file_value_separator": ";",
+                         "file_row_terminator": "\n",
+                         "file_value_quote_char": "\"",
+                         "file_has_header": True}
+        building_config = Config(**{
+            "file_metadata": file_metadata,
+            "file_validation_rules": {},
+            "column_validation_rules": {"Product": {"allow_regex": "Product\\d+"},
+                                        "Price": {"allow_int_value_range": [0, 20000]},
+                                        "Country": {"allow_fixed_value_list": ["Norway", "Italy", "Spain"]}}
+        })
+        revised_config = Config(**{
+            "file_metadata": file_metadata,
+            "file_validation_rules": {},
+            "column_validation_rules": {"Price": {"allow_int_value_range": [0, 2000]},
+                                        "Country": {"allow_fixed_value_list": ["Norway", "Italy"]}}
+        })
+
+        settings = Settings(**{'skip_column_validations_on_empty_file': True,
+                               'raise_exception_and_halt_on_failed_validation': False,
+                               'sidecar_index_directory': str(tmp_path / 'index')})
+
+        caplog.set_level(logging.INFO)
+        result_item = validate_file_location(building_config, settings, str(file_loc))
+        assert ValidationResultEnum.SUCCESS == result_item.result
+        assert len(os.listdir(tmp_path / 'index')) == 1
+        assert 'Sidecar index proved' not in caplog.text
+
+        caplog.clear()
+        result_item = validate_file_location(revised_config, settings, str(file_loc))
+        assert ValidationResultEnum.FAILURE == result_item.result
+        assert result_item.stats.row_count == 20
+        assert 'Row#: 16 - Column name: Price - Column value: 9999' in caplog.text
+        assert 'Sidecar index proved 17 rows to pass' in caplog.text
+
+        # a column with a rule the statistics cannot prove is validated in every block
+        mixed_config = Config(**{
+            "file_metadata": file_metadata,
+            "file_validation_rules": {},
+            "column_validation_rules": {"Price": {"allow_int_value_range": [0, 20000],
+                                                  "allow_regex": "1\\d+"}}
+        })
+        caplog.clear()
+        result_item = validate_file_location(mixed_config, settings, str(file_loc))
+        assert ValidationResultEnum.FAILURE == result_item.result
+        assert result_item.stats.row_count == 20
+        assert 'check_column_allow_regex - failed to meet this value : 1\\d+ - Row#: 16' in caplog.text
+        assert 'Sidecar index proved 0 rows to pass' in caplog.text
+
+        # a column without a provable rule in the building config has no statistics
+        product_config = Config(**{
+            "file_metadata": file_metadata,
+            "file_validation_rules": {},
+            "column_validation_rules": {"Product": {"allow_fixed_value": "Product1"}}
+        })
+        caplog.clear()
+        result_item = validate_file_location(product_config, settings, str(file_loc))
+        assert ValidationResultEnum.FAILURE == result_item.result
+        assert 'Sidecar index proved 0 rows to pass' in caplog.text
+
+        # a changed file does not match the fingerprint of its sidecar index
+        file_loc.write_text('\n'.join(rows[:15]) + '\n')
+        caplog.clear()
+        result_item = validate_file_location(revised_config, settings, str(file_loc))
+        assert ValidationResultEnum.SUCCESS == result_item.result
+        assert 'Sidecar index proved' not in caplog.text
+
+    def test_row_validation_rules(self, tmp_path, caplog):
+        file_loc = tmp_path / 'Accounts.csv'
+        file_loc.write_text('Name;Account_Created;Last_Login;Payment_Type;Card_Number\n'
+                            'Anna;2020-01-01;2021-01-01;Visa;4111111111111111\n'
+                            'Bob;2021-03-01;2021-02-01;Amex;371449635398431\n'
+                            'Cid;2020-01-01;2021-01-01;Visa;5500000000000004\n')
+        config = get_validated_config({
+            "file_metadata": {"file_value_separator": ";",
+                              "file_row_terminator": "\n",
+                              "file_value_quote_char": "\"",
+                              "file_has_header": True},
+            "column_validation_rules": {"Last_Login": {"allow_data_type": "datetime.%Y-%m-%d"}},
+            "row_validation_rules": {
+                "login_after_created": "Last_Login >= datetime(Account_Created, '%Y-%m-%d')",
+                "visa_card": {"if": "Payment_Type == 'Visa'", "then": "matches(Card_Number, '4[0-9]{15}$')"}
+            }
+        })
+
+        settings = Settings(**{'skip_column_validations_on_empty_file': True,
+                               'raise_exception_and_halt_on_failed_validation': False})
+
+        caplog.set_level(logging.INFO)
+        result_item = validate_file_location(config, settings, str(file_loc))
+        assert ValidationResultEnum.FAILURE == result_item.result
+        assert 'Found 2 row validations' in caplog.text
+        assert 'check_row_visa_card' in caplog.text and 'Row#: 4 - Column name: Payment_Type, Card_Number' \
+               in caplog.text
+        assert result_item.stats.to_dict()['failed_validations']['row_validation_rules'] == \
+               {'login_after_created': 1, 'visa_card': 1}
+
+        with pytest.raises(InvalidConfigException):
+            get_validated_config({"file_metadata": {"file_value_separator": ";",
+                                                    "file_row_terminator": "\n",
+                                                    "file_value_quote_char": "\"",
+                                                    "file_has_header": True},
+                                  "row_validation_rules": {"injection": "__import__('os')"}})
+
+    def test_max_line_length_exceeded(self, tmp_path, caplog):
+        file_loc = tmp_path / 'SalesJan2009_long_line.csv'
+        file_loc.write_text('0,' + 'x' * 5000 + '\n')
+
+        parsed_config = Config(**TestsFunctionalFile.CONFIG)
+
+        settings = Settings(**{'skip_column_validations_on_empty_file': True,
+                               'raise_exception_and_halt_on_failed_validation': False,
+                               'max_line_length': 1000})
+
+        caplog.set_level(logging.ERROR)
+
+        assert ValidationResultEnum.RESOURCE_LIMIT_EXCEEDED == process_file(parsed_config, settings, str(file_loc))
+
+        assert 'line length exceeded the limit of 1000 characters' in caplog.text
+
+    def test_max_field_size_exceeded(self, tmp_path, caplog):
+        file_loc = tmp_path / 'SalesJan2009_big_field.csv'
+        file_loc.write_text('Name,Comment\nA,"' + 'x' * 5000 + '"\n')
+
+        parsed_config = Config(**TestsFunctionalFile.CONFIG)
+
+        settings = Settings(**{'skip_column_validations_on_empty_file': True,
+                               'raise_exception_and_halt_on_failed_validation': False,
+                               'max_field_size': 1000})
+
+        caplog.set_level(logging.ERROR)
+
+        field_size_limit = csv.field_size_limit()
+        try:
+            assert ValidationResultEnum.RESOURCE_LIMIT_EXCEEDED == process_file(parsed_config, settings,
+                                                                                str(file_loc))
+        finally:
+            csv.field_size_limit(field_size_limit)
+
+        assert 'field larger than field limit (1000)' in caplog.text
+
+    @staticmethod
+    def write_columnar_file(tmp_path, file_format):
+        pyarrow_csv = pytest.importorskip('pyarrow.csv')
+        table = pyarrow_csv.read_csv(os.getcwd() + '/files/csv/with_header/SalesJan2009_with_header_incorrect_file.csv')
+        file_loc = str(tmp_path / f'SalesJan2009.{file_format}')
+
+        if file_format == 'parquet':
+            pytest.importorskip('pyarrow.parquet').write_table(table, file_loc, row_group_size=300)
+        else:
+            pytest.importorskip('pyarrow.feather').write_feather(table, file_loc, compression='uncompressed',
+                                                                 chunksize=400)
+        return file_loc
+
+    @pytest.mark.parametrize('file_format', ['parquet', 'arrow'])
+    def test_incorrect_columnar_file(self, tmp_path, caplog, file_format):
+        file_loc = TestsFunctionalValidation.write_columnar_file(tmp_path, file_format)
+
+        with open(os.getcwd() + '/files/configs/config_with_header.json', mode='r') as json_file:
+            config = json.load(json_file)
+        config['file_metadata']['file_format'] = file_format
+        config['file_validation_rules']['file_extension'] = file_format
+
+        settings = Settings(**{'skip_column_validations_on_empty_file': True,
+                               'raise_exception_and_halt_on_failed_validation': False})
+
+        caplog.set_level(logging.ERROR)
+
+        assert ValidationResultEnum.FAILURE == process_file(Config(**config), settings, file_loc)
+
+        assert 'check_column_allow_int_value_range - failed to meet this value : [100, 100000] - Row#: 555 - ' \
+               'Column name: Price - Column value: 1200x' in caplog.text
+        assert 'check_file' not in caplog.text
+
+    @pytest.mark.parametrize('archive_name', ['SalesJan2009.zip', 'SalesJan2009.tar.gz'])
+    def test_archive_members(self, tmp_path, archive_name):
+        csv_folder = os.getcwd() + '/files/csv/with_header/'
+        member_names = ['SalesJan2009_with_header_correct_file.csv', 'SalesJan2009_with_header_incorrect_file.csv']
+        archive_loc = str(tmp_path / archive_name)
+
+        # members at the root of the archive and in a folder
+        member_paths = ['', 'bundle/']
+
+        if archive_name.endswith('.zip'):
+            with zipfile.ZipFile(archive_loc, mode='w', compression=zipfile.ZIP_DEFLATED) as zip_archive:
+                for member_path, member_name in zip(member_paths, member_names):
+                    zip_archive.write(csv_folder + member_name, arcname=member_path + member_name)
+        else:
+            with tarfile.open(archive_loc, mode='w:gz') as tar_archive:
+                for member_path, member_name in zip(member_paths, member_names):
+                    tar_archive.add(csv_folder + member_name, arcname=member_path + member_name)
+
+        parsed_config = TestsFunctionalValidation.open_config_file(os.getcwd() + '/files/configs/config_with_header.json')
+        # the file level rules see the member base name
+        parsed_config.file_validation_rules['file_name_file_mask'] = 'SalesJan2009_with_header'
+
+        settings = Settings(**{'skip_column_validations_on_empty_file': True,
+                               'raise_exception_and_halt_on_failed_validation': False})
+
+        results = iter_validation_results(parsed_config, settings, iter_archive_members(archive_loc), workers=2)
+
+        assert sorted((item.file_name, item.result) for item in results) == [
+            (f'{archive_loc}::{member_names[0]}', ValidationResultEnum.SUCCESS),
+            (f'{archive_loc}::bundle/{member_names[1]}', ValidationResultEnum.FAILURE),
+        ]
+
+
+class TestsFunctionalDistributed:
+    SETTINGS = {'skip_column_validations_on_empty_file': True,
+                'raise_exception_and_halt_on_failed_validation': False}
+
+    @staticmethod
+    def error_messages(caplog):
+        return sorted(record.getMessage() for record in caplog.records if record.levelno >= logging.ERROR)
+
+    def test_split_file_matches_local_validation(self, caplog, monkeypatch):
+        monkeypatch.setattr(file_module, 'ROW_COUNT_BLOCK_SIZE', 256)
+        file_loc = os.getcwd() + '/files/csv/with_header/SalesJan2009_with_header_incorrect_file.csv'
+        parsed_config = TestsFunctionalValidation.open_config_file(os.getcwd() + '/files/configs/config_with_header.json')
+        settings = Settings(**TestsFunctionalDistributed.SETTINGS)
+
+        caplog.set_level(logging.ERROR)
+        assert ValidationResultEnum.FAILURE == process_file(parsed_config, settings, file_loc)
+        local_errors = TestsFunctionalDistributed.error_messages(caplog)
+        caplog.clear()
+
+        coordinator = distributed.Coordinator(parsed_config, settings, local_workers=2, split_bytes=512)
+        results = list(coordinator.iter_validation_results([file_loc]))
+
+        assert [(item.file_name, item.result.name) for item in results] == [(file_loc, 'FAILURE')]
+        assert TestsFunctionalDistributed.error_messages(caplog) == local_errors
+
+    def test_routed_files(self, tmp_path):
+        config_router = load_routing_manifest(TestsFunctionalValidation.write_routing_manifest(tmp_path))
+        file_locs = [os.getcwd() + '/files/csv/with_header/SalesJan2009_with_header_correct_file.csv',
+                     os.getcwd() + '/files/csv/without_header/SalesJan2009_without_header_incorrect_file.csv',
+                     str(tmp_path / 'manifest.json')]
+
+        coordinator = distributed.Coordinator(None, Settings(**TestsFunctionalDistributed.SETTINGS),
+                                              local_workers=1, config_router=config_router)
+        results = {item.file_name: item.result for item in coordinator.iter_validation_results(file_locs)}
+
+        assert results == {file_locs[0]: ValidationResultEnum.SUCCESS,
+                           file_locs[1]: ValidationResultEnum.FAILURE,
+                           file_locs[2]: ValidationResultEnum.FAILURE}
+
+    def test_killed_worker_task_is_retried(self, tmp_path, monkeypatch):
+        marker = tmp_path / 'killed'
+        execute_task = distributed.execute_task
+
+        def execute_task_killed_once(config, settings, task):
+            if not marker.exists():
+                marker.touch()
+                os._exit(1)
+            return execute_task(config, settings, task)
+
+        monkeypatch.setattr(distributed, 'execute_task', execute_task_killed_once)
+        file_locs = [os.getcwd() + '/files/csv/with_header/SalesJan2009_with_header_correct_file.csv',
+                     os.getcwd() + '/files/csv/with_header/SalesJan2009_with_header_incorrect_file.csv']
+        parsed_config = TestsFunctionalValidation.open_config_file(os.getcwd() + '/files/configs/config_with_header.json')
+
+        coordinator = distributed.Coordinator(parsed_config, Settings(**TestsFunctionalDistributed.SETTINGS),
+                                              local_workers=1)
+        results = {item.file_name: item.result for item in coordinator.iter_validation_results(file_locs)}
+
+        assert marker.exists()
+        assert results == {file_locs[0]: ValidationResultEnum.SUCCESS, file_locs[1]: ValidationResultEnum.FAILURE}
@@ -1,4 +1,18 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
 from csv_file_validator import validation_functions
+from csv_file_validator.exceptions import InvalidConfigException, ResourceLimitExceededException
+from csv_file_validator.resource_guard import ResourceGuard
+from csv_file_validator import expressions, plugins, rule_plan
+from csv_file_validator.plugins import RulePlugin
+from csv_file_validator.rule_plan import ValueResultCache, ColumnRulePlan, RulePlan
+from csv_file_validator.settings_parser import Settings
+from csv_file_validator.validation import validate_file, validate_line_values
 
 
 class TestsFileLevelValidationFuncs:
@@ -55,6 +69,30 @@ class TestsFileLevelValidationFuncs:
             **TestsFileLevelValidationFuncs.TESTING_KWARGS) == 1
 
 
+    def test_validate_file_rule_costs(self):
+        class RowCountTrackingFile:
+            name = 'SalesJan2009.csv'
+            size = 10
+            header = ['Transaction_date']
+            row_count_computed = False
+
+            @property
+            def data_row_count(self):
+                self.row_count_computed = True
+                return 1
+
+        file = RowCountTrackingFile()
+        file_validations = {'file_row_count_range': [0, 1],
+                            'file_header_column_names': ['Product'],
+                            'file_extension': 'csv'}
+
+        assert validate_file(file_validations, file, rule_costs=(validation_functions.RuleCost.HEADER,)) == 1
+        assert not file.row_count_computed
+
+        assert validate_file(file_validations, file) == 1
+        assert file.row_count_computed
+
+
 class TestLineLevelValidationFuncs:
     TESTING_KWARGS_INT_COLUMN = {'column': 'Price',
                                  'column_value': '1201'}
@@ -72,6 +110,30 @@ class TestLineLevelValidationFuncs:
         assert validation_functions.check_column_allow_data_type(
             **TestLineLevelValidationFuncs.TESTING_KWARGS_INT_COLUMN) == 1
 
+    @pytest.mark.parametrize('data_type,column_value,expected_result', [
+        ('int', '-1201', 0),
+        ('int', '\u0661\u0662', 1),
+        ('int', '12.0', 1),
+        ('uint', '-1201', 1),
+        ('float', '1e5', 0),
+        ('float', '-.5', 0),
+        ('float', '1201', 1),
+        ('float', '1.2.3', 1),
+        ('int8', '-128', 0),
+        ('int8', '128', 1),
+        ('uint16', '65535', 0),
+        ('decimal(5,2)', '-123.45', 0),
+        ('decimal(5,2)', '0001.5', 0),
+        ('decimal(5,2)', '1234.5', 1),
+        ('decimal(5,2)', '1.234', 1),
+        ('decimal(5,2)', '.', 1),
+        ('bool', 'True', 0),
+        ('bool', 'maybe', 1),
+    ])
+    def test_check_column_allow_numeric_data_types(self, data_type, column_value, expected_result):
+        assert validation_functions.check_column_allow_data_type(
+            validation_value=data_type, column='Price', column_value=column_value) == expected_result
+
     def test_check_column_allow_int_value_range(self):
         TestLineLevelValidationFuncs.TESTING_KWARGS_INT_COLUMN['validation_value'] = [0, 2000]
         assert validation_functions.check_column_allow_int_value_range(
@@ -90,6 +152,22 @@ class TestLineLevelValidationFuncs:
         assert validation_functions.check_column_allow_float_value_range(
             **TestLineLevelValidationFuncs.TESTING_KWARGS_FLOAT_COLUMN) == 1
 
+    @pytest.mark.parametrize('validation_value,column_value,expected_result', [
+        ([-90, 90], '90.00', 1),
+        ([-90, 90], '89.994', 0),
+        ([-90, 90], '89.995', 1),
+        ({'min': -90, 'max': 90, 'inclusive': True}, '90.004', 0),
+        ({'min': -90, 'max': 90, 'inclusive': True}, '90.005', 0),
+        ({'min': -90, 'max': 90, 'inclusive': True}, '90.006', 1),
+        ({'min': -90, 'max': 90, 'inclusive': True, 'precision': None}, '90.000001', 1),
+        ({'min': -90, 'max': 90, 'precision': 6}, '-89.9999995', 1),
+        ([-90, 90], 'nan', 1),
+        ([-90, 90], 'north', 1),
+    ])
+    def test_check_column_allow_float_value_range_bounds(self, validation_value, column_value, expected_result):
+        assert validation_functions.check_column_allow_float_value_range(
+            validation_value=validation_value, column='Latitude', column_value=column_value) == expected_result
+
     def test_check_column_allow_fixed_value_list(self):
         TestLineLevelValidationFuncs.TESTING_KWARGS_INT_COLUMN['validation_value'] = [1201, 1202]
         assert validation_functions.check_column_allow_fixed_value_list(
@@ -125,3 +203,316 @@ class TestLineLevelValidationFuncs:
         TestLineLevelValidationFuncs.TESTING_KWARGS_STR_COLUMN['validation_value'] = '[A-D]'
         assert validation_functions.check_column_allow_regex(
             **TestLineLevelValidationFuncs.TESTING_KWARGS_STR_COLUMN) == 1
+
+    def test_validate_line_values(self, caplog):
+        column_validations = {'Price': {'allow_data_type': 'int', 'allow_int_value_range': [0, 1000]},
+                              'Country': {'allow_fixed_value_list': ['Norway']},
+                              'Missing': {'allow_regex': '.+'}}
+
+        assert validate_line_values(column_validations, {'Price': '1201', 'Country': 'Norway'}, 7) == 1
+        assert 'check_column_allow_int_value_range - failed to meet this value : [0, 1000] - Row#: 7' in caplog.text
+
+
+class TestsStartup:
+    def test_import_main_is_lazy(self):
+        completed = subprocess.run(
+            [sys.executable, '-c',
+             'import logging, sys, csv_file_validator.__main__; '
+             'print("dateutil" in sys.modules, bool(logging.getLogger().handlers))'],
+            stdout=subprocess.PIPE, universal_newlines=True, check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+        assert completed.stdout.split() == ['False', 'False']
+
+
+class TestsRulePlan:
+    def test_value_result_cache_lru_eviction(self):
+        value_cache = ValueResultCache(max_size=2, max_cardinality=10)
+        value_cache.put('Norway', ())
+        value_cache.put('Spain', ())
+        assert value_cache.get('Norway') == ()
+        value_cache.put('Italy', ())
+
+        assert value_cache.get('Spain') is None
+        assert value_cache.get('Norway') == ()
+        assert value_cache.enabled
+
+    def test_value_result_cache_switches_off_on_high_cardinality(self):
+        value_cache = ValueResultCache(max_size=2, max_cardinality=3)
+        for value in ('a', 'b', 'c', 'd'):
+            value_cache.put(value, ())
+
+        assert not value_cache.enabled
+        assert value_cache.get('d') is None
+
+    def test_column_rule_plan_memoizes_failures(self, caplog):
+        column_plan = ColumnRulePlan('Country', {'allow_fixed_value_list': ['Norway'],
+                                                 'allow_regex': '[a-z]+'})
+
+        assert column_plan.validate('Norway', 2) == 1
+        assert column_plan.validate('Spain', 3) == 2
+        assert column_plan.validate('Spain', 4) == 2
+
+        assert 'check_column_allow_fixed_value_list - failed to meet this value : [\'Norway\'] - Row#: 4' \
+               in caplog.text
+
+    def test_column_rule_plan_first_failure_only_orders_by_cost(self, caplog):
+        column_plan = ColumnRulePlan('Country', {'allow_regex': '[a-z]+',
+                                                 'allow_fixed_value': 'Norway'},
+                                     first_failure_only=True)
+
+        assert [rule.name for rule in column_plan.rules] == ['allow_fixed_value', 'allow_regex']
+        assert column_plan.validate('Spain', 2) == 1
+        assert 'check_column_allow_regex' not in caplog.text
+
+    def test_column_rule_plan_adapts_order_to_failure_rates(self, monkeypatch):
+        monkeypatch.setattr(rule_plan, 'RULE_ORDER_ADAPT_INTERVAL', 4)
+        column_plan = ColumnRulePlan('Price', {'allow_fixed_value_list': ['3', '4', '5', '6'],
+                                               'allow_int_value_range': [0, 2]},
+                                     first_failure_only=True)
+
+        for row_number, column_value in enumerate(('3', '4', '5', '6'), 2):
+            assert column_plan.validate(column_value, row_number) == 1
+
+        assert [rule.name for rule in column_plan.rules] == ['allow_int_value_range', 'allow_fixed_value_list']
+        assert column_plan.value_cache.get('3') is None
+
+    def test_column_rule_plan_checks_data_types_by_value_check(self, caplog):
+        column_plan = ColumnRulePlan('Price', {'allow_data_type': 'float', 'allow_fixed_value': '1e5'})
+        assert column_plan.rules[0].value_check is not None
+        assert column_plan.rules[1].value_check is None
+
+        assert column_plan.validate('1e5', 2) == 0
+        assert column_plan.validate('inf', 3) == 2
+        assert 'check_column_allow_data_type - failed to meet this value : float - Row#: 3' in caplog.text
+        # a value which is not a string fails the type check instead of raising
+        assert [rule.name for rule, _ in column_plan.get_failures(5)] == ['allow_data_type', 'allow_fixed_value']
+
+        assert ColumnRulePlan('Date', {'allow_data_type': 'datetime'}).rules[0].value_check is None
+
+    def test_rule_plan_validates_rows_by_bound_column_indexes(self):
+        plan = RulePlan({'Price': {'allow_int_value_range': [0, 2]},
+                         'Country': {'allow_fixed_value': 'Norway'}})
+        plan.bind_column_indexes({'Country': 3, 'Id': 0, 'Price': 1})
+
+        assert plan.validate_row(['1', '1', 'ignored', 'Norway'], 2) == 0
+        assert plan.validate_row(['2', '5', 'ignored', 'Spain'], 3) == 2
+        assert plan.validated_rows == 2
+
+    def test_rule_plan_validates_batches(self, caplog):
+        rules = {'Price': {'allow_int_value_range': [0, 2]},
+                 'Country': {'allow_fixed_value': 'Norway', 'allow_regex': '[A-Z]'}}
+        rows = [('1', '1', 'Norway'), ('2', '5', 'spain'), ('3', '2', 'Norway'), ('4', 'x', 'Spain')]
+
+        row_result = RulePlan(rules).validate_batch(rows, columns=['Id', 'Price', 'Country'])
+        columnar_result = RulePlan(rules).validate_batch({'Price': ['1', '5', '2', 'x'],
+                                                          'Country': ['Norway', 'spain', 'Norway', 'Spain']})
+
+        for result in (row_result, columnar_result):
+            assert result.row_count == 4
+            assert result.failed_validations == 5
+            assert result.failed_row_count == 2
+            assert result.failure_counts == {'Price:allow_int_value_range': 2,
+                                             'Country:allow_fixed_value': 2,
+                                             'Country:allow_regex': 1}
+            assert list(result.iter_failed_rows('Price:allow_int_value_range')) == [1, 3]
+            assert list(result.iter_failed_rows('Country:allow_regex')) == [1]
+            assert list(result.iter_failed_rows()) == [1, 3]
+
+        assert caplog.text == ''
+
+        with pytest.raises(InvalidConfigException):
+            RulePlan(rules).validate_batch({'Price': ['1']})
+        # row tuples are not silently passed when there are no columns to address them by
+        with pytest.raises(InvalidConfigException):
+            RulePlan(rules).validate_batch([('1', '50', 'Norway'), ('2', 'x', 'Norway')])
+
+
+class CountryCodePlugin(RulePlugin):
+    cost = 1.0
+
+    def __init__(self):
+        self.compile_calls = 0
+        self.batch_calls = 0
+
+    def compile(self, validation_value):
+        self.compile_calls += 1
+        return frozenset(validation_value)
+
+    def check(self, compiled, column_value):
+        return column_value in compiled
+
+    def check_batch(self, compiled, column_values):
+        self.batch_calls += 1
+        return [column_value in compiled for column_value in column_values]
+
+
+class UncheckedPlugin(RulePlugin):
+    def check_batch(self, compiled, column_values):
+        return [True] * len(column_values)
+
+
+class ShortBatchPlugin(CountryCodePlugin):
+    def check_batch(self, compiled, column_values):
+        return super().check_batch(compiled, column_values)[:-1]
+
+
+class FakeEntryPoint:
+    def __init__(self, name, loaded):
+        self.name = name
+        self.loaded = loaded
+
+    def load(self):
+        if isinstance(self.loaded, Exception):
+            raise self.loaded
+        return self.loaded
+
+
+class TestsRulePlugins:
+    def test_rule_plugins_loaded_from_entry_points(self, monkeypatch, caplog):
+        monkeypatch.setattr(plugins, '_RULE_PLUGINS', None)
+        monkeypatch.setattr(plugins, '_iter_entry_points', lambda: [
+            FakeEntryPoint('allow_country_code', CountryCodePlugin),
+            FakeEntryPoint('allow_broken', ImportError('no module named broken')),
+            FakeEntryPoint('allow_object', object),
+            FakeEntryPoint('allow_unchecked', UncheckedPlugin),
+        ])
+
+        assert isinstance(plugins.get_rule_plugin('allow_country_code'), CountryCodePlugin)
+        assert plugins.get_rule_plugin('allow_broken') is None
+        assert plugins.get_rule_plugin('allow_object') is None
+        assert 'Rule plugin allow_broken could not be loaded, no module named broken' in caplog.text
+        assert plugins.get_rule_plugin('allow_unchecked') is None
+        assert 'Rule plugin allow_unchecked could not be loaded' in caplog.text
+
+    def test_rule_plugin_compiled_once_and_checked_in_batches(self, monkeypatch, caplog):
+        monkeypatch.setattr(plugins, '_RULE_PLUGINS', {})
+        plugin = CountryCodePlugin()
+        plugins.register_rule_plugin('allow_country_code', plugin)
+
+        plan = RulePlan({'Country': {'allow_country_code': ['NO', 'ES'], 'allow_regex': '[A-Z]+'}})
+        plan.bind_column_indexes({'Country': 0})
+
+        assert plan.validate_row(['NO'], 2) == 0
+        assert plan.validate_row(['IT'], 3) == 1
+        assert 'check_column_allow_country_code - failed to meet this value : [\'NO\', \'ES\'] - Row#: 3' \
+               in caplog.text
+        assert plan.column_plans['Country'].rules[0].cost == 1.0
+
+        # a column is checked in batches only once all its rules have a batch check
+        assert plan.validate_batch([('NO',), ('it',)]).failed_validations == 2
+        assert plugin.batch_calls == 0
+
+        plan = RulePlan({'Country': {'allow_country_code': ['NO', 'ES']}})
+        result = plan.validate_batch({'Country': ['NO', 'IT', 'ES', 'FR']})
+        assert list(result.iter_failed_rows('Country:allow_country_code')) == [1, 3]
+        assert plugin.batch_calls == 1
+        assert plugin.compile_calls == 2
+
+        assert plan.validate_column_chunk({'Country': ['IT', 'ES']}, 10) == 1
+        assert 'check_column_allow_country_code - failed to meet this value : [\'NO\', \'ES\'] - Row#: 10' \
+               in caplog.text
+        assert plan.column_plans['Country'].failure_counts == {'allow_country_code': 1}
+
+    def test_rule_plugin_short_batch_results_checked_by_value(self, monkeypatch):
+        monkeypatch.setattr(plugins, '_RULE_PLUGINS', {})
+        plugin = ShortBatchPlugin()
+        plugins.register_rule_plugin('allow_country_code', plugin)
+
+        plan = RulePlan({'Country': {'allow_country_code': ['NO', 'ES']}})
+        assert plan.column_plans['Country'].get_batch_failures(['NO', 'IT', 'ES', 'FR']) is None
+        result = plan.validate_batch({'Country': ['NO', 'IT', 'ES', 'FR']})
+        assert list(result.iter_failed_rows('Country:allow_country_code')) == [1, 3]
+        assert plugin.batch_calls == 2
+
+
+class TestsRowRules:
+    COLUMNS = ['Account_Created', 'Last_Login', 'Payment_Type', 'Card_Number']
+    COLUMN_VALIDATION_RULES = {'Account_Created': {'allow_data_type': 'datetime.%Y-%m-%d'},
+                               'Last_Login': {'allow_data_type': 'datetime.%Y-%m-%d'}}
+    ROW_VALIDATION_RULES = {'login_after_created': 'Last_Login >= Account_Created',
+                            'visa_card': {'if': "Payment_Type == 'Visa'",
+                                          'then': "matches(Card_Number, '4[0-9]{15}$')"}}
+
+    @pytest.mark.parametrize('expression', ["__import__('os')", 'Price.real', 'Price[0]',
+                                            'lambda: 1', "matches(Card, '[')", 'Price ==',
+                                            "col(Price)", "int(Price, base=16)"])
+    def test_invalid_expressions(self, expression):
+        with pytest.raises(ValueError):
+            expressions.compile_expression(expression)
+
+    def test_expression_columns(self):
+        assert expressions.get_row_rule_columns({
+            'total': "int(Price) * int(Quantity) == int(col('Total Price'))",
+            'region': {'if': "Country in ['Norway', 'Sweden']", 'then': "not empty(Region)"},
+        }) == ['Total Price', 'Price', 'Quantity', 'Country', 'Region']
+
+    def test_row_rules_in_rule_plan(self, caplog):
+        plan = RulePlan(self.COLUMN_VALIDATION_RULES, row_validation_rules=self.ROW_VALIDATION_RULES)
+        assert plan.columns == self.COLUMNS
+        plan.bind_column_indexes({column: index for index, column in enumerate(self.COLUMNS)})
+
+        assert plan.validate_row(['2020-01-01', '2021-01-01', 'Visa', '4111111111111111'], 2) == 0
+        assert plan.validate_row(['2020-01-01', '2021-01-01', 'Amex', '3111'], 3) == 0
+        assert plan.get_row_failures(['2022-01-01', '2021-01-01', 'Visa', '5111'], 4) == \
+            ['row_validation_rules:login_after_created', 'row_validation_rules:visa_card']
+        assert 'check_row_login_after_created - failed to meet this value : Last_Login >= Account_Created ' \
+               '- Row#: 4 - Column name: Last_Login, Account_Created - Column value: 2021-01-01, 2022-01-01' \
+               in caplog.text
+        # a value not parsed by its data type fails the row rules using it too
+        assert plan.validate_row(['2020-01-01', 'yesterday', 'Amex', ''], 5) == 2
+        assert plan.row_rule_plan.failure_counts == {'login_after_created': 2, 'visa_card': 1}
+
+        line = dict(zip(self.COLUMNS, ['2022-01-01', '2021-01-01', 'Amex', '']))
+        assert plan.validate_line(line, 6) == 1
+        chunk = {column: [value] * 2 for column, value in line.items()}
+        assert plan.validate_column_chunk(chunk, 7) == 2
+
+        result = plan.validate_batch({column: [value, '2023-01-01'] for column, value in line.items()})
+        assert list(result.iter_failed_rows('row_validation_rules:login_after_created')) == [0]
+        result = plan.validate_batch([('2020-01-01', '2021-01-01', 'Visa', '5111')], columns=self.COLUMNS)
+        assert list(result.failure_counts) == ['row_validation_rules:visa_card']
+
+    def test_datetime_values_parsed_once(self, monkeypatch):
+        parsed_values = []
+
+        def parse_datetime_value(data_type, column_value):
+            parsed_values.append(column_value)
+            return validation_functions.parse_datetime_value(data_type, column_value)
+
+        monkeypatch.setattr(expressions, 'parse_datetime_value', parse_datetime_value)
+        plan = RulePlan(self.COLUMN_VALIDATION_RULES, row_validation_rules=self.ROW_VALIDATION_RULES)
+        plan.bind_column_indexes({column: index for index, column in enumerate(self.COLUMNS)})
+
+        assert plan.validate_row(['2020-01-01', '2021-01-01', 'Amex', ''], 2) == 0
+        assert plan.validate_row(['2020-01-01', '2021-06-01', 'Amex', ''], 3) == 0
+        assert parsed_values == ['2020-01-01', '2021-01-01', '2021-06-01']
+
+    def test_row_rules_missing_column(self):
+        plan = RulePlan({}, row_validation_rules={'positive': 'int(Price) > 0'})
+        with pytest.raises(InvalidConfigException):
+            plan.validate_batch({'Country': ['Norway']})
+        with pytest.raises(InvalidConfigException):
+            plan.validate_batch([('Norway',)], columns=['Country'])
+
+
+class TestsResourceGuard:
+    def test_file_timeout(self):
+        resource_guard = ResourceGuard(Settings(True, False, file_timeout_seconds=0.01))
+        resource_guard.check()
+        time.sleep(0.02)
+
+        with pytest.raises(ResourceLimitExceededException):
+            resource_guard.check()
+
+    def test_max_rss(self):
+        resource_guard = ResourceGuard(Settings(True, False, max_rss_mb=0.001))
+
+        with pytest.raises(ResourceLimitExceededException):
+            resource_guard.check()
+
+    def test_no_limits(self):
+        resource_guard = ResourceGuard(Settings(True, False))
+
+        assert not resource_guard.is_active
+        resource_guard.check_line_length(10 ** 9)